@@ -1,8 +1,8 @@
 from __future__ import annotations
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 from .base import AgentResult
-from ..tools import tool_get_checklist
+from ..tools import tool_get_checklist, atool_get_checklist
 
 DEFAULT_ITEMS = [
     "Application form",
@@ -13,8 +13,17 @@ DEFAULT_ITEMS = [
 ]
 
 def run(db_path: str, session: Dict[str, Any], message: str) -> AgentResult:
+    return _reply(tool_get_checklist(db_path, session["session_id"])["checklist"])
+
+async def arun(db_path: str, session: Dict[str, Any], message: str,
+               current: Optional[List[Dict[str, Any]]] = None) -> AgentResult:
+    """Async run(); `current` lets the caller pass a checklist it already fetched."""
+    if current is None:
+        current = (await atool_get_checklist(db_path, session["session_id"]))["checklist"]
+    return _reply(current)
+
+def _reply(current: List[Dict[str, Any]]) -> AgentResult:
     # If no checklist exists yet, we keep it minimal; UI can also initialize items.
-    current = tool_get_checklist(db_path, session["session_id"])["checklist"]
     existing_items = {c["item"] for c in current}
     missing_items = [i for i in DEFAULT_ITEMS if i not in existing_items]
     actions = [{"tool":"get_checklist","output": {"checklist": current}}]
@@ -22,3 +22,6 @@ def run(db_path: str, session: Dict[str, Any], message: str) -> AgentResult:
         "If you paste a short activity description or essay paragraph, I’ll help you refine it."
     )
     return AgentResult(reply=reply, actions=[], citations=[])
+
+async def arun(db_path: str, session: Dict[str, Any], message: str) -> AgentResult:
+    return run(db_path, session, message)
@@ -34,3 +34,6 @@ def run(db_path: str, session: Dict[str, Any], message: str) -> AgentResult:
         "\nIf you share a deployment start date (YYYY-MM-DD), I’ll compute a buffered timeline."
     )
     return AgentResult(reply=reply, actions=[{"tool":"deployment_buffer","output":plan}], citations=[])
+
+async def arun(db_path: str, session: Dict[str, Any], message: str) -> AgentResult:
+    return run(db_path, session, message)
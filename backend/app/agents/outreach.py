@@ -11,3 +11,7 @@ def run(db_path: str, session: Dict[str, Any], message: str, checklist_missing:
         "If you tell me your available time this week (e.g., 30–60 min blocks), I’ll map it to a simple plan."
     )
     return AgentResult(reply=reply, actions=[{"tool":"next_best_nudge","output":nudge}], citations=[])
+
+async def arun(db_path: str, session: Dict[str, Any], message: str, checklist_missing: List[str]) -> AgentResult:
+    # No I/O here, so the async variant just runs inline.
+    return run(db_path, session, message, checklist_missing)
@@ -1,24 +1,71 @@
 from __future__ import annotations
-from typing import Dict, Any, List
+import asyncio
+from typing import Dict, Any, List, Optional, Tuple, AsyncIterator
 
 from .base import AgentResult
-from ..rag.retriever import TfidfRetriever
+from ..rag.retriever import TfidfRetriever, Doc
 from ..config import settings
 from ..llm import LLMClient
-from ..policies import enforce_no_guarantees
+from ..policies import enforce_no_guarantees, NoGuaranteesStream
 
-def run(retriever: TfidfRetriever, llm: LLMClient, session: Dict[str, Any], message: str) -> AgentResult:
-    hits = retriever.search(message, top_k=settings.top_k_docs)
+def run(retriever: TfidfRetriever, llm: LLMClient, session: Dict[str, Any], message: str,
+        hits: Optional[List[Tuple[Doc, float]]] = None) -> AgentResult:
+    if hits is None:
+        hits = retriever.search(message, top_k=settings.top_k_docs)
+    citations, context = _context(hits)
+    draft = llm.generate(system="Admissions support", user=message, context=context)
+    return _answer(draft, citations, context, hits)
+
+async def arun(retriever: TfidfRetriever, llm: LLMClient, session: Dict[str, Any], message: str,
+               hits: Optional[List[Tuple[Doc, float]]] = None) -> AgentResult:
+    if hits is None:
+        hits = await asyncio.to_thread(retriever.search, message, settings.top_k_docs)
+    citations, context = _context(hits)
+    draft = await llm.agenerate(system="Admissions support", user=message, context=context)
+    return _answer(draft, citations, context, hits)
+
+async def astream(retriever: TfidfRetriever, llm: LLMClient, session: Dict[str, Any], message: str,
+                  hits: Optional[List[Tuple[Doc, float]]] = None) -> Tuple[AgentResult, AsyncIterator[str]]:
+    """Streaming arun(): the result (reply left empty) plus the guarded reply chunks."""
+    if hits is None:
+        hits = await asyncio.to_thread(retriever.search, message, settings.top_k_docs)
+    citations, context = _context(hits)
+
+    async def chunks() -> AsyncIterator[str]:
+        guard = NoGuaranteesStream()
+        async for chunk in llm.agenerate_stream(system="Admissions support", user=message, context=context):
+            out = guard.feed(chunk)
+            if out:
+                yield out
+        if context:
+            sources = dict.fromkeys(f"- {c['doc_id']}: {c['title']}" for c in citations)
+            out = guard.feed("\n\nSources:\n" + "\n".join(sources))
+            if out:
+                yield out
+        out = guard.flush()
+        if out:
+            yield out
+
+    result = AgentResult(reply="", actions=[{"tool":"rag_search","hits":len(hits)}], citations=citations)
+    return result, chunks()
+
+def _context(hits: List[Tuple[Doc, float]]) -> Tuple[List[Dict[str, str]], str]:
     citations = []
     context_chunks = []
     for doc, score in hits:
+        # Hits are passages, so the snippet is the part of the page that matched.
         snippet = TfidfRetriever.make_snippet(doc.text, 280)
         citations.append({"doc_id": doc.doc_id, "title": doc.title, "snippet": snippet})
-        context_chunks.append(f"[{doc.doc_id}] {doc.title}\n{snippet}")
+        heading = getattr(doc, "heading", "")
+        label = f"{doc.title} — {heading}" if heading and heading != doc.title else doc.title
+        context_chunks.append(f"[{doc.doc_id}] {label}\n{snippet}")
     context = "\n\n".join(context_chunks) if context_chunks else ""
-    draft = llm.generate(system="Admissions support", user=message, context=context)
+    return citations, context
+
+def _answer(draft: str, citations: List[Dict[str, str]], context: str, hits: List[Tuple[Doc, float]]) -> AgentResult:
     reply = draft
     if context:
-        reply += "\n\nSources:\n" + "\n".join([f"- {c['doc_id']}: {c['title']}" for c in citations])
+        sources = dict.fromkeys(f"- {c['doc_id']}: {c['title']}" for c in citations)
+        reply += "\n\nSources:\n" + "\n".join(sources)
     reply = enforce_no_guarantees(reply)
     return AgentResult(reply=reply, actions=[{"tool":"rag_search","hits":len(hits)}], citations=citations)
@@ -1,24 +1,159 @@
 from __future__ import annotations
-from typing import Dict, Any, List
+import time
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple, AsyncIterator, FrozenSet
 
 from .base import AgentResult
 from . import outreach, checklist, coach, military, rag_qa
-from ..rag.retriever import TfidfRetriever
+from ..rag.retriever import TfidfRetriever, Doc
 from ..llm import LLMClient
 from ..db import get_checklist
+from ..db_async import aget_checklist
+from ..textmatch import PhraseMatcher, normalize_phrase
 
-def route(retriever: TfidfRetriever, llm: LLMClient, db_path: str, session: Dict[str, Any], message: str) -> AgentResult:
-    t = message.lower()
-    # basic intent routing
-    if session["segment"] == "active_duty" and ("deployment" in t or "active duty" in t or "pcs" in t or "orders" in t):
+@dataclass(frozen=True)
+class IntentRule:
+    """Phrases that vote for an intent (textmatch syntax: whole words, trailing * = any ending).
+
+    `priority` breaks score ties (lower wins); `segments` limits the rule to
+    those applicant segments.
+    """
+    intent: str
+    phrases: Tuple[str, ...]
+    priority: int
+    weight: float = 1.0
+    segments: Optional[FrozenSet[str]] = None
+
+INTENT_RULES: List[IntentRule] = [
+    IntentRule("military", ("deploy*", "active duty", "pcs", "orders"), priority=0, segments=frozenset({"active_duty"})),
+    IntentRule("checklist", ("checklist*", "complet*", "incomplet*", "miss", "missed", "missing", "document*"), priority=1),
+    IntentRule("coach", ("improv*", "competitive*", "essay*", "activit*"), priority=2),
+    IntentRule("outreach", ("remind*", "nudge*", "next step*", "start*"), priority=3),
+]
+DEFAULT_INTENT = "rag"
+
+@dataclass
+class RouteDecision:
+    intent: str
+    # Phrases that fired for the chosen intent, as written in the rule table
+    rules: List[str]
+    scores: Dict[str, float]
+    elapsed_ms: float
+
+    def trace(self) -> Dict[str, Any]:
+        return {"tool": "route", "intent": self.intent, "rules": self.rules,
+                "scores": self.scores, "elapsed_ms": self.elapsed_ms}
+
+class IntentRouter:
+    """Scores every intent from one scan of the message.
+
+    All rule phrases are compiled into a single PhraseMatcher, so adding intents
+    or phrases does not add per-message passes. The highest score wins, ties go
+    to the lower priority number, and no score at all means the default (RAG).
+    """
+
+    def __init__(self, rules: List[IntentRule] = INTENT_RULES, default: str = DEFAULT_INTENT):
+        self.rules = list(rules)
+        self.default = default
+        self._votes: Dict[str, List[IntentRule]] = {}
+        for rule in self.rules:
+            for phrase in rule.phrases:
+                self._votes.setdefault(normalize_phrase(phrase), []).append(rule)
+        self._matcher = PhraseMatcher(self._votes)
+        self._priority = {r.intent: r.priority for r in sorted(self.rules, key=lambda r: -r.priority)}
+
+    def decide(self, session: Dict[str, Any], message: str) -> RouteDecision:
+        t0 = time.perf_counter()
+        segment = session.get("segment")
+        scores: Dict[str, float] = {}
+        fired: Dict[str, List[str]] = {}
+        for phrase in self._matcher.findall(message):
+            for rule in self._votes[phrase]:
+                if rule.segments is not None and segment not in rule.segments:
+                    continue
+                scores[rule.intent] = scores.get(rule.intent, 0.0) + rule.weight
+                fired.setdefault(rule.intent, []).append(phrase)
+        if scores:
+            intent = min(scores, key=lambda i: (-scores[i], self._priority[i]))
+        else:
+            intent = self.default
+        elapsed_ms = round((time.perf_counter() - t0) * 1000, 4)
+        return RouteDecision(intent, fired.get(intent, []), scores, elapsed_ms)
+
+_router = IntentRouter()
+
+def classify(session: Dict[str, Any], message: str) -> str:
+    """Pick the specialist agent for a message: military, checklist, coach, outreach or rag."""
+    return _router.decide(session, message).intent
+
+def route(retriever: TfidfRetriever, llm: LLMClient, db_path: str, session: Dict[str, Any], message: str,
+          hits: Optional[List[Tuple[Doc, float]]] = None) -> AgentResult:
+    """Run the agent chosen by the intent router. `hits` lets batch callers pass precomputed RAG results.
+
+    The routing decision is recorded as the first entry of the result's actions.
+    """
+    decision = _router.decide(session, message)
+    return _traced(decision, _run_intent(decision.intent, retriever, llm, db_path, session, message, hits))
+
+def _traced(decision: RouteDecision, result: AgentResult) -> AgentResult:
+    result.actions.insert(0, decision.trace())
+    return result
+
+def _run_intent(intent: str, retriever: TfidfRetriever, llm: LLMClient, db_path: str, session: Dict[str, Any],
+                message: str, hits: Optional[List[Tuple[Doc, float]]]) -> AgentResult:
+    if intent == "military":
         return military.run(db_path, session, message)
-    if "checklist" in t or "complete" in t or "missing" in t or "documents" in t:
+    if intent == "checklist":
         return checklist.run(db_path, session, message)
-    if "improve" in t or "competitive" in t or "essay" in t or "activities" in t:
+    if intent == "coach":
         return coach.run(db_path, session, message)
-    if "remind" in t or "nudge" in t or "next step" in t or "start" in t:
+    if intent == "outreach":
         cl = get_checklist(db_path, session["session_id"])
         missing = [c["item"] for c in cl if c["status"] in ("missing","in_progress")]
         return outreach.run(db_path, session, message, missing)
-    # default: RAG Q&A
-    return rag_qa.run(retriever, llm, session, message)
+    return rag_qa.run(retriever, llm, session, message, hits=hits)
+
+async def aroute(retriever: TfidfRetriever, llm: LLMClient, db_path: str, session: Dict[str, Any], message: str,
+                 hits: Optional[List[Tuple[Doc, float]]] = None,
+                 current_checklist: Optional[List[Dict[str, Any]]] = None) -> AgentResult:
+    """Async route(). `current_checklist` lets the caller pass a checklist it already fetched."""
+    decision = _router.decide(session, message)
+    return _traced(decision, await _arun_intent(decision.intent, retriever, llm, db_path, session, message,
+                                                hits, current_checklist))
+
+async def _arun_intent(intent: str, retriever: TfidfRetriever, llm: LLMClient, db_path: str, session: Dict[str, Any],
+                       message: str, hits: Optional[List[Tuple[Doc, float]]],
+                       current_checklist: Optional[List[Dict[str, Any]]]) -> AgentResult:
+    if intent == "military":
+        return await military.arun(db_path, session, message)
+    if intent == "checklist":
+        return await checklist.arun(db_path, session, message, current=current_checklist)
+    if intent == "coach":
+        return await coach.arun(db_path, session, message)
+    if intent == "outreach":
+        cl = current_checklist
+        if cl is None:
+            cl = await aget_checklist(db_path, session["session_id"])
+        missing = [c["item"] for c in cl if c["status"] in ("missing","in_progress")]
+        return await outreach.arun(db_path, session, message, missing)
+    return await rag_qa.arun(retriever, llm, session, message, hits=hits)
+
+async def astream_route(retriever: TfidfRetriever, llm: LLMClient, db_path: str, session: Dict[str, Any], message: str,
+                        hits: Optional[List[Tuple[Doc, float]]] = None,
+                        current_checklist: Optional[List[Dict[str, Any]]] = None) -> Tuple[AgentResult, AsyncIterator[str]]:
+    """Streaming aroute(): the result with an empty reply plus the reply chunks.
+
+    Only the RAG agent calls the LLM; the other agents' replies come as one chunk.
+    """
+    decision = _router.decide(session, message)
+    if decision.intent == DEFAULT_INTENT:
+        result, chunks = await rag_qa.astream(retriever, llm, session, message, hits=hits)
+        return _traced(decision, result), chunks
+    result = _traced(decision, await _arun_intent(decision.intent, retriever, llm, db_path, session, message,
+                                                  hits, current_checklist))
+    reply, result.reply = result.reply, ""
+
+    async def chunks() -> AsyncIterator[str]:
+        yield reply
+
+    return result, chunks()
@@ -1,9 +1,25 @@
 from __future__ import annotations
 
 import csv
-from dataclasses import dataclass
-from pathlib import Path
-from typing import List, Optional, Dict, Any
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import List, Optional, Dict, Any, Iterator, Tuple, Union
+
+from .db import (
+    applicants_with_sessions,
+    clear_applicants,
+    count_applicants,
+    create_sessions,
+    get_applicant_row,
+    get_applicant_rows,
+    get_applicant_version,
+    insert_checklists,
+    list_applicant_rows,
+    transaction,
+    upsert_applicant_profiles,
+    upsert_applicants,
+)
 
 
 CHECKLIST_ITEMS = [
@@ -13,6 +29,10 @@ CHECKLIST_ITEMS = [
     "Letters of recommendation",
 ]
 
+# Checklist statuses accepted everywhere: CSV ingest, the checklist tools and PATCH
+CHECKLIST_STATUSES = ("missing", "in_progress", "submitted", "verified", "complete")
+_REQUIRED_FIELDS = ("applicant_number", "last_name", "first_name", "sat", "gpa", "transcripts", "essay", "lor")
+
 
 @dataclass
 class Applicant:
@@ -55,35 +75,67 @@ def compute_file_completion(checklist_status: Dict[str, str]) -> int:
     return int(round((completed / len(CHECKLIST_ITEMS)) * 100))
 
 
-def load_applicants(csv_path: str) -> List[Applicant]:
-    path = Path(csv_path)
-    if not path.exists():
-        return []
-    out: List[Applicant] = []
-    with path.open("r", encoding="utf-8") as f:
+def parse_applicant(r: Dict[str, Any]) -> Applicant:
+    """Build an Applicant from one CSV row, raising ValueError naming the first bad field."""
+    text = {}
+    for key in _REQUIRED_FIELDS:
+        value = (r.get(key) or "").strip()
+        if not value:
+            raise ValueError(f"{key} is empty")
+        text[key] = value
+    for key in ("transcripts", "essay", "lor"):
+        if text[key] not in CHECKLIST_STATUSES:
+            raise ValueError(f"{key} must be one of {', '.join(CHECKLIST_STATUSES)}, got {text[key]!r}")
+    try:
+        sat = int(text["sat"])
+    except ValueError:
+        raise ValueError(f"sat is not an integer: {text['sat']!r}") from None
+    try:
+        gpa = float(text["gpa"])
+    except ValueError:
+        raise ValueError(f"gpa is not a number: {text['gpa']!r}") from None
+    if not 0 <= sat <= 1600:
+        raise ValueError(f"sat out of range: {sat}")
+    if not 0.0 <= gpa <= 5.0:
+        raise ValueError(f"gpa out of range: {gpa}")
+    return Applicant(
+        applicant_number=text["applicant_number"],
+        last_name=text["last_name"],
+        first_name=text["first_name"],
+        sat=sat,
+        gpa=gpa,
+        transcripts=text["transcripts"],
+        essay=text["essay"],
+        lor=text["lor"],
+        extracurriculars=[x.strip() for x in (r.get("extracurriculars") or "").split(";") if x.strip()],
+    )
+
+
+def read_applicant_csv(csv_path: str, chunk_size: int = 5000) -> Iterator[List[Tuple[int, Union[Applicant, str]]]]:
+    """Stream a CSV as chunks of (line number, Applicant or rejection reason)."""
+    with open(csv_path, "r", encoding="utf-8", newline="") as f:
         reader = csv.DictReader(f)
+        chunk: List[Tuple[int, Union[Applicant, str]]] = []
         for r in reader:
-            extracurriculars = [x.strip() for x in (r.get("extracurriculars") or "").split(";") if x.strip()]
-            out.append(
-                Applicant(
-                    applicant_number=str(r["applicant_number"]),
-                    last_name=r["last_name"],
-                    first_name=r["first_name"],
-                    sat=int(r["sat"]),
-                    gpa=float(r["gpa"]),
-                    transcripts=r["transcripts"],
-                    essay=r["essay"],
-                    lor=r["lor"],
-                    extracurriculars=extracurriculars,
-                )
-            )
-    return out
+            try:
+                chunk.append((reader.line_num, parse_applicant(r)))
+            except ValueError as e:
+                chunk.append((reader.line_num, str(e)))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
 
 
-def applicant_checklist(app: Applicant) -> Dict[str, str]:
+def sat_status(sat: int) -> str:
     # SAT is treated as complete if score is present
+    return "complete" if sat else "missing"
+
+
+def applicant_checklist(app: Applicant) -> Dict[str, str]:
     return {
-        "SAT score": "complete" if app.sat else "missing",
+        "SAT score": sat_status(app.sat),
         "Official transcripts": app.transcripts,
         "Essays": app.essay,
         "Letters of recommendation": app.lor,
@@ -104,8 +156,175 @@ def applicant_as_dict(app: Applicant) -> Dict[str, Any]:
     }
 
 
-def get_applicant(applicants: List[Applicant], applicant_number: str) -> Optional[Applicant]:
-    for a in applicants:
-        if a.applicant_number == str(applicant_number):
-            return a
-    return None
+def applicant_row(app: Applicant) -> Tuple[Any, ...]:
+    """Values for the applicants table, in APPLICANT_COLUMNS order."""
+    return (
+        app.applicant_number, app.last_name, app.first_name, app.sat, app.gpa,
+        app.transcripts, app.essay, app.lor, "; ".join(app.extracurriculars),
+        compute_file_completion(applicant_checklist(app)),
+    )
+
+
+def _from_row(row: Dict[str, Any]) -> Applicant:
+    return Applicant(
+        applicant_number=row["applicant_number"],
+        last_name=row["last_name"],
+        first_name=row["first_name"],
+        sat=row["sat"],
+        gpa=row["gpa"],
+        transcripts=row["transcripts"],
+        essay=row["essay"],
+        lor=row["lor"],
+        extracurriculars=[x.strip() for x in row["extracurriculars"].split(";") if x.strip()],
+    )
+
+
+@dataclass
+class IngestReport:
+    rows_read: int = 0
+    loaded: int = 0
+    # (CSV line number, reason), first max_rejects only
+    rejected: List[Tuple[int, str]] = field(default_factory=list)
+    rejected_count: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_s(self) -> float:
+        return self.rows_read / self.seconds if self.seconds else 0.0
+
+
+def ingest_applicants(db_path: str, csv_path: str, chunk_size: int = 5000, replace: bool = False,
+                      max_rejects: int = 100) -> IngestReport:
+    """Stream a CSV into the applicants table, one executemany per chunk.
+
+    Only one chunk is held in memory. Invalid rows are skipped and reported.
+    Applicants already loaded are updated in place, each chunk in its own
+    transaction. With replace=True the clear and every chunk run in a single
+    transaction, so readers see the old table until the new one commits and a
+    failure partway through leaves the old rows in place.
+    """
+    report = IngestReport()
+    t0 = time.perf_counter()
+    with transaction(db_path) if replace else nullcontext():
+        if replace:
+            clear_applicants(db_path)
+        for chunk in read_applicant_csv(csv_path, chunk_size):
+            rows = []
+            for line, parsed in chunk:
+                if isinstance(parsed, Applicant):
+                    rows.append(applicant_row(parsed))
+                    continue
+                report.rejected_count += 1
+                if len(report.rejected) < max_rejects:
+                    report.rejected.append((line, parsed))
+            if rows:
+                # Joins the replace transaction when there is one
+                with transaction(db_path):
+                    upsert_applicants(db_path, rows)
+            report.rows_read += len(chunk)
+            report.loaded += len(rows)
+    report.seconds = time.perf_counter() - t0
+    return report
+
+
+def _onboard_chunk(db_path: str, numbers: List[str], rows: List[Optional[Dict[str, Any]]], segment: str,
+                   target_program: str, deadline: Optional[str], skip_existing: bool) -> List[Dict[str, Any]]:
+    existing = applicants_with_sessions(db_path, [n for n, r in zip(numbers, rows) if r]) if skip_existing else set()
+    results: List[Dict[str, Any]] = []
+    created: List[Tuple[Dict[str, Any], Applicant]] = []
+    for number, row in zip(numbers, rows):
+        if row is None:
+            results.append({"applicant_number": number, "error": "Applicant not found"})
+        elif number in existing:
+            results.append({"applicant_number": number, "skipped": "Applicant already has a session"})
+        else:
+            results.append({"applicant_number": number})
+            created.append((results[-1], _from_row(row)))
+    sids = create_sessions(db_path, [(a.full_name, segment, target_program, deadline) for _, a in created])
+    checklists = [(sid, applicant_checklist(a)) for sid, (_, a) in zip(sids, created)]
+    insert_checklists(
+        db_path,
+        [(sid, item, status) for sid, cl in checklists for item, status in cl.items()],
+        [(sid, compute_file_completion(cl), [k for k in CHECKLIST_ITEMS if cl.get(k) != "complete"])
+         for sid, cl in checklists],
+    )
+    upsert_applicant_profiles(db_path, [(sid, applicant_as_dict(a)) for sid, (_, a) in zip(sids, created)])
+    for sid, (result, _) in zip(sids, created):
+        result["session_id"] = sid
+    return results
+
+
+def onboard_applicants(db_path: str, segment: str, target_program: str, deadline: Optional[str] = None,
+                       applicant_numbers: Optional[List[str]] = None, missing: Optional[str] = None,
+                       completion: Optional[int] = None, skip_existing: bool = False,
+                       chunk_size: int = 5000) -> Iterator[List[Dict[str, Any]]]:
+    """Create a session, checklist and profile for many applicants, one transaction per chunk.
+
+    Applicants are the given applicant_numbers, in order, or else every
+    applicant matching the `missing`/`completion` filters of ApplicantStore.page().
+    Each chunk is read and written (one executemany per table) in a single
+    transaction, and its results are yielded as one list once it commits:
+    {"applicant_number", "session_id"} per applicant, or "error"/"skipped"
+    instead of a session_id for unknown applicants and, with skip_existing,
+    applicants that already have a session.
+    """
+    if missing is not None and missing not in CHECKLIST_ITEMS:
+        raise ValueError(f"Unknown checklist item: {missing!r}")
+    numbers = list(dict.fromkeys(applicant_numbers)) if applicant_numbers is not None else None
+    pos, after_id = 0, 0
+    while True:
+        with transaction(db_path):
+            if numbers is not None:
+                part = numbers[pos:pos + chunk_size]
+                pos += chunk_size
+                found = {r["applicant_number"]: r for r in get_applicant_rows(db_path, part)}
+                rows = [found.get(n) for n in part]
+            else:
+                rows = list_applicant_rows(db_path, chunk_size, after_id, missing=missing, completion=completion)
+                part = [r["applicant_number"] for r in rows]
+                after_id = rows[-1]["id"] if rows else after_id
+            if not part:
+                return
+            results = _onboard_chunk(db_path, part, rows, segment, target_program, deadline, skip_existing)
+        yield results
+
+
+class ApplicantStore:
+    """Read side of the applicants table: lookups and filtered, paginated listing.
+
+    Lookups hit the applicant_number unique index. Filters use the completion
+    index and the per-item partial indexes, and pages are keyset-paginated on
+    id, so no request reads more than a page of rows. `version` changes with
+    every ingestion batch.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+
+    @property
+    def version(self) -> int:
+        return get_applicant_version(self.db_path)
+
+    def __len__(self) -> int:
+        return count_applicants(self.db_path)
+
+    def get(self, applicant_number: str) -> Optional[Applicant]:
+        row = get_applicant_row(self.db_path, str(applicant_number))
+        return _from_row(row) if row else None
+
+    def as_dict(self, applicant_number: str) -> Optional[Dict[str, Any]]:
+        app = self.get(applicant_number)
+        return applicant_as_dict(app) if app else None
+
+    def page(self, limit: int = 100, cursor: Optional[str] = None, missing: Optional[str] = None,
+             completion: Optional[int] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Up to `limit` applicants after `cursor`, in dataset order, and the cursor for the next page.
+
+        `missing` keeps applicants whose item is not complete; `completion` keeps
+        one completion bucket. The cursor is opaque; None means no more pages.
+        """
+        rows = list_applicant_rows(self.db_path, limit + 1, int(cursor) if cursor else 0,
+                                   missing=missing, completion=completion)
+        more = len(rows) > limit
+        rows = rows[:limit]
+        return [applicant_as_dict(_from_row(r)) for r in rows], (str(rows[-1]["id"]) if more else None)
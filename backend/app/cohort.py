@@ -0,0 +1,111 @@
+"""Columnar applicant table and vectorized cohort scoring.
+
+Applicants are held as NumPy columns (SAT, GPA, one status code per checklist
+item), and admission chance and file completion are computed for the whole
+cohort in one call. Both vectorized functions reproduce the scalar ones in
+applicants.py exactly: integer floor division for SAT, float floor division
+for GPA (NumPy's floor_divide follows Python's float `//`, so 3.6 - 3.5 still
+lands in bucket 0), and round-half-even for completion.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from .applicants import CHECKLIST_ITEMS, Applicant, sat_status
+from .db import iter_applicant_columns
+
+COMPLETE = "complete"
+
+
+@dataclass
+class Cohort:
+    sat: np.ndarray        # int64, one per applicant
+    gpa: np.ndarray        # float64
+    status: np.ndarray     # uint8 codes into `statuses`, shape (n, len(CHECKLIST_ITEMS))
+    statuses: List[str]
+
+    def __len__(self) -> int:
+        return len(self.sat)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Tuple[int, float, str, str, str]]) -> "Cohort":
+        """Build from (sat, gpa, transcripts, essay, lor) tuples."""
+        codes: Dict[str, int] = {COMPLETE: 0}
+        sat: List[int] = []
+        gpa: List[float] = []
+        status: List[List[int]] = []
+        for s, g, transcripts, essay, lor in rows:
+            sat.append(s)
+            gpa.append(g)
+            status.append([codes.setdefault(v, len(codes)) for v in (sat_status(s), transcripts, essay, lor)])
+        return cls(
+            sat=np.array(sat, dtype=np.int64),
+            gpa=np.array(gpa, dtype=np.float64),
+            status=np.array(status, dtype=np.uint8).reshape(len(status), len(CHECKLIST_ITEMS)),
+            statuses=list(codes),
+        )
+
+    @classmethod
+    def from_applicants(cls, applicants: Iterable[Applicant]) -> "Cohort":
+        return cls.from_rows((a.sat, a.gpa, a.transcripts, a.essay, a.lor) for a in applicants)
+
+    @classmethod
+    def from_db(cls, db_path: str) -> "Cohort":
+        """Load the applicants table, streaming it in batches."""
+        batches = iter_applicant_columns(db_path, ("sat", "gpa", "transcripts", "essay", "lor"))
+        return cls.from_rows(row for batch in batches for row in batch)
+
+    @property
+    def complete(self) -> np.ndarray:
+        return self.status == 0
+
+
+def admission_chance(sat: np.ndarray, gpa: np.ndarray) -> np.ndarray:
+    """compute_admission_chance() over arrays."""
+    sat = np.asarray(sat, dtype=np.int64)
+    gpa = np.asarray(gpa, dtype=np.float64)
+    base = np.where((sat >= 1400) & (gpa >= 3.5), 80, 70)
+    sat_bonus = np.maximum(0, (sat - 1400) // 100) * 5
+    gpa_bonus = np.maximum(0, np.floor_divide(gpa - 3.5, 0.1)).astype(np.int64) * 5
+    return np.clip(base + sat_bonus + gpa_bonus, 0, 99)
+
+
+def file_completion(complete: np.ndarray) -> np.ndarray:
+    """compute_file_completion() over an (n, items) boolean matrix."""
+    done = np.count_nonzero(complete, axis=1)
+    return np.rint(done / len(CHECKLIST_ITEMS) * 100).astype(np.int64)
+
+
+def cohort_stats(cohort: Cohort) -> Dict[str, Any]:
+    """Counts, chance distribution, completion histogram and outstanding items for a cohort."""
+    n = len(cohort)
+    complete = cohort.complete
+    chance = admission_chance(cohort.sat, cohort.gpa)
+    completion = file_completion(complete)
+    chance_values, chance_counts = np.unique(chance, return_counts=True)
+    buckets = [int(round(k / len(CHECKLIST_ITEMS) * 100)) for k in range(len(CHECKLIST_ITEMS) + 1)]
+    completion_counts = np.bincount(np.count_nonzero(complete, axis=1), minlength=len(buckets))
+    by_status = {
+        item: {s: int(np.count_nonzero(cohort.status[:, j] == code)) for code, s in enumerate(cohort.statuses)}
+        for j, item in enumerate(CHECKLIST_ITEMS)
+    }
+    return {
+        "count": n,
+        "estimated_admission_chance_pct": {
+            "mean": round(float(chance.mean()), 2) if n else None,
+            "percentiles": {str(p): int(v) for p, v in zip((10, 25, 50, 75, 90),
+                                                          np.percentile(chance, (10, 25, 50, 75, 90),
+                                                                        method="lower"))} if n else {},
+            "histogram": {str(int(v)): int(c) for v, c in zip(chance_values, chance_counts)},
+        },
+        "file_completion_pct": {
+            "mean": round(float(completion.mean()), 2) if n else None,
+            "histogram": {str(b): int(c) for b, c in zip(buckets, completion_counts)},
+        },
+        # Not complete: missing, in progress, or any other status
+        "outstanding_items": {item: n - int(np.count_nonzero(complete[:, j])) for j, item in enumerate(CHECKLIST_ITEMS)},
+        "item_status_counts": by_status,
+    }
@@ -1,14 +1,58 @@
+from typing import Any, Dict, Optional
+
 from pydantic import BaseModel
 
 class Settings(BaseModel):
     app_name: str = "Agentic Admissions Concierge (AAC)"
     db_path: str = "backend/app/aac.db"
+    db_pool_size: int = 8
+    # Optional write-behind: group-commit message/checklist writes on a writer thread
+    db_write_behind: bool = False
+    db_write_batch_size: int = 256
+    db_write_max_delay_ms: float = 5.0
+    rag_index_dir: str = "backend/app/rag/index"
+    # Manifest + cached per-document term counts for incremental index builds
+    rag_build_cache_dir: str = "backend/app/rag/index_cache"
+    # Legacy pickle index (still loaded if rag_index_dir has not been built)
     rag_index_path: str = "backend/app/rag/index.pkl"
     rag_vectorizer_path: str = "backend/app/rag/vectorizer.pkl"
     top_k_docs: int = 4
+    # Search result cache (in-process LRU; optional SQLite file shared across workers)
+    rag_query_cache_size: int = 1024
+    rag_query_cache_ttl_s: Optional[float] = 3600.0
+    rag_query_cache_path: Optional[str] = None
+    # LLM provider: "mock" (offline demo) or "openai" for any OpenAI-compatible endpoint.
+    # The API key is read from the environment variable named here, never from settings.
+    llm_provider: str = "mock"
+    llm_model: Optional[str] = None
+    llm_base_url: str = "https://api.openai.com/v1"
+    llm_api_key_env: str = "OPENAI_API_KEY"
+    llm_max_concurrency: int = 16
+    # Turns of one /chat/batch request routed at a time
+    chat_batch_concurrency: int = 64
+    llm_timeout_s: float = 30.0
+    llm_max_retries: int = 3
+    # Simulated provider latency for load tests: LatencyProfile fields, e.g.
+    # {"ttft": "lognormal", "ttft_s": 0.8, "ttft_sigma": 0.5, "tokens_per_s": 40, "seed": 1}
+    llm_latency: Optional[Dict[str, Any]] = None
+    # LLM response cache (in-process LRU; optional SQLite file shared across workers)
+    llm_cache_size: int = 1024
+    llm_cache_ttl_s: Optional[float] = 24 * 3600.0
+    llm_cache_path: Optional[str] = None
+    # Passage chunking for the RAG index (characters)
+    rag_chunk_chars: int = 800
+    rag_chunk_overlap: int = 150
+
+    # Extra policy rules (JSON: {"escalate": [...], "no_guarantees": [...], "extend_defaults": true})
+    policy_rules_path: Optional[str] = None
 
     # Demo data
     applicants_path: str = "data/applicants_columbia.csv"
+    # Serialized /applicants responses kept per dataset version; bodies at least this size are gzipped
+    applicants_payload_cache_size: int = 256
+    gzip_min_bytes: int = 1024
+    # Applicants per transaction for POST /sessions/bulk
+    bulk_session_chunk_size: int = 5000
 
     # Columbia Undergraduate Admissions (demo scope)
     columbia_sources: list[str] = [
@@ -1,165 +1,620 @@
+import json
+import os
+import queue
 import sqlite3
+import threading
+import time
 import uuid
+from concurrent.futures import Future
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Iterator, Callable, Hashable, Sequence, Tuple
+
+from .migrations import migrate
+
+DEFAULT_POOL_SIZE = 8
+
+class ConnectionPool:
+    """Bounded checkout/return pool of long-lived connections to one SQLite file.
+
+    Connections are opened once in WAL mode with synchronous=NORMAL, so a commit no
+    longer costs an fsync, and each keeps its own prepared-statement cache alive
+    across calls. They run in autocommit mode; multi-statement work issues BEGIN.
+    """
+
+    def __init__(self, db_path: str, max_size: int = DEFAULT_POOL_SIZE, timeout: float = 30.0):
+        self.db_path = db_path
+        self.max_size = max_size
+        self.timeout = timeout
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._all: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            isolation_level=None,
+            timeout=self.timeout,
+            cached_statements=256,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        with self._lock:
+            self._all.append(conn)
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        if not self._slots.acquire(timeout=self.timeout):
+            raise TimeoutError(f"No free SQLite connection for {self.db_path} after {self.timeout}s")
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._open()
+            try:
+                yield conn
+            finally:
+                # Never hand out a connection with a half-finished transaction.
+                if conn.in_transaction:
+                    conn.rollback()
+                self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        with self._lock:
+            conns, self._all = self._all, []
+        for conn in conns:
+            conn.close()
+        self._idle = queue.LifoQueue()
+
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+def get_pool(db_path: str, max_size: int = DEFAULT_POOL_SIZE) -> ConnectionPool:
+    """Return the process-wide pool for `db_path`, creating it on first use."""
+    key = os.path.abspath(db_path)
+    pool = _pools.get(key)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(key)
+            if pool is None:
+                pool = _pools[key] = ConnectionPool(db_path, max_size=max_size)
+    return pool
+
+def close_pools() -> None:
+    disable_write_behind()
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+class UnitOfWork:
+    """One BEGIN ... COMMIT that every db.py call on the same database joins.
+
+    Reads made inside the unit of work are cached until a write to the same
+    session invalidates them, so repeated lookups within a request are free.
+    """
+
+    def __init__(self, db_path: str, conn: sqlite3.Connection):
+        self.db_path = db_path
+        self.key = os.path.abspath(db_path)
+        self.conn = conn
+        self.cache: Dict[Hashable, Any] = {}
+
+    def cached(self, key: Hashable, load: Callable[[], Any]) -> Any:
+        if key not in self.cache:
+            self.cache[key] = load()
+        return self.cache[key]
+
+    def invalidate(self, *keys: Hashable) -> None:
+        for key in keys:
+            self.cache.pop(key, None)
+
+
+_current_uow: ContextVar[Optional[UnitOfWork]] = ContextVar("aac_unit_of_work", default=None)
+
+def _active_uow(db_path: str) -> Optional[UnitOfWork]:
+    uow = _current_uow.get()
+    if uow is not None and uow.key == os.path.abspath(db_path):
+        return uow
+    return None
+
+@contextmanager
+def transaction(db_path: str, read_only: bool = False) -> Iterator[UnitOfWork]:
+    """Run the enclosed db.py calls as one transaction with a single COMMIT.
+
+    Uses BEGIN IMMEDIATE so the write lock is taken up front; a deferred read
+    transaction that later writes can fail with SQLITE_BUSY under WAL. With
+    read_only=True it is a plain BEGIN: one consistent snapshot for several
+    reads, without blocking writers. Nested calls on the same database join
+    the outer unit of work.
+    """
+    uow = _active_uow(db_path)
+    if uow is not None:
+        yield uow
+        return
+    with get_pool(db_path).connection() as conn:
+        conn.execute("BEGIN" if read_only else "BEGIN IMMEDIATE")
+        uow = UnitOfWork(db_path, conn)
+        token = _current_uow.set(uow)
+        try:
+            yield uow
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            _current_uow.reset(token)
+
+@contextmanager
+def _connect(db_path: str) -> Iterator[sqlite3.Connection]:
+    """Yield the active unit of work's connection, or check one out of the pool."""
+    uow = _active_uow(db_path)
+    if uow is not None:
+        yield uow.conn
+        return
+    with get_pool(db_path).connection() as conn:
+        yield conn
+
+def _cached_read(db_path: str, key: Hashable, load: Callable[[], Any]) -> Any:
+    uow = _active_uow(db_path)
+    return uow.cached(key, load) if uow is not None else load()
+
+def _invalidate(db_path: str, *keys: Hashable) -> None:
+    uow = _active_uow(db_path)
+    if uow is not None:
+        uow.invalidate(*keys)
+
+WriteOp = Callable[[sqlite3.Connection], None]
+
+class GroupCommitWriter:
+    """Write-behind thread that group-commits queued writes for one database.
+
+    Callers enqueue small write operations; the thread drains the bounded queue
+    and applies up to `max_batch` of them in a single transaction, waiting at most
+    `max_delay` seconds for a batch to fill. Each op runs in its own SAVEPOINT so
+    one bad row fails only its own future. The returned futures resolve once the
+    batch has committed.
+    """
+
+    _STOP = object()
+
+    def __init__(self, db_path: str, max_batch: int = 256, max_delay: float = 0.005, max_queue: int = 10000):
+        self.db_path = db_path
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, name=f"aac-writer:{os.path.basename(db_path)}", daemon=True)
+        self._thread.start()
+
+    def submit(self, op: WriteOp, timeout: Optional[float] = 30.0) -> "Future[None]":
+        fut: "Future[None]" = Future()
+        # Blocks when the queue is full, which pushes back on producers.
+        self._queue.put((op, fut), timeout=timeout)
+        return fut
+
+    def flush(self, timeout: Optional[float] = 30.0) -> None:
+        """Block until everything queued before this call has committed."""
+        self.submit(lambda conn: None, timeout=timeout).result(timeout=timeout)
+
+    def close(self, timeout: Optional[float] = 30.0) -> None:
+        self._queue.put(self._STOP, timeout=timeout)
+        self._thread.join(timeout=timeout)
+
+    def _next_batch(self) -> List[Any]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.max_batch and batch[-1] is not self._STOP:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        pool = get_pool(self.db_path)
+        while True:
+            batch = self._next_batch()
+            stop = batch[-1] is self._STOP
+            ops = [b for b in batch if b is not self._STOP]
+            if ops:
+                self._commit(pool, ops)
+            if stop:
+                return
+
+    def _commit(self, pool: ConnectionPool, ops: List[Any]) -> None:
+        errors: Dict[int, BaseException] = {}
+        try:
+            with pool.connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                for i, (op, _) in enumerate(ops):
+                    conn.execute("SAVEPOINT op")
+                    try:
+                        op(conn)
+                        conn.execute("RELEASE op")
+                    except Exception as e:
+                        conn.execute("ROLLBACK TO op")
+                        conn.execute("RELEASE op")
+                        errors[i] = e
+                conn.execute("COMMIT")
+        except Exception as e:
+            for _, fut in ops:
+                fut.set_exception(e)
+            return
+        for i, (_, fut) in enumerate(ops):
+            if i in errors:
+                fut.set_exception(errors[i])
+            else:
+                fut.set_result(None)
+
+
+_writers: Dict[str, GroupCommitWriter] = {}
+_writers_lock = threading.Lock()
+
+def enable_write_behind(db_path: str, max_batch: int = 256, max_delay: float = 0.005) -> GroupCommitWriter:
+    """Route add_message/upsert_checklist_item for `db_path` through a group-commit writer."""
+    key = os.path.abspath(db_path)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = _writers[key] = GroupCommitWriter(db_path, max_batch=max_batch, max_delay=max_delay)
+    return writer
+
+def disable_write_behind(db_path: Optional[str] = None) -> None:
+    """Drain and stop the writer for `db_path` (or every writer if None)."""
+    with _writers_lock:
+        if db_path is None:
+            writers = list(_writers.values())
+            _writers.clear()
+        else:
+            w = _writers.pop(os.path.abspath(db_path), None)
+            writers = [w] if w else []
+    for w in writers:
+        w.close()
+
+def _write(db_path: str, op: WriteOp, durable: bool) -> None:
+    """Apply `op` now, or hand it to the write-behind writer when one is enabled.
+
+    Writes inside a unit of work always run inline on its connection.
+    """
+    writer = _writers.get(os.path.abspath(db_path))
+    if writer is None or _active_uow(db_path) is not None:
+        with _connect(db_path) as conn:
+            op(conn)
+        return
+    fut = writer.submit(op)
+    if durable:
+        fut.result()
 
-def _connect(db_path: str) -> sqlite3.Connection:
-    conn = sqlite3.connect(db_path, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    return conn
 
 def init_db(db_path: str) -> None:
-    conn = _connect(db_path)
-    cur = conn.cursor()
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS sessions (
-      session_id TEXT PRIMARY KEY,
-      name TEXT NOT NULL,
-      segment TEXT NOT NULL,
-      target_program TEXT NOT NULL,
-      deadline TEXT NULL,
-      created_at TEXT NOT NULL
-    );
-    """)
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS checklist (
-      session_id TEXT NOT NULL,
-      item TEXT NOT NULL,
-      status TEXT NOT NULL,
-      updated_at TEXT NOT NULL,
-      PRIMARY KEY (session_id, item)
-    );
-    """)
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS messages (
-      id INTEGER PRIMARY KEY AUTOINCREMENT,
-      session_id TEXT NOT NULL,
-      role TEXT NOT NULL,
-      content TEXT NOT NULL,
-      created_at TEXT NOT NULL
-    );
-    """)
-
-    # Optional profile info for demo applicants (stored per session)
-    cur.execute("""
-    CREATE TABLE IF NOT EXISTS applicant_profiles (
-      session_id TEXT PRIMARY KEY,
-      applicant_number TEXT NULL,
-      last_name TEXT NULL,
-      first_name TEXT NULL,
-      sat INTEGER NULL,
-      gpa REAL NULL,
-      extracurriculars TEXT NULL,
-      estimated_chance_pct INTEGER NULL,
-      file_completion_pct INTEGER NULL,
-      updated_at TEXT NOT NULL
-    );
-    """)
-    conn.commit()
-    conn.close()
+    """Create or upgrade the schema to the latest migration."""
+    with _connect(db_path) as conn:
+        migrate(conn)
 
 def create_session(db_path: str, name: str, segment: str, target_program: str, deadline: Optional[str]) -> str:
     sid = str(uuid.uuid4())
-    conn = _connect(db_path)
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO sessions(session_id,name,segment,target_program,deadline,created_at) VALUES (?,?,?,?,?,?)",
-        (sid, name, segment, target_program, deadline, datetime.utcnow().isoformat())
-    )
-    conn.commit()
-    conn.close()
+    with _connect(db_path) as conn:
+        conn.execute(
+            "INSERT INTO sessions(session_id,name,segment,target_program,deadline,created_at) VALUES (?,?,?,?,?,?)",
+            (sid, name, segment, target_program, deadline, datetime.utcnow().isoformat())
+        )
+    _invalidate(db_path, ("session", sid))
     return sid
 
+def create_sessions(db_path: str, rows: Sequence[Tuple[str, str, str, Optional[str]]]) -> List[str]:
+    """Insert (name, segment, target_program, deadline) sessions with one executemany; returns their ids in order.
+
+    The ids are new, so there is nothing cached to invalidate.
+    """
+    now = datetime.utcnow().isoformat()
+    sids = [str(uuid.uuid4()) for _ in rows]
+    with _connect(db_path) as conn:
+        conn.executemany(
+            "INSERT INTO sessions(session_id,name,segment,target_program,deadline,created_at) VALUES (?,?,?,?,?,?)",
+            sorted((sid, *row, now) for sid, row in zip(sids, rows)),
+        )
+    return sids
+
 def get_session(db_path: str, session_id: str) -> Optional[Dict[str, Any]]:
-    conn = _connect(db_path)
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM sessions WHERE session_id=?", (session_id,))
-    row = cur.fetchone()
-    conn.close()
+    def load():
+        with _connect(db_path) as conn:
+            return conn.execute("SELECT * FROM sessions WHERE session_id=?", (session_id,)).fetchone()
+    row = _cached_read(db_path, ("session", session_id), load)
     return dict(row) if row else None
 
-def upsert_checklist_item(db_path: str, session_id: str, item: str, status: str) -> None:
-    conn = _connect(db_path)
-    cur = conn.cursor()
-    cur.execute(
-        """INSERT INTO checklist(session_id,item,status,updated_at)
-             VALUES (?,?,?,?)
-             ON CONFLICT(session_id,item) DO UPDATE SET status=excluded.status, updated_at=excluded.updated_at""",
-        (session_id, item, status, datetime.utcnow().isoformat())
-    )
-    conn.commit()
-    conn.close()
+def upsert_checklist_item(db_path: str, session_id: str, item: str, status: str, durable: bool = False) -> None:
+    """Upsert one checklist item.
+
+    With write-behind enabled the write is queued; pass durable=True to wait for its commit.
+    """
+    params = (session_id, item, status, datetime.utcnow().isoformat())
+    def op(conn: sqlite3.Connection) -> None:
+        conn.execute(
+            """INSERT INTO checklist(session_id,item,status,updated_at)
+                 VALUES (?,?,?,?)
+                 ON CONFLICT(session_id,item) DO UPDATE SET status=excluded.status, updated_at=excluded.updated_at""",
+            params
+        )
+    _write(db_path, op, durable)
+    # session_progress (and the profile's completion) are refreshed by checklist triggers
+    _invalidate(db_path, ("checklist", session_id), ("progress", session_id), ("profile", session_id))
+
+def upsert_checklist_items(db_path: str, session_id: str, items: Sequence[Tuple[str, str]], durable: bool = False) -> None:
+    """Upsert many (item, status) pairs with one executemany (queued as one op under write-behind)."""
+    now = datetime.utcnow().isoformat()
+    params = [(session_id, item, status, now) for item, status in items]
+    def op(conn: sqlite3.Connection) -> None:
+        conn.executemany(
+            """INSERT INTO checklist(session_id,item,status,updated_at)
+                 VALUES (?,?,?,?)
+                 ON CONFLICT(session_id,item) DO UPDATE SET status=excluded.status, updated_at=excluded.updated_at""",
+            params
+        )
+    _write(db_path, op, durable)
+    _invalidate(db_path, ("checklist", session_id), ("progress", session_id), ("profile", session_id))
+
+def insert_checklists(db_path: str, rows: Sequence[Tuple[str, str, str]],
+                      progress: Sequence[Tuple[str, int, List[str]]]) -> None:
+    """Insert (session_id, item, status) rows for new sessions, and their session_progress.
+
+    `progress` is (session_id, file_completion_pct, missing_items) per session,
+    computed by the caller with the rules the checklist triggers apply. The
+    insert trigger is held off for the batch, so progress is written once per
+    session rather than recomputed for every row. Rows go in key order, which
+    keeps B-tree inserts local.
+    """
+    now = datetime.utcnow().isoformat()
+    with transaction(db_path), _connect(db_path) as conn:
+        conn.execute("INSERT INTO checklist_bulk_load(id) VALUES (1)")
+        conn.executemany(
+            "INSERT INTO checklist(session_id,item,status,updated_at) VALUES (?,?,?,?)",
+            [(*row, now) for row in sorted(rows)],
+        )
+        conn.execute("DELETE FROM checklist_bulk_load")
+        conn.executemany(
+            "INSERT INTO session_progress(session_id,file_completion_pct,missing_items,updated_at) VALUES (?,?,?,?)",
+            [(sid, pct, json.dumps(missing, separators=(",", ":"), ensure_ascii=False), now)
+             for sid, pct, missing in sorted(progress)],
+        )
 
 def get_checklist(db_path: str, session_id: str) -> List[Dict[str, Any]]:
-    conn = _connect(db_path)
-    cur = conn.cursor()
-    cur.execute("SELECT item,status,updated_at FROM checklist WHERE session_id=? ORDER BY item", (session_id,))
-    rows = cur.fetchall()
-    conn.close()
+    def load():
+        with _connect(db_path) as conn:
+            return conn.execute(
+                "SELECT item,status,updated_at FROM checklist WHERE session_id=? ORDER BY item", (session_id,)
+            ).fetchall()
+    rows = _cached_read(db_path, ("checklist", session_id), load)
     return [dict(r) for r in rows]
 
-def add_message(db_path: str, session_id: str, role: str, content: str) -> None:
-    conn = _connect(db_path)
-    cur = conn.cursor()
-    cur.execute(
-        "INSERT INTO messages(session_id,role,content,created_at) VALUES (?,?,?,?)",
-        (session_id, role, content, datetime.utcnow().isoformat())
-    )
-    conn.commit()
-    conn.close()
+def add_message(db_path: str, session_id: str, role: str, content: str, durable: bool = False) -> None:
+    """Append a chat message (queued under write-behind unless durable=True)."""
+    params = (session_id, role, content, datetime.utcnow().isoformat())
+    def op(conn: sqlite3.Connection) -> None:
+        conn.execute("INSERT INTO messages(session_id,role,content,created_at) VALUES (?,?,?,?)", params)
+    _write(db_path, op, durable)
 
 def get_recent_messages(db_path: str, session_id: str, limit: int = 12) -> List[Dict[str, Any]]:
-    conn = _connect(db_path)
-    cur = conn.cursor()
-    cur.execute(
-        "SELECT role,content,created_at FROM messages WHERE session_id=? ORDER BY id DESC LIMIT ?",
-        (session_id, limit)
-    )
-    rows = cur.fetchall()
-    conn.close()
+    with _connect(db_path) as conn:
+        rows = conn.execute(
+            "SELECT role,content,created_at FROM messages WHERE session_id=? ORDER BY id DESC LIMIT ?",
+            (session_id, limit)
+        ).fetchall()
     return list(reversed([dict(r) for r in rows]))
 
 
+def get_session_snapshot(db_path: str, session_id: str, message_limit: int = 50) -> Optional[Dict[str, Any]]:
+    """Session, profile, checklist and recent messages, read in one transaction."""
+    with transaction(db_path, read_only=True):
+        session = get_session(db_path, session_id)
+        if session is None:
+            return None
+        return {
+            "session": session,
+            "profile": get_applicant_profile(db_path, session_id),
+            "checklist": get_checklist(db_path, session_id),
+            "messages": get_recent_messages(db_path, session_id, message_limit),
+        }
+
+
+_PROFILE_UPSERT_SQL = """INSERT INTO applicant_profiles(
+       session_id, applicant_number, last_name, first_name, sat, gpa,
+       extracurriculars, estimated_chance_pct, file_completion_pct, updated_at
+     ) VALUES (?,?,?,?,?,?,?,?,?,?)
+     ON CONFLICT(session_id) DO UPDATE SET
+       applicant_number=excluded.applicant_number,
+       last_name=excluded.last_name,
+       first_name=excluded.first_name,
+       sat=excluded.sat,
+       gpa=excluded.gpa,
+       extracurriculars=excluded.extracurriculars,
+       estimated_chance_pct=excluded.estimated_chance_pct,
+       file_completion_pct=excluded.file_completion_pct,
+       updated_at=excluded.updated_at"""
+
+def _profile_params(session_id: str, profile: Dict[str, Any], now: str) -> Tuple[Any, ...]:
+    return (
+        session_id,
+        profile.get("applicant_number"),
+        (profile.get("name") or {}).get("last"),
+        (profile.get("name") or {}).get("first"),
+        profile.get("sat"),
+        profile.get("gpa"),
+        "; ".join(profile.get("extracurriculars") or []),
+        profile.get("estimated_admission_chance_pct"),
+        profile.get("file_completion_pct"),
+        now,
+    )
+
 def upsert_applicant_profile(db_path: str, session_id: str, profile: Dict[str, Any]) -> None:
     """Upsert demo applicant profile fields for a session."""
-    conn = _connect(db_path)
-    cur = conn.cursor()
-    cur.execute(
-        """INSERT INTO applicant_profiles(
-               session_id, applicant_number, last_name, first_name, sat, gpa,
-               extracurriculars, estimated_chance_pct, file_completion_pct, updated_at
-             ) VALUES (?,?,?,?,?,?,?,?,?,?)
-             ON CONFLICT(session_id) DO UPDATE SET
-               applicant_number=excluded.applicant_number,
-               last_name=excluded.last_name,
-               first_name=excluded.first_name,
-               sat=excluded.sat,
-               gpa=excluded.gpa,
-               extracurriculars=excluded.extracurriculars,
-               estimated_chance_pct=excluded.estimated_chance_pct,
-               file_completion_pct=excluded.file_completion_pct,
-               updated_at=excluded.updated_at""",
-        (
-            session_id,
-            profile.get("applicant_number"),
-            (profile.get("name") or {}).get("last"),
-            (profile.get("name") or {}).get("first"),
-            profile.get("sat"),
-            profile.get("gpa"),
-            "; ".join(profile.get("extracurriculars") or []),
-            profile.get("estimated_admission_chance_pct"),
-            profile.get("file_completion_pct"),
-            datetime.utcnow().isoformat(),
-        ),
-    )
-    conn.commit()
-    conn.close()
+    with _connect(db_path) as conn:
+        conn.execute(_PROFILE_UPSERT_SQL, _profile_params(session_id, profile, datetime.utcnow().isoformat()))
+    _invalidate(db_path, ("profile", session_id), ("progress", session_id))
+
+
+def upsert_applicant_profiles(db_path: str, profiles: Sequence[Tuple[str, Dict[str, Any]]]) -> None:
+    """upsert_applicant_profile() for many (session_id, profile) pairs with one executemany."""
+    now = datetime.utcnow().isoformat()
+    with _connect(db_path) as conn:
+        conn.executemany(_PROFILE_UPSERT_SQL, sorted(_profile_params(sid, p, now) for sid, p in profiles))
+    _invalidate(db_path, *(key for sid, _ in profiles for key in (("profile", sid), ("progress", sid))))
+
+def applicants_with_sessions(db_path: str, applicant_numbers: Sequence[str]) -> set:
+    """The subset of applicant_numbers that already have a session profile."""
+    if not applicant_numbers:
+        return set()
+    with _connect(db_path) as conn:
+        rows = conn.execute(
+            """SELECT DISTINCT applicant_number FROM applicant_profiles
+                WHERE applicant_number IN (SELECT value FROM json_each(?))""",
+            (json.dumps(list(applicant_numbers)),),
+        ).fetchall()
+    return {r[0] for r in rows}
 
 
 def get_applicant_profile(db_path: str, session_id: str) -> Optional[Dict[str, Any]]:
-    conn = _connect(db_path)
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM applicant_profiles WHERE session_id=?", (session_id,))
-    row = cur.fetchone()
-    conn.close()
+    """The session's profile, with file completion taken from session_progress once the checklist exists."""
+    def load():
+        with _connect(db_path) as conn:
+            return conn.execute(
+                """SELECT p.session_id, p.applicant_number, p.last_name, p.first_name, p.sat, p.gpa,
+                          p.extracurriculars, p.estimated_chance_pct,
+                          COALESCE(sp.file_completion_pct, p.file_completion_pct) AS file_completion_pct,
+                          p.updated_at
+                     FROM applicant_profiles p LEFT JOIN session_progress sp ON sp.session_id = p.session_id
+                    WHERE p.session_id=?""",
+                (session_id,),
+            ).fetchone()
+    row = _cached_read(db_path, ("profile", session_id), load)
     return dict(row) if row else None
+
+
+def get_completion_state(db_path: str, session_id: str) -> Optional[Dict[str, Any]]:
+    """File completion, outstanding items and estimated chance for the nudge, in one keyed read.
+
+    None when the session has no checklist rows yet.
+    """
+    def load():
+        with _connect(db_path) as conn:
+            return conn.execute(
+                """SELECT sp.file_completion_pct, sp.missing_items, p.estimated_chance_pct
+                     FROM session_progress sp LEFT JOIN applicant_profiles p ON p.session_id = sp.session_id
+                    WHERE sp.session_id=?""",
+                (session_id,),
+            ).fetchone()
+    row = _cached_read(db_path, ("progress", session_id), load)
+    if row is None:
+        return None
+    return {
+        "file_completion_pct": row["file_completion_pct"],
+        "missing_items": json.loads(row["missing_items"]),
+        "estimated_chance_pct": row["estimated_chance_pct"],
+    }
+
+
+APPLICANT_COLUMNS = ("applicant_number", "last_name", "first_name", "sat", "gpa",
+                     "transcripts", "essay", "lor", "extracurriculars", "file_completion_pct")
+
+# Checklist item -> condition under which it is outstanding; each matches a partial index.
+APPLICANT_OPEN_ITEM_SQL = {
+    "SAT score": "sat = 0",
+    "Official transcripts": "transcripts != 'complete'",
+    "Essays": "essay != 'complete'",
+    "Letters of recommendation": "lor != 'complete'",
+}
+
+def upsert_applicants(db_path: str, rows: Sequence[Sequence[Any]]) -> None:
+    """Insert or update applicant rows (values in APPLICANT_COLUMNS order) with one executemany.
+
+    Re-ingested applicants keep their id, so their position in the dataset. The
+    dataset version is bumped in the same statement batch.
+    """
+    cols = ",".join(APPLICANT_COLUMNS)
+    updates = ",".join(f"{c}=excluded.{c}" for c in APPLICANT_COLUMNS[1:])
+    with _connect(db_path) as conn:
+        conn.executemany(
+            f"""INSERT INTO applicants({cols}) VALUES ({",".join("?" * len(APPLICANT_COLUMNS))})
+                 ON CONFLICT(applicant_number) DO UPDATE SET {updates}""",
+            rows,
+        )
+        _bump_applicant_version(conn)
+
+def clear_applicants(db_path: str) -> None:
+    with _connect(db_path) as conn:
+        conn.execute("DELETE FROM applicants")
+        _bump_applicant_version(conn)
+
+def _bump_applicant_version(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """INSERT INTO applicant_dataset(id,version,updated_at) VALUES (1,1,?)
+             ON CONFLICT(id) DO UPDATE SET version=version+1, updated_at=excluded.updated_at""",
+        (datetime.utcnow().isoformat(),),
+    )
+
+def get_applicant_version(db_path: str) -> int:
+    with _connect(db_path) as conn:
+        row = conn.execute("SELECT version FROM applicant_dataset WHERE id=1").fetchone()
+    return row[0] if row else 0
+
+def count_applicants(db_path: str) -> int:
+    with _connect(db_path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM applicants").fetchone()[0]
+
+def get_applicant_row(db_path: str, applicant_number: str) -> Optional[Dict[str, Any]]:
+    with _connect(db_path) as conn:
+        row = conn.execute("SELECT * FROM applicants WHERE applicant_number=?", (applicant_number,)).fetchone()
+    return dict(row) if row else None
+
+def get_applicant_rows(db_path: str, applicant_numbers: Sequence[str]) -> List[Dict[str, Any]]:
+    """Applicants matching any of applicant_numbers (unknown numbers are left out), in id order."""
+    if not applicant_numbers:
+        return []
+    with _connect(db_path) as conn:
+        # One JSON parameter rather than one per number, so any chunk size stays under SQLite's variable limit
+        rows = conn.execute(
+            "SELECT * FROM applicants WHERE applicant_number IN (SELECT value FROM json_each(?)) ORDER BY id",
+            (json.dumps(list(applicant_numbers)),),
+        ).fetchall()
+    return [dict(r) for r in rows]
+
+def list_applicant_rows(db_path: str, limit: int, after_id: int = 0, missing: Optional[str] = None,
+                        completion: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Up to `limit` applicants with id > after_id, in id order.
+
+    `missing` is a checklist item that must be outstanding; an unknown item matches nothing.
+    """
+    where, params = ["id > ?"], [after_id]
+    if missing is not None:
+        if missing not in APPLICANT_OPEN_ITEM_SQL:
+            return []
+        where.append(APPLICANT_OPEN_ITEM_SQL[missing])
+    if completion is not None:
+        where.append("file_completion_pct = ?")
+        params.append(completion)
+    with _connect(db_path) as conn:
+        rows = conn.execute(
+            f"SELECT * FROM applicants WHERE {' AND '.join(where)} ORDER BY id LIMIT ?", (*params, limit)
+        ).fetchall()
+    return [dict(r) for r in rows]
+
+def iter_applicant_columns(db_path: str, columns: Sequence[str], batch: int = 50000) -> Iterator[List[tuple]]:
+    """Stream the named columns of every applicant, in id order, `batch` rows at a time."""
+    with _connect(db_path) as conn:
+        cur = conn.cursor()
+        cur.row_factory = None
+        cur.execute(f"SELECT {','.join(columns)} FROM applicants ORDER BY id")
+        while True:
+            rows = cur.fetchmany(batch)
+            if not rows:
+                return
+            yield rows
@@ -0,0 +1,64 @@
+"""Async access to db.py for the async request path.
+
+Every call runs on one dedicated thread pool sized to the SQLite connection
+pool, so the event loop never blocks on SQLite and queued calls wait on the
+executor rather than holding a pool slot. Executor threads start from an empty
+context: a sync unit of work never leaks into them, and a transaction begun
+with arun_in_transaction() lives entirely on one executor thread.
+"""
+from __future__ import annotations
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from . import db
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def get_executor(max_workers: int = db.DEFAULT_POOL_SIZE) -> ThreadPoolExecutor:
+    """Return the process-wide SQLite executor, creating it on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="aac-sqlite")
+    return _executor
+
+def shutdown_executor() -> None:
+    global _executor
+    with _executor_lock:
+        executor, _executor = _executor, None
+    if executor is not None:
+        executor.shutdown(wait=True)
+
+async def run_db(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking db.py call on the SQLite executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), functools.partial(fn, *args, **kwargs))
+
+def _in_transaction(db_path: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    with db.transaction(db_path):
+        return fn(*args, **kwargs)
+
+async def arun_in_transaction(db_path: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run `fn` inside db.transaction() on one executor thread, with a single COMMIT."""
+    return await run_db(_in_transaction, db_path, fn, *args, **kwargs)
+
+async def aget_session(db_path: str, session_id: str) -> Optional[Dict[str, Any]]:
+    return await run_db(db.get_session, db_path, session_id)
+
+async def aget_checklist(db_path: str, session_id: str) -> List[Dict[str, Any]]:
+    return await run_db(db.get_checklist, db_path, session_id)
+
+async def aget_recent_messages(db_path: str, session_id: str, limit: int = 12) -> List[Dict[str, Any]]:
+    return await run_db(db.get_recent_messages, db_path, session_id, limit)
+
+async def aget_applicant_profile(db_path: str, session_id: str) -> Optional[Dict[str, Any]]:
+    return await run_db(db.get_applicant_profile, db_path, session_id)
+
+async def aget_completion_state(db_path: str, session_id: str) -> Optional[Dict[str, Any]]:
+    return await run_db(db.get_completion_state, db_path, session_id)
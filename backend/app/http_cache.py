@@ -0,0 +1,102 @@
+"""Serialized JSON payloads cached per dataset version, served with ETags.
+
+A payload is serialized once per (version, key), hashed into a strong ETag and,
+for clients that accept it, gzipped once. A request whose If-None-Match carries
+that ETag gets 304 Not Modified with no body, so a client polling an unchanged
+dataset pays for neither the query, the serialization nor the transfer.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi import Request, Response
+
+GZIP_SUFFIX = "-gz"
+
+
+class CachedPayload:
+    def __init__(self, body: bytes, headers: Optional[Dict[str, str]] = None):
+        self.body = body
+        self.headers = headers or {}
+        self.digest = hashlib.sha256(body).hexdigest()[:32]
+        self._gzipped: Optional[bytes] = None
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.digest}"'
+
+    def gzipped(self) -> bytes:
+        if self._gzipped is None:
+            self._gzipped = gzip.compress(self.body, compresslevel=6, mtime=0)
+        return self._gzipped
+
+
+class PayloadCache:
+    """LRU of serialized payloads, dropped wholesale when the dataset version changes."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.version: Optional[Hashable] = None
+        self._entries: "OrderedDict[Hashable, CachedPayload]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_or_build(self, version: Hashable, key: Hashable,
+                     build: Callable[[], Tuple[Any, Dict[str, str]]]) -> CachedPayload:
+        """Cached payload for `key`, or serialize build()'s (data, headers) and cache it."""
+        with self._lock:
+            if version != self.version:
+                self._entries.clear()
+                self.version = version
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        data, headers = build()
+        entry = CachedPayload(json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), headers)
+        with self._lock:
+            if version == self.version:
+                self._entries[key] = entry
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "version": self.version, "hits": self.hits, "misses": self.misses}
+
+
+def etag_matches(if_none_match: Optional[str], digest: str) -> bool:
+    """Weak comparison, as If-None-Match requires: W/ prefixes and the gzip suffix are ignored."""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag.strip('"').removesuffix(GZIP_SUFFIX) == digest:
+            return True
+    return False
+
+
+def payload_response(request: Request, payload: CachedPayload, gzip_min_bytes: int = 1024) -> Response:
+    """200 with the cached body (gzipped when accepted and large enough), or 304 if the client has it."""
+    use_gzip = len(payload.body) >= gzip_min_bytes and "gzip" in request.headers.get("accept-encoding", "")
+    # Each encoding is a different representation, so it gets its own strong ETag.
+    etag = f'"{payload.digest}{GZIP_SUFFIX}"' if use_gzip else payload.etag
+    headers = {**payload.headers, "ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match"), payload.digest):
+        return Response(status_code=304, headers=headers)
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return Response(payload.gzipped(), media_type="application/json", headers=headers)
+    return Response(payload.body, media_type="application/json", headers=headers)
@@ -1,14 +1,250 @@
 from __future__ import annotations
-from typing import List, Dict, Optional
+import asyncio
+import hashlib
+import json
+import math
+import random
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import List, Dict, Optional, Iterator, AsyncIterator, Tuple, Union
 
-# This demo ships with a deterministic MockLLM so it runs without keys or model downloads.
-# You can plug in a real provider by implementing `generate()`.
+from .db_async import run_db
+
+# This demo ships with a deterministic MockProvider so it runs without keys or model downloads.
+# A real model plugs in as a Provider (see llm_http.py); LLMClient adds the response cache.
+
+_CHUNK = re.compile(r"\s*\S+|\s+")
+
+class SqliteResponseStore:
+    """Shared, persistent tier: one row per cached reply, bounded by `max_entries`."""
+
+    def __init__(self, path: str, max_entries: int = 100_000, ttl_s: Optional[float] = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS llm_cache (
+          key TEXT PRIMARY KEY,
+          response TEXT NOT NULL,
+          created_at REAL NOT NULL,
+          last_used REAL NOT NULL,
+          hits INTEGER NOT NULL DEFAULT 0
+        )""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache(last_used)")
+        self._writes = 0
+
+    def get(self, key: str) -> Optional[Tuple[str, int]]:
+        """Return (response, hits so far) and count this hit, or None."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT response, created_at, hits FROM llm_cache WHERE key=?", (key,)).fetchone()
+            if row is None:
+                return None
+            if self.ttl_s is not None and now - row[1] > self.ttl_s:
+                self._conn.execute("DELETE FROM llm_cache WHERE key=?", (key,))
+                return None
+            self._conn.execute("UPDATE llm_cache SET last_used=?, hits=hits+1 WHERE key=?", (now, key))
+        return row[0], row[2] + 1
+
+    def put(self, key: str, response: str) -> int:
+        """Store `response`; returns how many least-recently-used rows were evicted."""
+        now = time.time()
+        evicted = 0
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache(key, response, created_at, last_used, hits) VALUES (?,?,?,?,0)",
+                (key, response, now, now),
+            )
+            self._writes += 1
+            # Trimming needs a COUNT(*); amortize it over writes.
+            if self._writes % 64 == 0:
+                n = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+                if n > self.max_entries:
+                    evicted = self._conn.execute(
+                        "DELETE FROM llm_cache WHERE key IN "
+                        "(SELECT key FROM llm_cache ORDER BY last_used LIMIT ?)", (n - self.max_entries,)
+                    ).rowcount
+        return evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+
+
+class ResponseCache:
+    """Content-addressed LRU/TTL cache of LLM replies, with an optional SQLite tier.
+
+    Keys are a sha256 over (provider, model, system, user, context), so the same
+    question with the same retrieved context is answered once per provider and
+    model. Each entry counts its own hits.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_s: Optional[float] = None,
+                 store: Optional[SqliteResponseStore] = None):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.store = store
+        # key -> [created (monotonic), response, hits]
+        self._entries: "OrderedDict[str, list]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def make_key(provider: str, model: str, system: str, user: str, context: Optional[str]) -> str:
+        payload = json.dumps([provider, model, system, user, context], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.monotonic()
+        cached = self._get_local(key, now)
+        if cached is not None:
+            return cached
+        return self._get_shared(key, self.store.get(key) if self.store is not None else None, now)
+
+    async def aget(self, key: str) -> Optional[str]:
+        """get() for the event loop: the SQLite tier is read on the db executor."""
+        now = time.monotonic()
+        cached = self._get_local(key, now)
+        if cached is not None:
+            return cached
+        return self._get_shared(key, await run_db(self.store.get, key) if self.store is not None else None, now)
+
+    def _get_local(self, key: str, now: float) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (self.ttl_s is None or now - entry[0] <= self.ttl_s):
+                self._entries.move_to_end(key)
+                entry[2] += 1
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+                self.expirations += 1
+        return None
+
+    def _get_shared(self, key: str, found: Optional[Tuple[str, int]], now: float) -> Optional[str]:
+        with self._lock:
+            if found is None:
+                self.misses += 1
+                return None
+            response, hits = found
+            self.shared_hits += 1
+            self._insert(key, response, now, hits)
+        return response
+
+    def put(self, key: str, response: str) -> None:
+        with self._lock:
+            self._insert(key, response, time.monotonic(), 0)
+        if self.store is not None:
+            self._count_evicted(self.store.put(key, response))
+
+    async def aput(self, key: str, response: str) -> None:
+        """put() for the event loop: the SQLite tier is written on the db executor."""
+        with self._lock:
+            self._insert(key, response, time.monotonic(), 0)
+        if self.store is not None:
+            self._count_evicted(await run_db(self.store.put, key, response))
+
+    def _count_evicted(self, evicted: int) -> None:
+        with self._lock:
+            self.evictions += evicted
+
+    def _insert(self, key: str, response: str, now: float, hits: int) -> None:
+        self._entries[key] = [now, response, hits]
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def entry_hits(self, key: str) -> int:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[2] if entry is not None else 0
+
+    def top_entries(self, n: int = 10) -> List[Dict[str, object]]:
+        """The `n` most-hit in-memory entries: key prefix, hits, age and size."""
+        now = time.monotonic()
+        with self._lock:
+            rows = sorted(self._entries.items(), key=lambda kv: kv[1][2], reverse=True)[:n]
+            return [{"key": k[:16], "hits": e[2], "age_s": round(now - e[0], 1), "chars": len(e[1])} for k, e in rows]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        if self.store is not None:
+            self.store.clear()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": round((self.hits + self.shared_hits) / lookups, 4) if lookups else 0.0,
+            }
+
+
+class LLMError(RuntimeError):
+    """The provider failed to produce a reply (after any retries)."""
+
+
+class Provider:
+    """One LLM backend. Subclasses implement generate(); the rest have working defaults.
+
+    The defaults stream a full reply in word-sized chunks and run blocking
+    calls inline; network providers override the async and streaming methods
+    so waiting on the model holds neither a thread nor the event loop.
+    """
+
+    name = "base"
+
+    def __init__(self, model: str):
+        self.model = model
+
+    def generate(self, system: str, user: str, context: Optional[str] = None) -> str:
+        raise NotImplementedError
+
+    async def agenerate(self, system: str, user: str, context: Optional[str] = None) -> str:
+        return self.generate(system, user, context)
+
+    def generate_stream(self, system: str, user: str, context: Optional[str] = None) -> Iterator[str]:
+        yield from _CHUNK.findall(self.generate(system, user, context))
+
+    async def agenerate_stream(self, system: str, user: str, context: Optional[str] = None) -> AsyncIterator[str]:
+        for chunk in self.generate_stream(system, user, context):
+            yield chunk
+            await asyncio.sleep(0)
+
+    def close(self) -> None:
+        pass
+
+    async def aclose(self) -> None:
+        self.close()
 
-class LLMClient:
-    def __init__(self, provider: str = "mock"):
-        self.provider = provider.lower()
-        if self.provider != "mock":
-            raise ValueError("Only 'mock' provider is enabled in this offline demo.")
+
+class MockProvider(Provider):
+    """Deterministic offline replies; the demo default."""
+
+    name = "mock"
+
+    def __init__(self, model: str = "mock-1"):
+        super().__init__(model)
 
     def generate(self, system: str, user: str, context: Optional[str] = None) -> str:
         # Deterministic mock responses so the demo runs without keys or model downloads.
@@ -48,3 +284,230 @@ class LLMClient:
                     "If you share your constraints, I can outline the typical steps and suggest contacting admissions to confirm.")
         return ("Got it. I can help you take the next step: start with a small milestone today "
                 "(e.g., fill profile + confirm recommenders), then we’ll keep the file moving with reminders.")
+
+
+@dataclass(frozen=True)
+class LatencyProfile:
+    """Simulated provider latency for load tests: seeded, so runs are reproducible.
+
+    ttft: "fixed" (always ttft_s), "normal" (mean ttft_s, stddev ttft_sigma
+    seconds, clipped at 0) or "lognormal" (median ttft_s, shape ttft_sigma).
+    After the first token the reply arrives at tokens_per_s (None = instantly).
+    error_rate / timeout_rate inject failures: an error after the TTFT, or a
+    hang of timeout_s; both raise LLMError.
+    """
+
+    ttft: str = "fixed"
+    ttft_s: float = 0.5
+    ttft_sigma: float = 0.0
+    tokens_per_s: Optional[float] = 50.0
+    error_rate: float = 0.0
+    timeout_rate: float = 0.0
+    timeout_s: float = 30.0
+    seed: int = 0
+
+    def __post_init__(self):
+        if self.ttft not in ("fixed", "normal", "lognormal"):
+            raise ValueError("ttft must be 'fixed', 'normal' or 'lognormal'")
+        if not 0.0 <= self.error_rate + self.timeout_rate <= 1.0:
+            raise ValueError("error_rate + timeout_rate must be within [0, 1]")
+
+
+class SimulatedLatencyProvider(Provider):
+    """Wraps a provider (normally MockProvider) so each call takes as long as a real one.
+
+    Blocking calls sleep their thread and async calls await asyncio.sleep, so
+    simulated calls occupy workers, event loops and queues like network calls
+    do. Draws come from one seeded RNG in call order.
+    """
+
+    def __init__(self, inner: Provider, profile: LatencyProfile):
+        super().__init__(inner.model)
+        self.name = inner.name
+        self.inner = inner
+        self.profile = profile
+        self._rng = random.Random(profile.seed)
+        self._lock = threading.Lock()
+        self.errors = 0
+        self.timeouts = 0
+
+    def _draw(self) -> Tuple[float, str]:
+        """(time to first token, outcome) for the next call; outcome is ok, error or timeout."""
+        p = self.profile
+        with self._lock:
+            if p.ttft == "normal":
+                ttft = max(0.0, self._rng.gauss(p.ttft_s, p.ttft_sigma))
+            elif p.ttft == "lognormal":
+                ttft = self._rng.lognormvariate(math.log(p.ttft_s), p.ttft_sigma) if p.ttft_s > 0 else 0.0
+            else:
+                ttft = p.ttft_s
+            u = self._rng.random()
+        if u < p.error_rate:
+            return ttft, "error"
+        if u < p.error_rate + p.timeout_rate:
+            return ttft, "timeout"
+        return ttft, "ok"
+
+    def _token_delay(self) -> float:
+        return 1.0 / self.profile.tokens_per_s if self.profile.tokens_per_s else 0.0
+
+    def _failure(self, outcome: str) -> LLMError:
+        if outcome == "timeout":
+            self.timeouts += 1
+            return LLMError(f"Simulated provider timeout after {self.profile.timeout_s}s")
+        self.errors += 1
+        return LLMError("Simulated provider error")
+
+    def generate(self, system: str, user: str, context: Optional[str] = None) -> str:
+        ttft, outcome = self._draw()
+        if outcome != "ok":
+            time.sleep(self.profile.timeout_s if outcome == "timeout" else ttft)
+            raise self._failure(outcome)
+        reply = self.inner.generate(system, user, context)
+        time.sleep(ttft + len(_CHUNK.findall(reply)) * self._token_delay())
+        return reply
+
+    async def agenerate(self, system: str, user: str, context: Optional[str] = None) -> str:
+        ttft, outcome = self._draw()
+        if outcome != "ok":
+            await asyncio.sleep(self.profile.timeout_s if outcome == "timeout" else ttft)
+            raise self._failure(outcome)
+        reply = self.inner.generate(system, user, context)
+        await asyncio.sleep(ttft + len(_CHUNK.findall(reply)) * self._token_delay())
+        return reply
+
+    def generate_stream(self, system: str, user: str, context: Optional[str] = None) -> Iterator[str]:
+        ttft, outcome = self._draw()
+        if outcome != "ok":
+            time.sleep(self.profile.timeout_s if outcome == "timeout" else ttft)
+            raise self._failure(outcome)
+        time.sleep(ttft)
+        delay = self._token_delay()
+        for i, chunk in enumerate(self.inner.generate_stream(system, user, context)):
+            if i and delay:
+                time.sleep(delay)
+            yield chunk
+
+    async def agenerate_stream(self, system: str, user: str, context: Optional[str] = None) -> AsyncIterator[str]:
+        ttft, outcome = self._draw()
+        if outcome != "ok":
+            await asyncio.sleep(self.profile.timeout_s if outcome == "timeout" else ttft)
+            raise self._failure(outcome)
+        await asyncio.sleep(ttft)
+        delay = self._token_delay()
+        for i, chunk in enumerate(self.inner.generate_stream(system, user, context)):
+            if i:
+                await asyncio.sleep(delay)
+            yield chunk
+
+    def stats(self) -> Dict[str, object]:
+        return {"latency_profile": asdict(self.profile), "errors": self.errors, "timeouts": self.timeouts}
+
+    def close(self) -> None:
+        self.inner.close()
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+def make_provider(provider: str, model: Optional[str] = None, **options) -> Provider:
+    """Build a provider by name: "mock", or "openai" for any OpenAI-compatible HTTP API."""
+    name = provider.lower()
+    if name == "mock":
+        return MockProvider(model or "mock-1")
+    if name in ("openai", "openai_compatible"):
+        from .llm_http import OpenAICompatibleProvider
+        return OpenAICompatibleProvider(model=model or "gpt-4o-mini", **options)
+    raise ValueError(f"Unknown LLM provider {provider!r}. Use 'mock' or 'openai'.")
+
+
+class LLMClient:
+    """What the agents call: a provider behind the response cache.
+
+    `provider` is a name for make_provider() or a Provider instance; `latency`
+    wraps it in a SimulatedLatencyProvider.
+    """
+
+    def __init__(self, provider: Union[str, Provider] = "mock", model: Optional[str] = None,
+                 cache: Optional[ResponseCache] = None, latency: Optional[LatencyProfile] = None, **options):
+        self.backend = provider if isinstance(provider, Provider) else make_provider(provider, model, **options)
+        if latency is not None:
+            self.backend = SimulatedLatencyProvider(self.backend, latency)
+        self.provider = self.backend.name
+        self.model = self.backend.model
+        self.cache = cache
+        # Replies actually requested from the provider (cache hits excluded)
+        self.provider_calls = 0
+
+    def _cache_key(self, system: str, user: str, context: Optional[str]) -> str:
+        return ResponseCache.make_key(self.provider, self.model, system, user, context)
+
+    def generate(self, system: str, user: str, context: Optional[str] = None) -> str:
+        key = self._cache_key(system, user, context) if self.cache is not None else None
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        self.provider_calls += 1
+        reply = self.backend.generate(system, user, context)
+        if key is not None:
+            self.cache.put(key, reply)
+        return reply
+
+    async def agenerate(self, system: str, user: str, context: Optional[str] = None) -> str:
+        """Async generate(); the provider call is awaited so a slow completion holds no thread."""
+        key = self._cache_key(system, user, context) if self.cache is not None else None
+        if key is not None:
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                return cached
+        self.provider_calls += 1
+        reply = await self.backend.agenerate(system, user, context)
+        if key is not None:
+            await self.cache.aput(key, reply)
+        return reply
+
+    def generate_stream(self, system: str, user: str, context: Optional[str] = None) -> Iterator[str]:
+        """Yield the reply incrementally, the way a provider streams tokens.
+
+        Chunks join back to generate(). A cached reply is replayed in word-sized
+        chunks; a fresh one is cached once the stream completes.
+        """
+        key = self._cache_key(system, user, context) if self.cache is not None else None
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                yield from _CHUNK.findall(cached)
+                return
+        self.provider_calls += 1
+        parts = []
+        for chunk in self.backend.generate_stream(system, user, context):
+            parts.append(chunk)
+            yield chunk
+        if key is not None:
+            self.cache.put(key, "".join(parts))
+
+    async def agenerate_stream(self, system: str, user: str, context: Optional[str] = None) -> AsyncIterator[str]:
+        """Async generate_stream()."""
+        key = self._cache_key(system, user, context) if self.cache is not None else None
+        if key is not None:
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                for chunk in _CHUNK.findall(cached):
+                    yield chunk
+                    await asyncio.sleep(0)
+                return
+        self.provider_calls += 1
+        parts = []
+        async for chunk in self.backend.agenerate_stream(system, user, context):
+            parts.append(chunk)
+            yield chunk
+        if key is not None:
+            await self.cache.aput(key, "".join(parts))
+
+    def close(self) -> None:
+        self.backend.close()
+
+    async def aclose(self) -> None:
+        """close() from async code: waits for the provider's async connections to close."""
+        await self.backend.aclose()
@@ -0,0 +1,345 @@
+"""OpenAI-compatible chat-completions provider over pooled keep-alive HTTP.
+
+Works against any server that speaks POST {base_url}/chat/completions (OpenAI,
+vLLM, llama.cpp server, LiteLLM, ...). Every call goes through:
+  - one pooled httpx client per process (per event loop for async calls), so
+    sockets are reused instead of opened per reply
+  - a max-concurrency semaphore, so a burst of chats cannot exceed the
+    provider's rate limits or our socket budget
+  - per-request timeouts and retries with full-jitter exponential backoff on
+    transport errors, timeouts, 429 and 5xx (Retry-After is honoured)
+  - singleflight: identical prompts already in flight share one request
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterator, Optional
+
+import httpx
+
+from .llm import LLMError, Provider
+
+RETRY_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+
+
+class _SingleFlight:
+    """Collapse concurrent calls with the same key into one; followers get the leader's result."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+        self._tasks: Dict[str, "asyncio.Task[Any]"] = {}
+        self.coalesced = 0
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            fut = self._calls.get(key)
+            leader = fut is None
+            if leader:
+                fut = self._calls[key] = Future()
+            else:
+                self.coalesced += 1
+        if not leader:
+            return fut.result()
+        try:
+            result = fn()
+            fut.set_result(result)
+            return result
+        except BaseException as e:
+            fut.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    async def ado(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._tasks.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda t: self._tasks.pop(key, None) if self._tasks.get(key) is t else None)
+        else:
+            self.coalesced += 1
+        # Shielded so one cancelled caller does not cancel the request for the others.
+        return await asyncio.shield(task)
+
+
+class OpenAICompatibleProvider(Provider):
+    name = "openai"
+
+    def __init__(self, model: str = "gpt-4o-mini", base_url: str = "https://api.openai.com/v1",
+                 api_key: Optional[str] = None, api_key_env: str = "OPENAI_API_KEY",
+                 max_concurrency: int = 16, timeout_s: float = 30.0, connect_timeout_s: float = 5.0,
+                 max_retries: int = 3, backoff_base_s: float = 0.25, backoff_max_s: float = 8.0,
+                 temperature: float = 0.0, max_tokens: Optional[int] = None):
+        super().__init__(model)
+        self.base_url = base_url.rstrip("/")
+        self.api_key = api_key if api_key is not None else os.environ.get(api_key_env)
+        self.max_concurrency = max_concurrency
+        self.timeout = httpx.Timeout(timeout_s, connect=connect_timeout_s)
+        self.max_retries = max_retries
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        # Enough pooled connections for every permitted in-flight request, no more.
+        self._limits = httpx.Limits(max_connections=max_concurrency, max_keepalive_connections=max_concurrency)
+        self._client: Optional[httpx.Client] = None
+        self._client_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._aclient: Optional[httpx.AsyncClient] = None
+        self._aslots: Optional[asyncio.Semaphore] = None
+        self._aloop: Optional[asyncio.AbstractEventLoop] = None
+        self._flight = _SingleFlight()
+        self._rng = random.Random()
+        self.requests_sent = 0
+        self.retries = 0
+
+    @property
+    def coalesced(self) -> int:
+        return self._flight.coalesced
+
+    # -- request plumbing -------------------------------------------------
+
+    def _headers(self) -> Dict[str, str]:
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
+
+    def _payload(self, system: str, user: str, context: Optional[str], stream: bool = False) -> Dict[str, Any]:
+        content = f"Context:\n{context}\n\nQuestion: {user}" if context else user
+        payload: Dict[str, Any] = {
+            "model": self.model,
+            "messages": [{"role": "system", "content": system}, {"role": "user", "content": content}],
+            "temperature": self.temperature,
+        }
+        if self.max_tokens is not None:
+            payload["max_tokens"] = self.max_tokens
+        if stream:
+            payload["stream"] = True
+        return payload
+
+    @staticmethod
+    def _flight_key(payload: Dict[str, Any]) -> str:
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _get_client(self) -> httpx.Client:
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    self._client = httpx.Client(base_url=self.base_url, headers=self._headers(),
+                                                timeout=self.timeout, limits=self._limits)
+        return self._client
+
+    def _get_aclient(self) -> httpx.AsyncClient:
+        # Async connections belong to the loop that opened them.
+        loop = asyncio.get_running_loop()
+        if self._aclient is None or self._aloop is not loop:
+            if self._aclient is not None:
+                _aclose_on_loop(self._aclient, self._aloop)
+            self._aclient = httpx.AsyncClient(base_url=self.base_url, headers=self._headers(),
+                                              timeout=self.timeout, limits=self._limits)
+            self._aslots = asyncio.Semaphore(self.max_concurrency)
+            self._aloop = loop
+        return self._aclient
+
+    def _backoff(self, attempt: int, response: Optional[httpx.Response] = None) -> float:
+        if response is not None:
+            try:
+                return min(float(response.headers["Retry-After"]), self.backoff_max_s)
+            except (KeyError, ValueError):
+                pass
+        return self._rng.uniform(0, min(self.backoff_max_s, self.backoff_base_s * 2 ** attempt))
+
+    def _retryable(self, attempt: int, error: Exception) -> bool:
+        if attempt >= self.max_retries:
+            return False
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code in RETRY_STATUS
+        return isinstance(error, httpx.TransportError)
+
+    @staticmethod
+    def _content(response: httpx.Response) -> str:
+        try:
+            return response.json()["choices"][0]["message"]["content"] or ""
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            raise LLMError(f"Malformed completion response: {e}") from e
+
+    @staticmethod
+    def _delta(line: str) -> Optional[str]:
+        """Text carried by one SSE line of a streamed completion ('' for none, None at [DONE])."""
+        if not line.startswith("data:"):
+            return ""
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            return None
+        try:
+            return json.loads(data)["choices"][0].get("delta", {}).get("content") or ""
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            raise LLMError(f"Malformed stream event: {e}") from e
+
+    def _fail(self, error: Exception) -> LLMError:
+        if isinstance(error, httpx.HTTPStatusError):
+            return LLMError(f"Provider returned HTTP {error.response.status_code}")
+        return LLMError(f"Provider request failed: {error!r}")
+
+    # -- blocking API -------------------------------------------------------
+
+    def _post(self, payload: Dict[str, Any]) -> str:
+        client = self._get_client()
+        attempt = 0
+        while True:
+            response = None
+            try:
+                with self._slots:
+                    self.requests_sent += 1
+                    response = client.post("/chat/completions", json=payload)
+                    response.raise_for_status()
+                    return self._content(response)
+            except (httpx.HTTPStatusError, httpx.TransportError) as e:
+                if not self._retryable(attempt, e):
+                    raise self._fail(e) from e
+                # Back off outside the semaphore so waiting does not hold a slot.
+                time.sleep(self._backoff(attempt, response))
+                attempt += 1
+                self.retries += 1
+
+    def generate(self, system: str, user: str, context: Optional[str] = None) -> str:
+        payload = self._payload(system, user, context)
+        return self._flight.do(self._flight_key(payload), lambda: self._post(payload))
+
+    def generate_stream(self, system: str, user: str, context: Optional[str] = None) -> Iterator[str]:
+        # Streams are not coalesced; a retry is only attempted before the first chunk.
+        payload = self._payload(system, user, context, stream=True)
+        client = self._get_client()
+        attempt = 0
+        while True:
+            started = False
+            response = None
+            try:
+                with self._slots:
+                    self.requests_sent += 1
+                    with client.stream("POST", "/chat/completions", json=payload) as response:
+                        response.raise_for_status()
+                        for line in response.iter_lines():
+                            text = self._delta(line)
+                            if text is None:
+                                return
+                            if text:
+                                started = True
+                                yield text
+                return
+            except (httpx.HTTPStatusError, httpx.TransportError) as e:
+                if started or not self._retryable(attempt, e):
+                    raise self._fail(e) from e
+                time.sleep(self._backoff(attempt, response))
+                attempt += 1
+                self.retries += 1
+
+    # -- async API ----------------------------------------------------------
+
+    async def _apost(self, payload: Dict[str, Any]) -> str:
+        client = self._get_aclient()
+        attempt = 0
+        while True:
+            response = None
+            try:
+                async with self._aslots:
+                    self.requests_sent += 1
+                    response = await client.post("/chat/completions", json=payload)
+                    response.raise_for_status()
+                    return self._content(response)
+            except (httpx.HTTPStatusError, httpx.TransportError) as e:
+                if not self._retryable(attempt, e):
+                    raise self._fail(e) from e
+                await asyncio.sleep(self._backoff(attempt, response))
+                attempt += 1
+                self.retries += 1
+
+    async def agenerate(self, system: str, user: str, context: Optional[str] = None) -> str:
+        payload = self._payload(system, user, context)
+        return await self._flight.ado(self._flight_key(payload), lambda: self._apost(payload))
+
+    async def agenerate_stream(self, system: str, user: str, context: Optional[str] = None) -> AsyncIterator[str]:
+        payload = self._payload(system, user, context, stream=True)
+        client = self._get_aclient()
+        attempt = 0
+        while True:
+            started = False
+            response = None
+            try:
+                async with self._aslots:
+                    self.requests_sent += 1
+                    async with client.stream("POST", "/chat/completions", json=payload) as response:
+                        response.raise_for_status()
+                        async for line in response.aiter_lines():
+                            text = self._delta(line)
+                            if text is None:
+                                return
+                            if text:
+                                started = True
+                                yield text
+                return
+            except (httpx.HTTPStatusError, httpx.TransportError) as e:
+                if started or not self._retryable(attempt, e):
+                    raise self._fail(e) from e
+                await asyncio.sleep(self._backoff(attempt, response))
+                attempt += 1
+                self.retries += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "requests_sent": self.requests_sent,
+            "retries": self.retries,
+            "coalesced": self.coalesced,
+            "max_concurrency": self.max_concurrency,
+        }
+
+    def close(self) -> None:
+        """Close the sync client; an async client is closed on its loop if that loop still runs.
+
+        Prefer aclose() from async code: it also waits for the async client to close.
+        """
+        with self._client_lock:
+            client, self._client = self._client, None
+        if client is not None:
+            client.close()
+        aclient, self._aclient = self._aclient, None
+        if aclient is not None:
+            _aclose_on_loop(aclient, self._aloop)
+
+    async def aclose(self) -> None:
+        """Close both clients, awaiting the async one on the loop that owns it."""
+        aclient, self._aclient = self._aclient, None
+        self.close()
+        if aclient is None:
+            return
+        if self._aloop is asyncio.get_running_loop():
+            await aclient.aclose()
+        elif self._aloop is not None and self._aloop.is_running():
+            await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(aclient.aclose(), self._aloop))
+
+
+def _aclose_on_loop(client: httpx.AsyncClient, loop: Optional[asyncio.AbstractEventLoop]) -> None:
+    """Schedule client.aclose() on `loop`, the loop its connections belong to.
+
+    A loop that has stopped can no longer run it; its sockets went with it.
+    """
+    if loop is None or loop.is_closed() or not loop.is_running():
+        return
+    try:
+        current = asyncio.get_running_loop()
+    except RuntimeError:
+        current = None
+    if current is loop:
+        loop.create_task(client.aclose())
+    else:
+        asyncio.run_coroutine_threadsafe(client.aclose(), loop)
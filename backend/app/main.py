@@ -1,32 +1,51 @@
 from __future__ import annotations
 
-from fastapi import FastAPI, HTTPException
+import asyncio
+import json
+import os
+import time
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from .config import settings
-from .models import SessionCreate, Session, ChatRequest, ChatResponse, Citation
+from .models import (
+    SessionCreate, Session, SessionSnapshot, ChatRequest, ChatResponse, ChatBatchRequest, ChatBatchResponse, Citation,
+    ChecklistPatch, ChecklistPatchResponse, SessionBulkCreate,
+)
 from .db import (
+    get_pool,
+    close_pools,
+    enable_write_behind,
+    transaction,
     init_db,
     create_session,
     get_session,
     add_message,
-    upsert_checklist_item,
-    get_checklist,
+    upsert_checklist_items,
     upsert_applicant_profile,
     get_applicant_profile,
+    get_completion_state,
+    get_session_snapshot,
 )
+from .db_async import get_executor, shutdown_executor, run_db, arun_in_transaction, aget_session, aget_checklist, aget_completion_state
+from .cohort import Cohort, cohort_stats
+from .http_cache import PayloadCache, payload_response
 from .applicants import (
-    load_applicants,
-    get_applicant,
-    applicant_as_dict,
+    ApplicantStore,
+    ingest_applicants,
+    onboard_applicants,
     applicant_checklist,
     CHECKLIST_ITEMS,
-    compute_file_completion,
 )
 from .rag.retriever import TfidfRetriever
-from .llm import LLMClient
-from .agents.router import route
-from .policies import should_escalate
+from .rag.cache import QueryCache, SqliteQueryStore
+from .llm import LLMClient, LLMError, LatencyProfile, ResponseCache, SqliteResponseStore
+from .agents.router import aroute, astream_route, classify
+from .tools import tool_update_checklist_many
+from .policies import should_escalate, load_policy_rules
 
 app = FastAPI(title=settings.app_name)
 
@@ -40,46 +59,78 @@ app.add_middleware(
 
 # Lazy-loaded resources
 retriever: TfidfRetriever | None = None
-llm = LLMClient(provider="mock")
-applicants_cache = []
+query_cache: QueryCache | None = None
+
+def _make_llm() -> LLMClient:
+    latency = LatencyProfile(**settings.llm_latency) if settings.llm_latency else None
+    if settings.llm_provider == "mock":
+        return LLMClient("mock", model=settings.llm_model, latency=latency)
+    return LLMClient(
+        settings.llm_provider,
+        model=settings.llm_model,
+        latency=latency,
+        base_url=settings.llm_base_url,
+        api_key_env=settings.llm_api_key_env,
+        max_concurrency=settings.llm_max_concurrency,
+        timeout_s=settings.llm_timeout_s,
+        max_retries=settings.llm_max_retries,
+    )
+
+llm = _make_llm()
+applicants = ApplicantStore(settings.db_path)
+applicant_payloads = PayloadCache(settings.applicants_payload_cache_size)
 
 @app.on_event("startup")
 def _startup():
+    get_pool(settings.db_path, max_size=settings.db_pool_size)
+    get_executor(max_workers=settings.db_pool_size)
     init_db(settings.db_path)
-    # Load demo applicants (optional). If missing, the demo can still run.
-    global applicants_cache
-    applicants_cache = load_applicants(settings.applicants_path)
-
-
-def _make_completion_nudge(session_id: str) -> str:
-    """Append a deterministic, user-facing nudge to complete the application file."""
-    cl = get_checklist(settings.db_path, session_id)
-    status_by_item = {c["item"]: c["status"] for c in cl}
-    pct = compute_file_completion(status_by_item)
-    missing = [i for i in CHECKLIST_ITEMS if status_by_item.get(i) != "complete"]
-
-    # Keep profile up to date if it exists
-    prof = get_applicant_profile(settings.db_path, session_id) or {}
-    if prof:
-        prof["file_completion_pct"] = pct
-        upsert_applicant_profile(settings.db_path, session_id, {
-            "applicant_number": prof.get("applicant_number"),
-            "name": {"last": prof.get("last_name"), "first": prof.get("first_name")},
-            "sat": prof.get("sat"),
-            "gpa": prof.get("gpa"),
-            "extracurriculars": (prof.get("extracurriculars") or "").split("; ") if prof.get("extracurriculars") else [],
-            "estimated_admission_chance_pct": prof.get("estimated_chance_pct"),
-            "file_completion_pct": pct,
-        })
-
-    chance = prof.get("estimated_chance_pct")
+    if settings.db_write_behind:
+        enable_write_behind(
+            settings.db_path,
+            max_batch=settings.db_write_batch_size,
+            max_delay=settings.db_write_max_delay_ms / 1000,
+        )
+    if settings.policy_rules_path:
+        load_policy_rules(settings.policy_rules_path)
+    if llm.cache is None:
+        store = SqliteResponseStore(settings.llm_cache_path, ttl_s=settings.llm_cache_ttl_s) if settings.llm_cache_path else None
+        llm.cache = ResponseCache(settings.llm_cache_size, settings.llm_cache_ttl_s, store=store)
+    # Seed the applicants table from the demo CSV on first run (optional; the demo
+    # runs without it). Large datasets are loaded with scripts.ingest_applicants.
+    applicants.db_path = settings.db_path
+    if len(applicants) == 0 and os.path.exists(settings.applicants_path):
+        ingest_applicants(settings.db_path, settings.applicants_path)
+
+
+@app.on_event("shutdown")
+async def _shutdown():
+    await llm.aclose()
+    # Both join threads or close connections; keep them off the event loop
+    await asyncio.to_thread(shutdown_executor)
+    await asyncio.to_thread(close_pools)
+
+@app.exception_handler(LLMError)
+async def _llm_error(request: Request, exc: LLMError):
+    return JSONResponse(status_code=502, content={"detail": f"LLM provider error: {exc}"})
+
+
+def _completion_nudge(state: Optional[dict]) -> str:
+    """Build the nudge from the session's denormalized progress (get_completion_state); no writes."""
+    if state is None:
+        # No checklist rows yet
+        state = {"file_completion_pct": 0, "missing_items": list(CHECKLIST_ITEMS), "estimated_chance_pct": None}
+    pct = state["file_completion_pct"]
+    missing = state["missing_items"]
+
+    chance = state["estimated_chance_pct"]
     header = f"\n\n---\n**File completion:** {pct}%"
     if chance is not None:
         header += f"  |  **Estimated admission chance (demo heuristic):** {int(chance)}%"
     header += "\n"
 
     if not missing:
-        return header + "✅ Your core file items are marked complete. Next: confirm submission + review Columbia-specific requirements." 
+        return header + "✅ Your core file items are marked complete. Next: confirm submission + review Columbia-specific requirements."
 
     lines = [header, "**Recommended next steps (to reach 100%):**"]
     for i, item in enumerate(missing[:3], start=1):
@@ -95,37 +146,81 @@ def _get_retriever() -> TfidfRetriever:
     global retriever
     if retriever is None:
         try:
-            retriever = TfidfRetriever.load(settings.rag_index_path, settings.rag_vectorizer_path)
+            try:
+                retriever = TfidfRetriever.open(settings.rag_index_dir)
+            except FileNotFoundError:
+                retriever = TfidfRetriever.load(settings.rag_index_path, settings.rag_vectorizer_path)
         except FileNotFoundError:
             raise HTTPException(status_code=500, detail="RAG index not found. Run: python -m scripts.build_index")
+        retriever.cache = _get_query_cache()
     return retriever
 
+def _get_query_cache() -> QueryCache:
+    global query_cache
+    if query_cache is None:
+        store = None
+        if settings.rag_query_cache_path:
+            store = SqliteQueryStore(settings.rag_query_cache_path, ttl_s=settings.rag_query_cache_ttl_s)
+        query_cache = QueryCache(settings.rag_query_cache_size, settings.rag_query_cache_ttl_s, store=store)
+    return query_cache
+
 @app.post("/sessions", response_model=Session)
 def create_session_api(req: SessionCreate):
     # If an applicant_number is provided, bootstrap the session from the mock dataset.
     name = req.name
     if req.applicant_number:
-        app_rec = get_applicant(applicants_cache, req.applicant_number)
+        app_rec = applicants.get(req.applicant_number)
         if not app_rec:
             raise HTTPException(status_code=404, detail="Applicant not found in demo dataset")
-        profile = applicant_as_dict(app_rec)
+        profile = applicants.as_dict(req.applicant_number)
         name = f"{app_rec.last_name}, {app_rec.first_name}"
 
-    sid = create_session(
-        settings.db_path,
-        name=name,
-        segment=req.segment,
-        target_program=req.target_program,
+    with transaction(settings.db_path):
+        sid = create_session(
+            settings.db_path,
+            name=name,
+            segment=req.segment,
+            target_program=req.target_program,
+            deadline=req.deadline.isoformat() if req.deadline else None,
+        )
+
+        # Bootstrap checklist + profile if using the dataset
+        if req.applicant_number:
+            upsert_checklist_items(settings.db_path, sid, list(applicant_checklist(app_rec).items()))
+            upsert_applicant_profile(settings.db_path, sid, profile)
+        s = get_session(settings.db_path, sid)
+    return Session(**s)
+
+@app.post("/sessions/bulk")
+def create_sessions_bulk_api(req: SessionBulkCreate):
+    """Create sessions, checklists and profiles for many applicants, streamed back as NDJSON.
+
+    Applicants are written in chunked transactions; each chunk's lines
+    ({"applicant_number", "session_id"}, or "error"/"skipped") are sent once it
+    commits, and a final {"done": true, ...} line carries the counts.
+    """
+    if req.applicant_numbers is not None and (req.missing is not None or req.completion is not None):
+        raise HTTPException(status_code=422, detail="Pass applicant_numbers or missing/completion, not both")
+    if req.missing is not None and req.missing not in CHECKLIST_ITEMS:
+        raise HTTPException(status_code=422, detail=f"Unknown checklist item: {req.missing!r}")
+    chunks = onboard_applicants(
+        settings.db_path, req.segment, req.target_program,
         deadline=req.deadline.isoformat() if req.deadline else None,
+        applicant_numbers=req.applicant_numbers, missing=req.missing, completion=req.completion,
+        skip_existing=req.skip_existing, chunk_size=settings.bulk_session_chunk_size,
     )
 
-    # Bootstrap checklist + profile if using the dataset
-    if req.applicant_number:
-        for item, status in applicant_checklist(app_rec).items():
-            upsert_checklist_item(settings.db_path, sid, item, status)
-        upsert_applicant_profile(settings.db_path, sid, profile)
-    s = get_session(settings.db_path, sid)
-    return Session(**s)
+    def lines():
+        t0 = time.perf_counter()
+        counts = {"created": 0, "skipped": 0, "not_found": 0}
+        for results in chunks:
+            for r in results:
+                counts["created" if "session_id" in r else "skipped" if "skipped" in r else "not_found"] += 1
+            # One write per chunk: each item of a sync iterator costs a threadpool hop
+            yield "".join(json.dumps(r) + "\n" for r in results)
+        yield json.dumps({"done": True, **counts, "seconds": round(time.perf_counter() - t0, 3)}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
 
 @app.get("/sessions/{session_id}", response_model=Session)
 def get_session_api(session_id: str):
@@ -135,18 +230,65 @@ def get_session_api(session_id: str):
     return Session(**s)
 
 
+def _applicants_version() -> tuple:
+    return (applicants.db_path, applicants.version)
+
+
 @app.get("/applicants")
-def list_applicants_api():
-    """Return the mock applicant dataset used for the demo."""
-    return [applicant_as_dict(a) for a in applicants_cache]
+def list_applicants_api(
+    request: Request,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, pattern=r"^\d+$"),
+    missing: Optional[str] = Query(None, description="Checklist item that is not complete, e.g. Essays"),
+    completion: Optional[int] = Query(None, description="File completion bucket: 0, 25, 50, 75 or 100"),
+):
+    """Return a page of the mock applicant dataset used for the demo.
+
+    The cursor for the next page, if any, is in the X-Next-Cursor header. Pages
+    are serialized once per dataset version and revalidated with ETag/If-None-Match.
+    """
+    def build():
+        page, next_cursor = applicants.page(limit, cursor, missing=missing, completion=completion)
+        return page, ({"X-Next-Cursor": next_cursor} if next_cursor is not None else {})
+    payload = applicant_payloads.get_or_build(_applicants_version(), ("page", limit, cursor, missing, completion), build)
+    return payload_response(request, payload, settings.gzip_min_bytes)
+
+
+@app.get("/applicants/stats")
+def applicant_stats_api(request: Request):
+    """Cohort-wide chance distribution, completion histogram and outstanding checklist items."""
+    payload = applicant_payloads.get_or_build(
+        _applicants_version(), ("stats",), lambda: (cohort_stats(Cohort.from_db(settings.db_path)), {}))
+    return payload_response(request, payload, settings.gzip_min_bytes)
 
 
 @app.get("/applicants/{applicant_number}")
 def get_applicant_api(applicant_number: str):
-    a = get_applicant(applicants_cache, applicant_number)
+    a = applicants.as_dict(applicant_number)
     if not a:
         raise HTTPException(status_code=404, detail="Applicant not found")
-    return applicant_as_dict(a)
+    return a
+
+
+@app.patch("/sessions/{session_id}/checklist", response_model=ChecklistPatchResponse)
+def patch_checklist_api(session_id: str, req: ChecklistPatch):
+    """Apply many checklist item/status changes at once and return the recomputed completion."""
+    if not get_session(settings.db_path, session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+    try:
+        out = tool_update_checklist_many(settings.db_path, session_id, [(u.item, u.status) for u in req.items])
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return ChecklistPatchResponse(session_id=session_id, **{k: v for k, v in out.items() if k != "ok"})
+
+
+@app.get("/sessions/{session_id}/snapshot", response_model=SessionSnapshot)
+def get_session_snapshot_api(session_id: str, messages: int = Query(50, ge=0, le=500)):
+    """Session, profile, checklist and the last `messages` messages in one round trip."""
+    snap = get_session_snapshot(settings.db_path, session_id, messages)
+    if not snap:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return snap
 
 
 @app.get("/sessions/{session_id}/profile")
@@ -156,31 +298,70 @@ def get_profile_api(session_id: str):
         raise HTTPException(status_code=404, detail="Profile not found for this session")
     return p
 
+@app.get("/rag/stats")
+def rag_stats_api():
+    """Search cache counters (hits, misses, evictions) and the loaded index version."""
+    r = _get_retriever()
+    return {"index_version": r.version, "passages": len(r.docs), "query_cache": r.cache.stats() if r.cache else None}
+
+@app.get("/llm/stats")
+def llm_stats_api():
+    """Response cache counters, the most-hit entries, and replies actually produced by the provider."""
+    return {
+        "provider": llm.provider,
+        "model": llm.model,
+        "provider_calls": llm.provider_calls,
+        "provider_stats": llm.backend.stats() if hasattr(llm.backend, "stats") else None,
+        "response_cache": llm.cache.stats() if llm.cache else None,
+        "top_entries": llm.cache.top_entries() if llm.cache else [],
+    }
+
+def _escalation_reply(decision) -> str:
+    return ("This question may involve high-stakes policy or integrity issues. "
+            "I recommend contacting the admissions office or a counselor for guidance. "
+            f"(Reason: {decision.reason})")
+
+def _screen(session: dict, message: str):
+    """Policy screening plus retrieval for RAG-bound messages; runs off the event loop."""
+    decision = should_escalate(message)
+    if decision.escalated_to_human:
+        return decision, None
+    r = _get_retriever()
+    hits = r.search(message, top_k=settings.top_k_docs) if classify(session, message) == "rag" else None
+    return decision, hits
+
+def _record_turn(session_id: str, message: str, reply: str) -> None:
+    add_message(settings.db_path, session_id, "user", message)
+    add_message(settings.db_path, session_id, "assistant", reply)
+
 @app.post("/chat", response_model=ChatResponse)
-def chat(req: ChatRequest):
-    s = get_session(settings.db_path, req.session_id)
+async def chat(req: ChatRequest):
+    # Async turn: SQLite reads run on the db executor, screening and retrieval on
+    # a worker thread, and the provider call is awaited, so a chat waiting on a
+    # slow LLM holds no thread. All writes land in one transaction at the end.
+    s = await aget_session(settings.db_path, req.session_id)
     if not s:
         raise HTTPException(status_code=404, detail="Session not found")
 
-    add_message(settings.db_path, req.session_id, "user", req.message)
-
-    # policy screening
-    decision = should_escalate(req.message)
+    # Only the non-RAG agents read the checklist; the nudge needs just the progress row.
+    needs_checklist = classify(s, req.message) != "rag"
+    (decision, hits), cl, state = await asyncio.gather(
+        asyncio.to_thread(_screen, s, req.message),
+        aget_checklist(settings.db_path, req.session_id) if needs_checklist else _none(),
+        aget_completion_state(settings.db_path, req.session_id),
+    )
     if decision.escalated_to_human:
-        reply = ("This question may involve high-stakes policy or integrity issues. "
-                 "I recommend contacting the admissions office or a counselor for guidance. "
-                 f"(Reason: {decision.reason})")
-        add_message(settings.db_path, req.session_id, "assistant", reply)
+        reply = _escalation_reply(decision)
+        await arun_in_transaction(settings.db_path, _record_turn, req.session_id, req.message, reply)
         return ChatResponse(session_id=req.session_id, reply=reply, actions=[{"tool":"escalate","reason":decision.reason}],
                             citations=[], escalated_to_human=True)
 
-    r = _get_retriever()
-    result = route(r, llm, settings.db_path, s, req.message)
+    result = await aroute(_get_retriever(), llm, settings.db_path, s, req.message, hits=hits, current_checklist=cl)
 
     # Always append a completion nudge so the demo "pushes" applicants toward file completion.
-    final_reply = result.reply + _make_completion_nudge(req.session_id)
+    final_reply = result.reply + _completion_nudge(state)
 
-    add_message(settings.db_path, req.session_id, "assistant", final_reply)
+    await arun_in_transaction(settings.db_path, _record_turn, req.session_id, req.message, final_reply)
     return ChatResponse(
         session_id=req.session_id,
         reply=final_reply,
@@ -188,3 +369,124 @@ def chat(req: ChatRequest):
         citations=[Citation(**c) for c in result.citations],
         escalated_to_human=result.escalated_to_human,
     )
+
+async def _none() -> None:
+    return None
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.post("/chat/stream")
+async def chat_stream(req: ChatRequest):
+    """/chat as Server-Sent Events.
+
+    Events: `token` ({"text"}) while the reply is generated, then `citations`,
+    `actions`, `nudge` ({"text"}) and `done` ({"escalated_to_human"}). The
+    checklist/profile reads behind the nudge run while tokens stream, so they
+    never delay the first token. The turn is stored once the stream finishes.
+    """
+    s = await aget_session(settings.db_path, req.session_id)
+    if not s:
+        raise HTTPException(status_code=404, detail="Session not found")
+    decision, hits = await asyncio.to_thread(_screen, s, req.message)
+
+    async def events():
+        if decision.escalated_to_human:
+            reply = _escalation_reply(decision)
+            yield _sse("token", {"text": reply})
+            yield _sse("citations", [])
+            yield _sse("actions", [{"tool":"escalate","reason":decision.reason}])
+            await arun_in_transaction(settings.db_path, _record_turn, req.session_id, req.message, reply)
+            yield _sse("done", {"escalated_to_human": True})
+            return
+
+        progress = asyncio.ensure_future(aget_completion_state(settings.db_path, req.session_id))
+        try:
+            # Only the non-RAG agents read the checklist before replying.
+            cl = None if classify(s, req.message) == "rag" else await aget_checklist(settings.db_path, req.session_id)
+            result, chunks = await astream_route(_get_retriever(), llm, settings.db_path, s, req.message,
+                                                 hits=hits, current_checklist=cl)
+            parts = []
+            async for chunk in chunks:
+                parts.append(chunk)
+                yield _sse("token", {"text": chunk})
+            yield _sse("citations", result.citations)
+            yield _sse("actions", result.actions)
+
+            nudge = _completion_nudge(await progress)
+            yield _sse("nudge", {"text": nudge})
+
+            await arun_in_transaction(settings.db_path, _record_turn, req.session_id, req.message,
+                                      "".join(parts) + nudge)
+            yield _sse("done", {"escalated_to_human": result.escalated_to_human})
+        except Exception:
+            yield _sse("error", {"detail": "Chat turn failed"})
+            raise
+        finally:
+            progress.cancel()
+
+    return StreamingResponse(events(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+def _load_batch(session_ids):
+    """Sessions and completion state for a batch, read in one snapshot."""
+    with transaction(settings.db_path, read_only=True):
+        return {sid: (get_session(settings.db_path, sid), get_completion_state(settings.db_path, sid))
+                for sid in session_ids}
+
+def _screen_batch(sessions, messages):
+    """_screen() for a batch: every RAG-bound message is retrieved with one search_many() call."""
+    decisions = [should_escalate(m) for m in messages]
+    rag_turns = [i for i, (s, m, d) in enumerate(zip(sessions, messages, decisions))
+                 if not d.escalated_to_human and classify(s, m) == "rag"]
+    hits = {}
+    if rag_turns:
+        found = _get_retriever().search_many([messages[i] for i in rag_turns], top_k=settings.top_k_docs)
+        hits = dict(zip(rag_turns, found))
+    return decisions, hits
+
+def _record_turns(turns) -> None:
+    for session_id, message, reply in turns:
+        _record_turn(session_id, message, reply)
+
+@app.post("/chat/batch", response_model=ChatBatchResponse)
+async def chat_batch(req: ChatBatchRequest):
+    """Answer many chat turns at once.
+
+    Like /chat, nothing holds the write lock while replies are produced:
+    sessions are read in one snapshot, screening and a single search_many()
+    for the RAG-bound turns run on a worker thread, and the turns are routed
+    concurrently with aroute(), at most settings.chat_batch_concurrency at a
+    time. Every message is then written in one short
+    transaction. Replies come back in request order, and turns for the same
+    session are stored in that order too.
+    """
+    loaded = await run_db(_load_batch, list(dict.fromkeys(item.session_id for item in req.requests)))
+    for sid, (s, _) in loaded.items():
+        if not s:
+            raise HTTPException(status_code=404, detail=f"Session not found: {sid}")
+    sessions = [loaded[item.session_id][0] for item in req.requests]
+    messages = [item.message for item in req.requests]
+    decisions, hits = await asyncio.to_thread(_screen_batch, sessions, messages)
+
+    limit = asyncio.Semaphore(settings.chat_batch_concurrency)
+
+    async def turn(i: int) -> ChatResponse:
+        s, d = sessions[i], decisions[i]
+        if d.escalated_to_human:
+            return ChatResponse(session_id=s["session_id"], reply=_escalation_reply(d),
+                                actions=[{"tool":"escalate","reason":d.reason}], citations=[], escalated_to_human=True)
+        async with limit:
+            result = await aroute(_get_retriever(), llm, settings.db_path, s, messages[i], hits=hits.get(i))
+        return ChatResponse(
+            session_id=s["session_id"],
+            reply=result.reply + _completion_nudge(loaded[s["session_id"]][1]),
+            actions=result.actions,
+            citations=[Citation(**c) for c in result.citations],
+            escalated_to_human=result.escalated_to_human,
+        )
+
+    responses = await asyncio.gather(*(turn(i) for i in range(len(messages))))
+    await arun_in_transaction(settings.db_path, _record_turns,
+                              [(r.session_id, m, r.reply) for r, m in zip(responses, messages)])
+    return ChatBatchResponse(responses=responses)
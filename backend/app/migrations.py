@@ -0,0 +1,198 @@
+"""Versioned schema migrations for the SQLite store.
+
+Each migration runs once, in its own transaction, and is recorded in
+`schema_version`. Append new steps to MIGRATIONS; never edit applied ones.
+"""
+from __future__ import annotations
+
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List, Optional
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    description: str
+    apply: Callable[[sqlite3.Connection], None]
+
+
+def _sql(*statements: str) -> Callable[[sqlite3.Connection], None]:
+    def apply(conn: sqlite3.Connection) -> None:
+        for stmt in statements:
+            conn.execute(stmt)
+    return apply
+
+
+# applicants.CHECKLIST_ITEMS when v4 was written; migrations are frozen, so the list is copied here.
+_V4_ITEMS = ("SAT score", "Official transcripts", "Essays", "Letters of recommendation")
+
+
+def _refresh_progress_sql(session_ref: str, source: str = "") -> str:
+    """INSERT...SELECT that recomputes session_progress for `session_ref` from its checklist rows."""
+    items = ",".join(f"'{item}'" for item in _V4_ITEMS)
+    ordered = ",".join(f"('{item}',{i})" for i, item in enumerate(_V4_ITEMS))
+    return f"""INSERT INTO session_progress(session_id, file_completion_pct, missing_items, updated_at)
+      SELECT {session_ref},
+        CAST(ROUND(100.0 * (SELECT COUNT(*) FROM checklist c WHERE c.session_id = {session_ref}
+                              AND c.status = 'complete' AND c.item IN ({items})) / {len(_V4_ITEMS)}) AS INTEGER),
+        (SELECT json_group_array(item) FROM (
+           SELECT v.column1 AS item FROM (VALUES {ordered}) AS v
+           WHERE NOT EXISTS (SELECT 1 FROM checklist c WHERE c.session_id = {session_ref}
+                               AND c.item = v.column1 AND c.status = 'complete')
+           ORDER BY v.column2)),
+        strftime('%Y-%m-%dT%H:%M:%f', 'now')
+      {source} WHERE true
+      ON CONFLICT(session_id) DO UPDATE SET
+        file_completion_pct = excluded.file_completion_pct,
+        missing_items = excluded.missing_items,
+        updated_at = excluded.updated_at"""
+
+
+MIGRATIONS: List[Migration] = [
+    # v1 is the original init_db() schema; IF NOT EXISTS adopts databases created before migrations.
+    Migration(1, "baseline tables", _sql(
+        """CREATE TABLE IF NOT EXISTS sessions (
+          session_id TEXT PRIMARY KEY,
+          name TEXT NOT NULL,
+          segment TEXT NOT NULL,
+          target_program TEXT NOT NULL,
+          deadline TEXT NULL,
+          created_at TEXT NOT NULL
+        )""",
+        """CREATE TABLE IF NOT EXISTS checklist (
+          session_id TEXT NOT NULL,
+          item TEXT NOT NULL,
+          status TEXT NOT NULL,
+          updated_at TEXT NOT NULL,
+          PRIMARY KEY (session_id, item)
+        )""",
+        """CREATE TABLE IF NOT EXISTS messages (
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          session_id TEXT NOT NULL,
+          role TEXT NOT NULL,
+          content TEXT NOT NULL,
+          created_at TEXT NOT NULL
+        )""",
+        # Optional profile info for demo applicants (stored per session)
+        """CREATE TABLE IF NOT EXISTS applicant_profiles (
+          session_id TEXT PRIMARY KEY,
+          applicant_number TEXT NULL,
+          last_name TEXT NULL,
+          first_name TEXT NULL,
+          sat INTEGER NULL,
+          gpa REAL NULL,
+          extracurriculars TEXT NULL,
+          estimated_chance_pct INTEGER NULL,
+          file_completion_pct INTEGER NULL,
+          updated_at TEXT NOT NULL
+        )""",
+    )),
+    Migration(2, "hot-path indexes for history and checklist reads", _sql(
+        "CREATE INDEX IF NOT EXISTS idx_messages_session_id ON messages(session_id, id)",
+        "CREATE INDEX IF NOT EXISTS idx_checklist_session_status ON checklist(session_id, status)",
+    )),
+    Migration(3, "applicant dataset table loaded by scripts.ingest_applicants", _sql(
+        # id is dataset order and the /applicants pagination cursor
+        """CREATE TABLE IF NOT EXISTS applicants (
+          id INTEGER PRIMARY KEY,
+          applicant_number TEXT NOT NULL UNIQUE,
+          last_name TEXT NOT NULL,
+          first_name TEXT NOT NULL,
+          sat INTEGER NOT NULL,
+          gpa REAL NOT NULL,
+          transcripts TEXT NOT NULL,
+          essay TEXT NOT NULL,
+          lor TEXT NOT NULL,
+          extracurriculars TEXT NOT NULL,
+          file_completion_pct INTEGER NOT NULL
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_applicants_completion ON applicants(file_completion_pct, id)",
+        # One partial index per checklist item, holding only applicants for whom it is outstanding
+        "CREATE INDEX IF NOT EXISTS idx_applicants_open_sat ON applicants(id) WHERE sat = 0",
+        "CREATE INDEX IF NOT EXISTS idx_applicants_open_transcripts ON applicants(id) WHERE transcripts != 'complete'",
+        "CREATE INDEX IF NOT EXISTS idx_applicants_open_essay ON applicants(id) WHERE essay != 'complete'",
+        "CREATE INDEX IF NOT EXISTS idx_applicants_open_lor ON applicants(id) WHERE lor != 'complete'",
+        # Bumped by every ingestion batch, so caches of applicant data know when to refresh
+        """CREATE TABLE IF NOT EXISTS applicant_dataset (
+          id INTEGER PRIMARY KEY CHECK (id = 1),
+          version INTEGER NOT NULL,
+          updated_at TEXT NOT NULL
+        )""",
+    )),
+    Migration(4, "session_progress kept current by checklist triggers", _sql(
+        # Denormalized file completion per session, so chat turns read it instead of recomputing it
+        """CREATE TABLE IF NOT EXISTS session_progress (
+          session_id TEXT PRIMARY KEY,
+          file_completion_pct INTEGER NOT NULL,
+          missing_items TEXT NOT NULL,
+          updated_at TEXT NOT NULL
+        )""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_checklist_progress_insert AFTER INSERT ON checklist BEGIN
+          {_refresh_progress_sql("NEW.session_id")};
+        END""",
+        # Also fires for the ON CONFLICT DO UPDATE branch of upsert_checklist_item
+        f"""CREATE TRIGGER IF NOT EXISTS trg_checklist_progress_update AFTER UPDATE OF item, status ON checklist BEGIN
+          {_refresh_progress_sql("NEW.session_id")};
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_checklist_progress_delete AFTER DELETE ON checklist BEGIN
+          {_refresh_progress_sql("OLD.session_id")};
+        END""",
+        _refresh_progress_sql("s.session_id", "FROM (SELECT DISTINCT session_id FROM checklist) AS s"),
+    )),
+    Migration(5, "bulk session onboarding", _sql(
+        # Bulk onboarding skips applicants that already have a session
+        "CREATE INDEX IF NOT EXISTS idx_applicant_profiles_applicant ON applicant_profiles(applicant_number)",
+        # Holds a row only inside a bulk checklist insert's write transaction (never committed).
+        # The insert trigger stands down meanwhile and the loader writes session_progress
+        # itself, once per session instead of once per checklist row.
+        """CREATE TABLE IF NOT EXISTS checklist_bulk_load (
+          id INTEGER PRIMARY KEY CHECK (id = 1)
+        )""",
+        "DROP TRIGGER IF EXISTS trg_checklist_progress_insert",
+        f"""CREATE TRIGGER trg_checklist_progress_insert AFTER INSERT ON checklist
+          WHEN NOT EXISTS (SELECT 1 FROM checklist_bulk_load) BEGIN
+          {_refresh_progress_sql("NEW.session_id")};
+        END""",
+    )),
+]
+
+
+def current_version(conn: sqlite3.Connection) -> int:
+    conn.execute("""CREATE TABLE IF NOT EXISTS schema_version (
+      version INTEGER PRIMARY KEY,
+      description TEXT NOT NULL,
+      applied_at TEXT NOT NULL
+    )""")
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def migrate(conn: sqlite3.Connection, target: Optional[int] = None) -> List[int]:
+    """Apply pending migrations up to `target` (default: latest). Returns applied versions.
+
+    Expects an autocommit connection. Each step takes the write lock with
+    BEGIN IMMEDIATE and re-checks the version, so concurrent workers starting
+    against the same live database apply every step exactly once.
+    """
+    applied: List[int] = []
+    for m in sorted(MIGRATIONS, key=lambda m: m.version):
+        if target is not None and m.version > target:
+            break
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if current_version(conn) >= m.version:
+                conn.execute("COMMIT")
+                continue
+            m.apply(conn)
+            conn.execute(
+                "INSERT INTO schema_version(version,description,applied_at) VALUES (?,?,?)",
+                (m.version, m.description, datetime.utcnow().isoformat()),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        applied.append(m.version)
+    return applied
@@ -13,6 +13,16 @@ class SessionCreate(BaseModel):
     # Optional: create session from a mock applicant profile (demo feature)
     applicant_number: Optional[str] = None
 
+class SessionBulkCreate(BaseModel):
+    segment: Segment = "traditional"
+    target_program: str = Field(..., min_length=2, max_length=128)
+    deadline: Optional[date] = None
+    # Either explicit applicants, or a filter over the dataset (no filter: every applicant)
+    applicant_numbers: Optional[List[str]] = Field(None, min_length=1, max_length=100_000)
+    missing: Optional[str] = None
+    completion: Optional[int] = None
+    skip_existing: bool = False
+
 class Session(BaseModel):
     session_id: str
     name: str
@@ -35,3 +45,39 @@ class ChatResponse(BaseModel):
     actions: List[Dict] = []
     citations: List[Citation] = []
     escalated_to_human: bool = False
+
+class ChatBatchRequest(BaseModel):
+    requests: List[ChatRequest] = Field(..., min_length=1, max_length=10_000)
+
+class ChatBatchResponse(BaseModel):
+    responses: List[ChatResponse] = []
+
+class ChecklistItem(BaseModel):
+    item: str
+    status: str
+    updated_at: str
+
+class Message(BaseModel):
+    role: str
+    content: str
+    created_at: str
+
+class SessionSnapshot(BaseModel):
+    session: Session
+    profile: Optional[Dict] = None
+    checklist: List[ChecklistItem] = []
+    messages: List[Message] = []
+
+class ChecklistUpdate(BaseModel):
+    item: str = Field(..., min_length=1, max_length=128)
+    status: str
+
+class ChecklistPatch(BaseModel):
+    items: List[ChecklistUpdate] = Field(..., min_length=1, max_length=100)
+
+class ChecklistPatchResponse(BaseModel):
+    session_id: str
+    updated: List[ChecklistUpdate]
+    checklist: List[ChecklistItem]
+    file_completion_pct: int
+    missing_items: List[str]
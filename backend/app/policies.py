@@ -1,29 +1,134 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import Tuple
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional
 
+from .textmatch import PhraseMatch, PhraseMatcher, normalize_phrase
+
+# Whole words, case-insensitive; a trailing * matches any word ending (see textmatch.py).
 HIGH_STAKES_TRIGGERS = [
-    "legal", "lawsuit", "medical", "diagnosis", "disability",
-    "criminal", "felony", "misdemeanor", "court", "immigration",
-    "should i lie", "fake", "fabricate", "cheat", "forge"
+    "legal*", "illegal*", "paralegal*", "lawsuit*", "medical*", "diagnos*", "disabilit*",
+    "criminal*", "felon*", "misdemeanor*", "court", "courts", "courtroom*", "courthouse*", "immigra*",
+    "should i lie", "fake*", "faking", "fabricat*", "cheat*",
+    "forge", "forged", "forges", "forging", "forger*",
 ]
 
+NO_GUARANTEE_PHRASES = ["guarantee*", "certainly admitted", "will be admitted", "100%"]
+NO_GUARANTEE_REPLACEMENT = "cannot guarantee"
+
 @dataclass
 class PolicyDecision:
     escalated_to_human: bool
     reason: str = ""
+    # Every trigger found, with its position in the message
+    matches: List[PhraseMatch] = field(default_factory=list)
+
+class PolicyEngine:
+    """Escalation triggers and no-guarantee phrases, each compiled once into a PhraseMatcher.
+
+    A message or reply is scanned in one pass whatever the size of the rule set.
+    """
+
+    def __init__(self, escalation_triggers: Iterable[str] = HIGH_STAKES_TRIGGERS,
+                 no_guarantee_phrases: Iterable[str] = NO_GUARANTEE_PHRASES):
+        self.escalation = PhraseMatcher(escalation_triggers)
+        self.no_guarantees = PhraseMatcher(no_guarantee_phrases)
+
+    @classmethod
+    def from_file(cls, path: str) -> "PolicyEngine":
+        """Load an institution's rules from JSON.
+
+        {"escalate": [...], "no_guarantees": [...], "extend_defaults": true}
+        With extend_defaults (the default) the built-in lists are kept.
+        """
+        with open(path, "r", encoding="utf-8") as f:
+            rules = json.load(f)
+        extend = rules.get("extend_defaults", True)
+        escalate = list(rules.get("escalate", []))
+        no_guarantees = list(rules.get("no_guarantees", []))
+        if extend:
+            escalate = HIGH_STAKES_TRIGGERS + escalate
+            no_guarantees = NO_GUARANTEE_PHRASES + no_guarantees
+        return cls(escalate, no_guarantees)
+
+    def should_escalate(self, user_text: str) -> PolicyDecision:
+        matches = list(self.escalation.finditer(user_text))
+        if matches:
+            trigger = normalize_phrase(matches[0].text)
+            return PolicyDecision(True, f"High-stakes or integrity-related query trigger: '{trigger}'", matches)
+        return PolicyDecision(False, "")
+
+    def enforce_no_guarantees(self, reply: str) -> str:
+        # Guardrail: avoid absolute guarantees or admissions predictions.
+        return self.no_guarantees.sub(NO_GUARANTEE_REPLACEMENT, reply)
+
+_engine = PolicyEngine()
+
+def get_policy_engine() -> PolicyEngine:
+    return _engine
+
+def set_policy_engine(engine: PolicyEngine) -> None:
+    global _engine
+    _engine = engine
+
+def load_policy_rules(path: str) -> PolicyEngine:
+    """Replace the process-wide rules with the ones in `path` (see PolicyEngine.from_file)."""
+    engine = PolicyEngine.from_file(path)
+    set_policy_engine(engine)
+    return engine
 
 def should_escalate(user_text: str) -> PolicyDecision:
-    t = user_text.lower()
-    for k in HIGH_STAKES_TRIGGERS:
-        if k in t:
-            return PolicyDecision(True, f"High-stakes or integrity-related query trigger: '{k}'")
-    return PolicyDecision(False, "")
+    return _engine.should_escalate(user_text)
 
 def enforce_no_guarantees(reply: str) -> str:
-    # Guardrail: avoid absolute guarantees or admissions predictions.
-    banned = ["guarantee", "certainly admitted", "will be admitted", "100%"]
-    out = reply
-    for b in banned:
-        out = out.replace(b, "cannot guarantee")
-    return out
+    return _engine.enforce_no_guarantees(reply)
+
+_RUN = re.compile(r"\S+")
+
+class NoGuaranteesStream:
+    """enforce_no_guarantees() for a reply that arrives in chunks.
+
+    A phrase can be split across chunks, so the last few words (as many as the
+    longest phrase has) are held back until the next chunk or flush(). Text is
+    only released up to a point no phrase straddles, and the result equals
+    enforce_no_guarantees() over the whole reply.
+    """
+
+    def __init__(self, engine: Optional[PolicyEngine] = None):
+        self._matcher = (engine or get_policy_engine()).no_guarantees
+        self._hold_words = max((len(p.split()) for p in self._matcher.phrases), default=0)
+        self._pending = ""
+        # Last released character, so word boundaries are judged as in one pass
+        self._prev = ""
+
+    def feed(self, chunk: str) -> str:
+        self._pending += chunk
+        if self._hold_words == 0:
+            return self._release(len(self._pending), final=True)
+        runs = [m.start() for m in _RUN.finditer(self._pending)]
+        if len(runs) <= self._hold_words:
+            return ""
+        return self._release(runs[-self._hold_words], final=False)
+
+    def flush(self) -> str:
+        return self._release(len(self._pending), final=True)
+
+    def _release(self, cut: int, final: bool) -> str:
+        text = self._prev + self._pending
+        off = len(self._prev)
+        out = []
+        pos = off
+        for m in self._matcher.finditer(text, off):
+            # A match starting before the cut is complete; release through its end.
+            if not final and m.start >= off + cut:
+                break
+            out.append(text[pos:m.start])
+            out.append(NO_GUARANTEE_REPLACEMENT)
+            pos = m.end
+            cut = max(cut, m.end - off)
+        out.append(text[pos:off + cut])
+        released, self._pending = self._pending[:cut], self._pending[cut:]
+        if released:
+            self._prev = released[-1]
+        return "".join(out)
@@ -0,0 +1,166 @@
+"""Search result cache for TfidfRetriever.
+
+Entries are keyed on (index version, normalized query, top_k) and hold passage
+row ids plus scores, never Doc objects. A rebuilt index therefore never serves
+stale rows. An in-process LRU with optional TTL sits in front of an optional
+SQLite tier that survives restarts and is shared by every worker pointing at
+the same file.
+"""
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+Hits = List[Tuple[int, float]]
+
+
+class SqliteQueryStore:
+    """Shared, persistent tier: one row per cached query, bounded by `max_entries`."""
+
+    def __init__(self, path: str, max_entries: int = 100_000, ttl_s: Optional[float] = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS query_cache (
+          key TEXT PRIMARY KEY,
+          hits TEXT NOT NULL,
+          created_at REAL NOT NULL,
+          last_used REAL NOT NULL
+        )""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_query_cache_last_used ON query_cache(last_used)")
+        self._writes = 0
+
+    def get(self, key: str) -> Optional[Hits]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT hits, created_at FROM query_cache WHERE key=?", (key,)).fetchone()
+            if row is None:
+                return None
+            if self.ttl_s is not None and now - row[1] > self.ttl_s:
+                self._conn.execute("DELETE FROM query_cache WHERE key=?", (key,))
+                return None
+            self._conn.execute("UPDATE query_cache SET last_used=? WHERE key=?", (now, key))
+        return [(int(i), float(s)) for i, s in json.loads(row[0])]
+
+    def put(self, key: str, hits: Hits) -> int:
+        """Store `hits`; returns how many least-recently-used rows were evicted."""
+        now = time.time()
+        evicted = 0
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO query_cache(key, hits, created_at, last_used) VALUES (?,?,?,?)",
+                (key, json.dumps(hits), now, now),
+            )
+            self._writes += 1
+            # Trimming needs a COUNT(*); amortize it over writes.
+            if self._writes % 64 == 0:
+                n = self._conn.execute("SELECT COUNT(*) FROM query_cache").fetchone()[0]
+                if n > self.max_entries:
+                    evicted = self._conn.execute(
+                        "DELETE FROM query_cache WHERE key IN "
+                        "(SELECT key FROM query_cache ORDER BY last_used LIMIT ?)", (n - self.max_entries,)
+                    ).rowcount
+        return evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM query_cache")
+
+
+class QueryCache:
+    """Bounded LRU/TTL cache in front of TfidfRetriever.search()."""
+
+    def __init__(self, max_entries: int = 1024, ttl_s: Optional[float] = None,
+                 store: Optional[SqliteQueryStore] = None):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.store = store
+        self._entries: "OrderedDict[str, Tuple[float, Hits]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version: Optional[str] = None
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(version: str, normalized_query: str, top_k: int) -> str:
+        return f"{version}:{top_k}:{normalized_query}"
+
+    def _check_version(self, version: str) -> None:
+        # A new index version makes every in-memory entry unreachable; drop them eagerly.
+        if version != self._version:
+            if self._entries:
+                self.invalidations += len(self._entries)
+                self._entries.clear()
+            self._version = version
+
+    def get(self, version: str, normalized_query: str, top_k: int) -> Optional[Hits]:
+        key = self.make_key(version, normalized_query, top_k)
+        now = time.monotonic()
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is not None and (self.ttl_s is None or now - entry[0] <= self.ttl_s):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+        if self.store is not None:
+            hits = self.store.get(key)
+            if hits is not None:
+                with self._lock:
+                    self.shared_hits += 1
+                    self._insert(key, hits, now)
+                return hits
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, version: str, normalized_query: str, top_k: int, hits: Hits) -> None:
+        key = self.make_key(version, normalized_query, top_k)
+        with self._lock:
+            self._check_version(version)
+            self._insert(key, hits, time.monotonic())
+        if self.store is not None:
+            evicted = self.store.put(key, hits)
+            with self._lock:
+                self.evictions += evicted
+
+    def _insert(self, key: str, hits: Hits, now: float) -> None:
+        self._entries[key] = (now, hits)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+        if self.store is not None:
+            self.store.clear()
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "hit_rate": round((self.hits + self.shared_hits) / lookups, 4) if lookups else 0.0,
+                "index_version": self._version,
+            }
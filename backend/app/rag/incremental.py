@@ -0,0 +1,224 @@
+"""Incremental TF-IDF index builds.
+
+The build cache is one SQLite file holding:
+- a manifest of content hashes per document
+- each document's raw per-passage term counts, stored by content hash as term
+  ids plus counts
+- the global term table those ids point into
+
+A rebuild re-tokenizes only added or changed documents and drops removed ones.
+Vocabulary, IDF and row normalization are then recomputed from the stored
+counts with vectorized array operations. The result matches
+TfidfRetriever.build(), except for which terms survive a tie at the
+max_features cutoff (broken alphabetically here).
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from .retriever import (
+    ANALYZER_PARAMS,
+    CHUNK_CHARS,
+    CHUNK_OVERLAP,
+    MAX_FEATURES,
+    Doc,
+    Passage,
+    TfidfRetriever,
+    _index_text,
+    chunk_document,
+)
+
+
+@dataclass
+class BuildReport:
+    added: List[str] = field(default_factory=list)
+    changed: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    reused: List[str] = field(default_factory=list)
+    n_passages: int = 0
+    seconds: float = 0.0
+    full_rebuild: bool = False
+
+
+_SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS params (id INTEGER PRIMARY KEY CHECK (id = 1), value TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS terms (id INTEGER PRIMARY KEY, term TEXT NOT NULL)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS idx_terms_term ON terms(term)",
+    # ids/counts are raw int64/float64 arrays; passages is JSON [[heading, start, end, n_terms], ...]
+    "CREATE TABLE IF NOT EXISTS doc_stats (digest TEXT PRIMARY KEY, ids BLOB NOT NULL, counts BLOB NOT NULL, passages TEXT NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS manifest (doc_id TEXT PRIMARY KEY, digest TEXT NOT NULL)",
+]
+
+
+class IncrementalIndexBuilder:
+    def __init__(self, cache_dir: str, max_chars: int = CHUNK_CHARS, overlap: int = CHUNK_OVERLAP,
+                 max_features: int = MAX_FEATURES):
+        self.cache_dir = cache_dir
+        self.max_chars = max_chars
+        self.overlap = overlap
+        self.max_features = max_features
+        self.params = json.dumps({
+            "max_chars": max_chars,
+            "overlap": overlap,
+            "max_features": max_features,
+            "analyzer": {"stop_words": ANALYZER_PARAMS["stop_words"], "ngram_range": list(ANALYZER_PARAMS["ngram_range"])},
+        }, sort_keys=True)
+        self._analyze = TfidfVectorizer(**ANALYZER_PARAMS).build_analyzer()
+        self._term_ids: Dict[str, int] = {}
+        self._fresh = False
+
+    def _open(self) -> Tuple[sqlite3.Connection, bool]:
+        """Open the cache; returns (conn, fresh). Parameter changes invalidate everything."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        conn = sqlite3.connect(os.path.join(self.cache_dir, "build_cache.db"), isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        for stmt in _SCHEMA:
+            conn.execute(stmt)
+        row = conn.execute("SELECT value FROM params WHERE id=1").fetchone()
+        if row and row[0] == self.params:
+            return conn, False
+        conn.execute("BEGIN")
+        for table in ("terms", "doc_stats", "manifest", "params"):
+            conn.execute(f"DELETE FROM {table}")
+        conn.execute("INSERT INTO params(id, value) VALUES (1, ?)", (self.params,))
+        conn.execute("COMMIT")
+        return conn, True
+
+    def _tokenize(self, conn: sqlite3.Connection, doc: Doc) -> Tuple[bytes, bytes, str]:
+        per_passage = []
+        for p in chunk_document(doc, self.max_chars, self.overlap):
+            per_passage.append((p, Counter(self._analyze(_index_text(p)))))
+        term_id = self._term_ids
+        unseen = sorted({t for _, c in per_passage for t in c if t not in term_id})
+        if unseen and not self._fresh:
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS lookup (term TEXT PRIMARY KEY)")
+            conn.execute("DELETE FROM lookup")
+            conn.executemany("INSERT INTO lookup(term) VALUES (?)", ((t,) for t in unseen))
+            term_id.update(conn.execute("SELECT t.term, t.id FROM lookup l JOIN terms t ON t.term = l.term"))
+        new = [t for t in unseen if t not in term_id]
+        if new:
+            next_id = conn.execute("SELECT COALESCE(MAX(id), -1) + 1 FROM terms").fetchone()[0]
+            term_id.update(zip(new, range(next_id, next_id + len(new))))
+            conn.executemany("INSERT INTO terms(id, term) VALUES (?,?)", ((term_id[t], t) for t in new))
+        ids: List[int] = []
+        counts: List[int] = []
+        passages = []
+        for p, c in per_passage:
+            ids.extend(term_id[t] for t in c)
+            counts.extend(c.values())
+            passages.append([p.heading, p.start, p.end, len(c)])
+        return (np.asarray(ids, dtype=np.int64).tobytes(), np.asarray(counts, dtype=np.float64).tobytes(),
+                json.dumps(passages))
+
+    def build(self, docs: List[Doc]) -> Tuple[TfidfRetriever, BuildReport]:
+        t0 = time.perf_counter()
+        conn, fresh = self._open()
+        self._term_ids = {}  # term -> id, for terms seen during this build
+        self._fresh = fresh
+        report = BuildReport(full_rebuild=fresh)
+        try:
+            conn.execute("BEGIN")
+            if fresh:
+                # Bulk-load the term table and index it once at the end instead of per insert.
+                conn.execute("DROP INDEX IF EXISTS idx_terms_term")
+            old_docs = dict(conn.execute("SELECT doc_id, digest FROM manifest"))
+            have = {r[0] for r in conn.execute("SELECT digest FROM doc_stats")}
+            new_docs: Dict[str, str] = {}
+            for d in docs:
+                digest = hashlib.sha256(d.text.encode("utf-8")).hexdigest()
+                new_docs[d.doc_id] = digest
+                if digest in have:
+                    if old_docs.get(d.doc_id) == digest:
+                        report.reused.append(d.doc_id)
+                        continue
+                else:
+                    conn.execute("INSERT INTO doc_stats(digest, ids, counts, passages) VALUES (?,?,?,?)",
+                                 (digest, *self._tokenize(conn, d)))
+                    have.add(digest)
+                (report.changed if d.doc_id in old_docs else report.added).append(d.doc_id)
+            report.removed = sorted(set(old_docs) - set(new_docs))
+            if fresh:
+                conn.execute("CREATE UNIQUE INDEX idx_terms_term ON terms(term)")
+
+            conn.execute("DELETE FROM manifest")
+            conn.executemany("INSERT INTO manifest(doc_id, digest) VALUES (?,?)", new_docs.items())
+            conn.execute("DELETE FROM doc_stats WHERE digest NOT IN (SELECT digest FROM manifest)")
+            stats = {digest: (ids, counts, passages) for digest, ids, counts, passages in
+                     conn.execute("SELECT digest, ids, counts, passages FROM doc_stats")}
+            retriever = self._assemble(conn, [(d, stats[new_docs[d.doc_id]]) for d in docs])
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+        report.n_passages = len(retriever.docs)
+        report.seconds = time.perf_counter() - t0
+        return retriever, report
+
+    def _select_vocabulary(self, conn: sqlite3.Connection, tf: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """The max_features most frequent terms (ties alphabetical), as (term ids, terms) in sorted term order."""
+        live = np.flatnonzero(tf > 0)
+        if len(live) > self.max_features:
+            cutoff = -np.partition(-tf[live], self.max_features - 1)[self.max_features - 1]
+            above = live[tf[live] > cutoff]
+            tied = live[tf[live] == cutoff]
+            conn.execute("CREATE TEMP TABLE IF NOT EXISTS tied (id INTEGER PRIMARY KEY)")
+            conn.execute("DELETE FROM tied")
+            conn.executemany("INSERT INTO tied(id) VALUES (?)", ((int(i),) for i in tied))
+            take = [r[0] for r in conn.execute(
+                "SELECT t.id FROM terms t JOIN tied USING (id) ORDER BY t.term LIMIT ?",
+                (self.max_features - len(above),))]
+            live = np.concatenate([above, np.asarray(take, dtype=np.int64)])
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS kept (id INTEGER PRIMARY KEY)")
+        conn.execute("DELETE FROM kept")
+        conn.executemany("INSERT INTO kept(id) VALUES (?)", ((int(i),) for i in live))
+        rows = conn.execute("SELECT t.id, t.term FROM terms t JOIN kept USING (id) ORDER BY t.term").fetchall()
+        return np.asarray([r[0] for r in rows], dtype=np.int64), np.asarray([r[1] for r in rows], dtype=str)
+
+    def _assemble(self, conn: sqlite3.Connection, per_doc: List[Tuple[Doc, Tuple[bytes, bytes, str]]]) -> TfidfRetriever:
+        passages: List[Passage] = []
+        ids_parts, count_parts, row_lens = [], [], []
+        for d, (ids, counts, meta) in per_doc:
+            for heading, start, end, n in json.loads(meta):
+                passages.append(Passage(doc_id=d.doc_id, title=d.title, text=d.text[start:end],
+                                        heading=heading, start=start, end=end))
+                row_lens.append(n)
+            ids_parts.append(np.frombuffer(ids, dtype=np.int64))
+            count_parts.append(np.frombuffer(counts, dtype=np.float64))
+        n_rows = len(passages)
+        ids = np.concatenate(ids_parts) if ids_parts else np.zeros(0, dtype=np.int64)
+        counts = np.concatenate(count_parts) if count_parts else np.zeros(0)
+        n_all = int(ids.max()) + 1 if len(ids) else 0
+
+        tf = np.bincount(ids, weights=counts, minlength=n_all)
+        kept_ids, terms = self._select_vocabulary(conn, tf)
+        col_of = np.full(n_all, -1, dtype=np.int64)
+        col_of[kept_ids] = np.arange(len(kept_ids))
+        cols = col_of[ids]
+        mask = cols >= 0
+        rows = np.repeat(np.arange(n_rows), np.asarray(row_lens, dtype=np.int64))[mask]
+        m = sp.csr_matrix((counts[mask], (rows, cols[mask])), shape=(n_rows, len(terms)))
+        m.sort_indices()
+
+        # Smoothed IDF and l2 row normalization, as TfidfVectorizer's defaults.
+        df = np.bincount(m.indices, minlength=len(terms))
+        idf = np.log((1 + n_rows) / (1 + df)) + 1.0
+        m = m.multiply(idf).tocsr()
+        norms = np.sqrt(np.asarray(m.multiply(m).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        m = sp.csr_matrix(sp.diags(1.0 / norms) @ m)
+        return TfidfRetriever(vectorizer=None, docs=passages, matrix=m, terms=terms, idf=idf,
+                              analyzer_params=ANALYZER_PARAMS)
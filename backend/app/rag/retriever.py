@@ -1,13 +1,22 @@
 from __future__ import annotations
 import os
+import re
 import glob
+import hashlib
+import json
+import mmap
 import pickle
+import shutil
+import uuid
 from dataclasses import dataclass
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Iterator, Optional, Sequence, Any
 
 import numpy as np
+import scipy.sparse as sp
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+
+from .search import InvertedIndex
+from .cache import QueryCache
 
 @dataclass
 class Doc:
@@ -15,11 +24,168 @@ class Doc:
     title: str
     text: str
 
+@dataclass
+class Passage(Doc):
+    """A chunk of a source Doc. `text` is `source_text[start:end]` under `heading`."""
+    heading: str = ""
+    start: int = 0
+    end: int = 0
+
+    @property
+    def passage_id(self) -> str:
+        return f"{self.doc_id}#{self.start}-{self.end}"
+
+CHUNK_CHARS = 800
+CHUNK_OVERLAP = 150
+
+_HEADING_RE = re.compile(r"^#{1,6}[ \t]+(.*?)[ \t#]*$", re.M)
+
+def _sections(text: str) -> Iterator[Tuple[int, int, Optional[str]]]:
+    """Yield (start, end, heading) spans, one per markdown heading."""
+    marks = [(m.start(), m.group(1).strip()) for m in _HEADING_RE.finditer(text)]
+    if not marks or marks[0][0] > 0:
+        marks.insert(0, (0, None))
+    for i, (start, heading) in enumerate(marks):
+        end = marks[i + 1][0] if i + 1 < len(marks) else len(text)
+        yield start, end, heading
+
+def _trim(text: str, start: int, end: int) -> Tuple[int, int]:
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+def _windows(text: str, start: int, end: int, max_chars: int, overlap: int) -> Iterator[Tuple[int, int]]:
+    """Split [start, end) into overlapping windows, preferring paragraph/line/word breaks."""
+    pos = start
+    while pos < end:
+        stop = min(end, pos + max_chars)
+        if stop < end:
+            floor = pos + max_chars // 2
+            for sep in ("\n\n", "\n", " "):
+                k = text.rfind(sep, floor, stop)
+                if k != -1:
+                    stop = k
+                    break
+        s, e = _trim(text, pos, stop)
+        if e > s:
+            yield s, e
+        if stop >= end:
+            break
+        nxt = max(pos + 1, stop - overlap)
+        k = text.find(" ", nxt, stop)
+        pos = k + 1 if k != -1 else nxt
+
+def chunk_document(doc: Doc, max_chars: int = CHUNK_CHARS, overlap: int = CHUNK_OVERLAP) -> List[Passage]:
+    """Split a document into heading-scoped, overlapping passages with character offsets."""
+    out: List[Passage] = []
+    for sec_start, sec_end, heading in _sections(doc.text):
+        body_start = sec_start
+        if heading is not None:
+            nl = doc.text.find("\n", sec_start, sec_end)
+            body_start = nl + 1 if nl != -1 else sec_end
+        if not doc.text[body_start:sec_end].strip():
+            continue  # heading with no body of its own
+        for s, e in _windows(doc.text, sec_start, sec_end, max_chars, overlap):
+            out.append(Passage(doc_id=doc.doc_id, title=doc.title, text=doc.text[s:e],
+                               heading=heading or doc.title, start=s, end=e))
+    return out
+
+def chunk_documents(docs: List[Doc], max_chars: int = CHUNK_CHARS, overlap: int = CHUNK_OVERLAP) -> List[Passage]:
+    out: List[Passage] = []
+    for d in docs:
+        out.extend([d] if isinstance(d, Passage) else chunk_document(d, max_chars, overlap))
+    return out
+
+def _index_text(doc: Doc) -> str:
+    # Index passages under their heading so a hit on the section title finds its body.
+    if isinstance(doc, Passage) and doc.heading and doc.heading not in doc.text:
+        return f"{doc.heading}\n{doc.text}"
+    return doc.text
+
+# Tokenization shared by index builds and query encoding; stored with on-disk indexes.
+ANALYZER_PARAMS: Dict[str, Any] = {"stop_words": "english", "ngram_range": (1, 2)}
+INDEX_FORMAT = 1
+MAX_FEATURES = 25000
+
+class _DocStore(Sequence):
+    """Read-only view over doc metadata plus a memory-mapped UTF-8 text blob."""
+
+    def __init__(self, meta: List[Dict[str, Any]], blob: mmap.mmap, offsets: np.ndarray):
+        self._meta = meta
+        self._blob = blob
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._meta)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        m = self._meta[i]
+        text = self._blob[int(self._offsets[i]):int(self._offsets[i + 1])].decode("utf-8")
+        if "heading" in m:
+            return Passage(doc_id=m["doc_id"], title=m["title"], text=text,
+                           heading=m["heading"], start=m["start"], end=m["end"])
+        return Doc(doc_id=m["doc_id"], title=m["title"], text=text)
+
+# save_dir() layout: index_dir/CURRENT names the live gen-* subdirectory.
+# Indexes written before generations keep their files directly in index_dir.
+_CURRENT = "CURRENT"
+_FLAT_FILES = {
+    "data.npy", "indices.npy", "indptr.npy", "idf.npy", "terms.npy", "post_indptr.npy", "post_ids.npy",
+    "post_weights.npy", "post_max.npy", "text.bin", "text_offsets.npy", "meta.json",
+}
+
+def _read_pointer(index_dir: str) -> Optional[str]:
+    try:
+        with open(os.path.join(index_dir, _CURRENT), "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
 class TfidfRetriever:
-    def __init__(self, vectorizer: TfidfVectorizer, docs: List[Doc], matrix):
+    def __init__(self, vectorizer: Optional[TfidfVectorizer], docs: Sequence[Doc], matrix,
+                 terms: Optional[np.ndarray] = None, idf: Optional[np.ndarray] = None,
+                 analyzer_params: Optional[Dict[str, Any]] = None):
         self.vectorizer = vectorizer
         self.docs = docs
         self.matrix = matrix
+        # Queries are encoded from the sorted term table and IDF weights, so a
+        # fitted sklearn vectorizer is only needed at build time.
+        if vectorizer is not None:
+            terms = vectorizer.get_feature_names_out().astype(str)
+            idf = vectorizer.idf_
+            analyzer_params = {"stop_words": vectorizer.stop_words, "ngram_range": vectorizer.ngram_range}
+        self.terms = terms
+        self.idf = idf
+        self.analyzer_params = dict(analyzer_params or ANALYZER_PARAMS)
+        self._analyze = TfidfVectorizer(**self.analyzer_params).build_analyzer()
+        self._index: Optional[InvertedIndex] = None
+        self._version: Optional[str] = None
+        self.cache: Optional[QueryCache] = None
+
+    @property
+    def version(self) -> str:
+        """Content hash of the index; written by save_dir() and read back by open()."""
+        if self._version is None:
+            m = sp.csr_matrix(self.matrix)
+            h = hashlib.sha256()
+            for arr in (m.indptr, m.indices, m.data, np.asarray(self.idf)):
+                h.update(np.ascontiguousarray(arr).tobytes())
+            h.update("\x1f".join(str(t) for t in self.terms).encode("utf-8"))
+            for d in self.docs:
+                h.update(f"{d.doc_id}\x1f{getattr(d, 'start', 0)}\x1f{getattr(d, 'end', 0)}\x1e".encode("utf-8"))
+            self._version = h.hexdigest()[:16]
+        return self._version
+
+    @property
+    def index(self) -> InvertedIndex:
+        """Posting lists for the matrix, built on first use unless loaded by open()."""
+        if self._index is None:
+            self._index = InvertedIndex.from_matrix(self.matrix)
+        return self._index
 
     @staticmethod
     def load_from_folder(folder: str) -> List[Doc]:
@@ -38,9 +204,13 @@ class TfidfRetriever:
         return docs
 
     @classmethod
-    def build(cls, docs: List[Doc]) -> "TfidfRetriever":
-        corpus = [d.text for d in docs]
-        vectorizer = TfidfVectorizer(stop_words="english", ngram_range=(1,2), max_features=25000)
+    def build(cls, docs: List[Doc], chunk: bool = True, max_chars: int = CHUNK_CHARS,
+              overlap: int = CHUNK_OVERLAP) -> "TfidfRetriever":
+        """Index `docs`; by default each one is first split into passages, which become the search units."""
+        if chunk:
+            docs = chunk_documents(docs, max_chars=max_chars, overlap=overlap)
+        corpus = [_index_text(d) for d in docs]
+        vectorizer = TfidfVectorizer(**ANALYZER_PARAMS, max_features=MAX_FEATURES)
         matrix = vectorizer.fit_transform(corpus)
         return cls(vectorizer=vectorizer, docs=docs, matrix=matrix)
 
@@ -58,13 +228,177 @@ class TfidfRetriever:
             vectorizer = pickle.load(f)
         return cls(vectorizer=vectorizer, docs=blob["docs"], matrix=blob["matrix"])
 
+    def save_dir(self, index_dir: str) -> None:
+        """Write the pickle-free index: raw .npy arrays, a sorted term table and a text blob.
+
+        Each save is a new generation subdirectory of index_dir, published by
+        atomically replacing the CURRENT pointer file, so open() always sees a
+        complete index. The previous generation is kept for readers that
+        resolved the pointer just before the flip; older ones are removed.
+        """
+        matrix = sp.csr_matrix(self.matrix)
+        os.makedirs(index_dir, exist_ok=True)
+        gen = f"gen-{uuid.uuid4().hex[:12]}"
+        tmp = os.path.join(index_dir, gen + ".tmp")
+        os.makedirs(tmp)
+        np.save(os.path.join(tmp, "data.npy"), matrix.data.astype(np.float64))
+        np.save(os.path.join(tmp, "indices.npy"), matrix.indices.astype(np.int32))
+        np.save(os.path.join(tmp, "indptr.npy"), matrix.indptr.astype(np.int64))
+        np.save(os.path.join(tmp, "idf.npy"), np.asarray(self.idf, dtype=np.float64))
+        np.save(os.path.join(tmp, "terms.npy"), np.asarray(self.terms, dtype=str))
+        index = self.index
+        np.save(os.path.join(tmp, "post_indptr.npy"), np.asarray(index.indptr, dtype=np.int64))
+        np.save(os.path.join(tmp, "post_ids.npy"), np.asarray(index.postings, dtype=np.int32))
+        np.save(os.path.join(tmp, "post_weights.npy"), np.asarray(index.weights, dtype=np.float64))
+        np.save(os.path.join(tmp, "post_max.npy"), np.asarray(index.max_weight, dtype=np.float64))
+        offsets = [0]
+        meta = []
+        with open(os.path.join(tmp, "text.bin"), "wb") as f:
+            for d in self.docs:
+                raw = d.text.encode("utf-8")
+                f.write(raw)
+                offsets.append(offsets[-1] + len(raw))
+                m = {"doc_id": d.doc_id, "title": d.title}
+                if isinstance(d, Passage):
+                    m.update(heading=d.heading, start=d.start, end=d.end)
+                meta.append(m)
+        np.save(os.path.join(tmp, "text_offsets.npy"), np.asarray(offsets, dtype=np.int64))
+        with open(os.path.join(tmp, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({
+                "format": INDEX_FORMAT,
+                "version": self.version,
+                "shape": list(matrix.shape),
+                "analyzer": self.analyzer_params,
+                "docs": meta,
+            }, f)
+        os.rename(tmp, os.path.join(index_dir, gen))
+        pointer = os.path.join(index_dir, _CURRENT)
+        previous = _read_pointer(index_dir)
+        with open(f"{pointer}.{gen}.tmp", "w", encoding="utf-8") as f:
+            f.write(gen)
+        os.replace(f"{pointer}.{gen}.tmp", pointer)
+        for name in os.listdir(index_dir):
+            path = os.path.join(index_dir, name)
+            if name.startswith("gen-") and name not in (gen, previous):
+                shutil.rmtree(path, ignore_errors=True)
+            elif name in _FLAT_FILES and previous is not None:
+                # Files of the pre-generation layout, no longer current
+                os.remove(path)
+
+    @classmethod
+    def open(cls, index_dir: str) -> "TfidfRetriever":
+        """Memory-map an index written by save_dir().
+
+        Arrays and doc text are mapped read-only, so every worker process opening
+        the same index shares one copy in the OS page cache.
+        """
+        current = _read_pointer(index_dir)
+        if current is not None:
+            index_dir = os.path.join(index_dir, current)
+        meta_path = os.path.join(index_dir, "meta.json")
+        if not os.path.exists(meta_path):
+            raise FileNotFoundError(meta_path)
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("format") != INDEX_FORMAT:
+            raise ValueError(f"Unsupported index format {meta.get('format')!r} in {index_dir}")
+
+        def load(name: str) -> np.ndarray:
+            return np.load(os.path.join(index_dir, name), mmap_mode="r", allow_pickle=False)
+
+        matrix = sp.csr_matrix((load("data.npy"), load("indices.npy"), load("indptr.npy")),
+                               shape=tuple(meta["shape"]), copy=False)
+        with open(os.path.join(index_dir, "text.bin"), "rb") as f:
+            blob = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(f.fileno()).st_size else b""
+        docs = _DocStore(meta["docs"], blob, load("text_offsets.npy"))
+        analyzer = dict(meta["analyzer"], ngram_range=tuple(meta["analyzer"]["ngram_range"]))
+        r = cls(vectorizer=None, docs=docs, matrix=matrix, terms=load("terms.npy"),
+                idf=load("idf.npy"), analyzer_params=analyzer)
+        r._version = meta.get("version")
+        if os.path.exists(os.path.join(index_dir, "post_indptr.npy")):
+            r._index = InvertedIndex(load("post_indptr.npy"), load("post_ids.npy"), load("post_weights.npy"),
+                                     matrix.shape[0], max_weight=load("post_max.npy"))
+        return r
+
+    def encode(self, queries: List[str]) -> sp.csr_matrix:
+        """TF-IDF encode queries (l2-normalized), matching the build-time vectorizer."""
+        return self._encode_tokens([self._analyze(q) for q in queries])
+
+    def _encode_tokens(self, token_lists: List[List[str]]) -> sp.csr_matrix:
+        indptr = [0]
+        indices: List[np.ndarray] = []
+        data: List[np.ndarray] = []
+        n_terms = len(self.terms)
+        for toks in token_lists:
+            if toks and n_terms:
+                uniq, counts = np.unique(np.asarray(toks, dtype=str), return_counts=True)
+                pos = np.minimum(np.searchsorted(self.terms, uniq), n_terms - 1)
+                hit = self.terms[pos] == uniq
+                cols = pos[hit]
+                w = counts[hit] * self.idf[cols]
+                norm = np.sqrt(np.dot(w, w))
+                if norm > 0:
+                    indices.append(cols)
+                    data.append(w / norm)
+                    indptr.append(indptr[-1] + len(cols))
+                    continue
+            indptr.append(indptr[-1])
+        return sp.csr_matrix(
+            (np.concatenate(data) if data else np.zeros(0), np.concatenate(indices) if indices else np.zeros(0, dtype=np.int64), indptr),
+            shape=(len(token_lists), n_terms),
+        )
+
     def search(self, query: str, top_k: int = 4) -> List[Tuple[Doc, float]]:
         if not query.strip():
             return []
-        q = self.vectorizer.transform([query])
-        sims = cosine_similarity(q, self.matrix).ravel()
-        idxs = np.argsort(-sims)[:top_k]
-        return [(self.docs[i], float(sims[i])) for i in idxs if sims[i] > 0]
+        tokens = self._analyze(query)
+        # Queries that analyze to the same tokens encode identically, so they share a cache entry.
+        key = "\x1f".join(tokens)
+        hits = self.cache.get(self.version, key, top_k) if self.cache is not None else None
+        if hits is None:
+            q = self._encode_tokens([tokens])
+            # Rows and query are l2-normalized, so the dot product is the cosine similarity.
+            ids, scores = self.index.top_k(q.indices, q.data, top_k)
+            hits = list(zip(ids.tolist(), scores.tolist()))
+            if self.cache is not None:
+                self.cache.put(self.version, key, top_k, hits)
+        return [(self.docs[i], s) for i, s in hits]
+
+    def search_many(self, queries: List[str], top_k: int = 4) -> List[List[Tuple[Doc, float]]]:
+        """Search many queries at once: one encode pass and one sparse matrix-matrix product.
+
+        Returns one hit list per query, each the same as search() would return.
+        """
+        token_lists = [self._analyze(q) if q.strip() else [] for q in queries]
+        keys = ["\x1f".join(t) for t in token_lists]
+        found: Dict[str, List[Tuple[int, float]]] = {}
+        todo: Dict[str, List[str]] = {}
+        for q, key, toks in zip(queries, keys, token_lists):
+            if not q.strip() or key in found or key in todo:
+                continue
+            hits = self.cache.get(self.version, key, top_k) if self.cache is not None else None
+            if hits is None:
+                todo[key] = toks
+            else:
+                found[key] = hits
+        if todo:
+            q = self._encode_tokens(list(todo.values()))
+            scores = sp.csr_matrix(q @ self.matrix.T)
+            for r, key in enumerate(todo):
+                a, b = scores.indptr[r], scores.indptr[r + 1]
+                ids, vals = scores.indices[a:b], scores.data[a:b]
+                keep = vals > 0
+                ids, vals = ids[keep], vals[keep]
+                if len(ids) > top_k:
+                    top = np.argpartition(-vals, top_k - 1)[:top_k]
+                    ids, vals = ids[top], vals[top]
+                best = np.lexsort((ids, -vals))
+                hits = list(zip(ids[best].tolist(), vals[best].tolist()))
+                found[key] = hits
+                if self.cache is not None:
+                    self.cache.put(self.version, key, top_k, hits)
+        return [[(self.docs[i], s) for i, s in found[key]] if q.strip() else []
+                for q, key in zip(queries, keys)]
 
     @staticmethod
     def make_snippet(text: str, max_len: int = 260) -> str:
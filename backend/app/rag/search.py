@@ -0,0 +1,97 @@
+"""Posting-list top-k search over a passage x term TF-IDF matrix.
+
+The index is the column-major (CSC) view of the matrix: for each term, the sorted
+passage ids that contain it and their weights. A query only touches the posting
+lists of its own terms. Scores are accumulated sparsely, and top-k is selected
+with argpartition. MaxScore early termination lets low-impact terms only rescore
+existing candidates instead of scanning their whole posting lists.
+"""
+from __future__ import annotations
+
+from typing import Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+
+class InvertedIndex:
+    def __init__(self, indptr: np.ndarray, postings: np.ndarray, weights: np.ndarray, n_docs: int,
+                 max_weight: np.ndarray = None):
+        self.indptr = indptr
+        self.postings = postings
+        self.weights = weights
+        self.n_docs = n_docs
+        self.max_weight = max_weight if max_weight is not None else self._max_weights(indptr, weights)
+
+    @classmethod
+    def from_matrix(cls, matrix) -> "InvertedIndex":
+        csc = sp.csc_matrix(matrix)
+        csc.sort_indices()
+        return cls(csc.indptr, csc.indices, csc.data, csc.shape[0])
+
+    @staticmethod
+    def _max_weights(indptr: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        out = np.zeros(len(indptr) - 1, dtype=np.float64)
+        starts = np.asarray(indptr[:-1])
+        nonempty = np.diff(indptr) > 0
+        if nonempty.any():
+            out[nonempty] = np.maximum.reduceat(np.asarray(weights), starts[nonempty])
+        return out
+
+    def _posting(self, term: int) -> Tuple[np.ndarray, np.ndarray]:
+        a, b = self.indptr[term], self.indptr[term + 1]
+        return self.postings[a:b], self.weights[a:b]
+
+    def top_k(self, terms: np.ndarray, q_weights: np.ndarray, k: int,
+              early_termination: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (passage ids, scores) of the k best positive dot-product scores, best first.
+
+        Ties are broken by ascending passage id.
+        """
+        empty = (np.zeros(0, dtype=np.int64), np.zeros(0))
+        if k <= 0 or len(terms) == 0:
+            return empty
+        terms = np.asarray(terms)
+        q_weights = np.asarray(q_weights, dtype=np.float64)
+        upper = q_weights * self.max_weight[terms]
+        order = np.argsort(-upper, kind="stable")
+        terms, q_weights, upper = terms[order], q_weights[order], upper[order]
+        # rest[i]: the most any passage can gain from terms i.. onward.
+        rest = np.concatenate([np.cumsum(upper[::-1])[::-1], [0.0]])
+
+        cand = np.zeros(0, dtype=np.int64)
+        scores = np.zeros(0)
+        i = 0
+        # Essential terms: walk full posting lists until passages not yet seen can no longer reach the top k.
+        while i < len(terms):
+            ids, w = self._posting(terms[i])
+            merged = np.concatenate([cand, ids])
+            vals = np.concatenate([scores, q_weights[i] * w])
+            cand, inv = np.unique(merged, return_inverse=True)
+            scores = np.bincount(inv, weights=vals, minlength=len(cand))
+            i += 1
+            if early_termination and len(cand) >= k and i < len(terms):
+                threshold = np.partition(scores, len(scores) - k)[len(scores) - k]
+                if rest[i] < threshold:
+                    break
+        # Non-essential terms: only rescore passages that are already candidates.
+        if i < len(terms):
+            threshold = np.partition(scores, len(scores) - k)[len(scores) - k]
+            keep = scores + rest[i] >= threshold
+            cand, scores = cand[keep], scores[keep]
+            for j in range(i, len(terms)):
+                ids, w = self._posting(terms[j])
+                if len(ids) == 0:
+                    continue
+                pos = np.searchsorted(ids, cand)
+                pos_c = np.minimum(pos, len(ids) - 1)
+                hit = (pos < len(ids)) & (ids[pos_c] == cand)
+                scores[hit] += q_weights[j] * w[pos_c[hit]]
+
+        positive = scores > 0
+        cand, scores = cand[positive], scores[positive]
+        if len(cand) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            cand, scores = cand[top], scores[top]
+        best = np.lexsort((cand, -scores))
+        return cand[best], scores[best]
@@ -0,0 +1,130 @@
+"""Compile many phrases into one word-bounded regex and scan text in a single pass.
+
+Phrases are merged into a character trie and emitted as one regular expression
+with shared prefixes factored out (court|courts|courtesy -> court(?:esy|s)?), so
+matching cost tracks message length, not the number of phrases, the same
+property an Aho-Corasick automaton gives, but run by the C regex engine.
+
+Phrase syntax:
+  - case-insensitive, whole words only: "court" does not fire on "courtesy"
+  - any run of whitespace matches any run of whitespace: "should i lie"
+  - a trailing "*" matches any word ending: "cheat*" fires on "cheating"
+"""
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional
+
+_END = ""      # trie key: a phrase ends here
+_WILD = "*"    # trie key: a phrase ends here with any word ending
+_SEEN_MAX = 4096
+
+
+@dataclass(frozen=True)
+class PhraseMatch:
+    phrase: str   # the rule as written, e.g. "cheat*"
+    text: str     # the matched text, e.g. "Cheating"
+    start: int
+    end: int
+
+
+def normalize_phrase(phrase: str) -> str:
+    return " ".join(phrase.lower().split())
+
+
+class PhraseMatcher:
+    def __init__(self, phrases: Iterable[str]):
+        self.phrases: List[str] = []
+        self._exact: Dict[str, str] = {}
+        self._prefix: Dict[str, str] = {}
+        # matched text -> rule; matched vocabularies are small, so this stays bounded in practice
+        self._seen: Dict[str, str] = {}
+        trie: dict = {}
+        for raw in phrases:
+            phrase = normalize_phrase(raw)
+            wild = phrase.endswith("*")
+            body = phrase.rstrip("*").rstrip()
+            if not body or phrase in self.phrases:
+                continue
+            self.phrases.append(phrase)
+            (self._prefix if wild else self._exact)[body] = phrase
+            node = trie
+            for ch in body:
+                node = node.setdefault(ch, {})
+            node[_WILD if wild else _END] = {}
+        body = _trie_regex(trie)
+        # Scanning lowercased text with a case-sensitive pattern is ~2x faster than
+        # re.IGNORECASE; the latter is kept for text whose length lower() changes.
+        self.pattern: Optional[re.Pattern] = re.compile(rf"(?<!\w)(?:{body})(?!\w)") if self.phrases else None
+        self._pattern_ic = re.compile(self.pattern.pattern, re.IGNORECASE) if self.phrases else None
+
+    def __len__(self) -> int:
+        return len(self.phrases)
+
+    def _rule(self, text: str) -> str:
+        rule = self._seen.get(text)
+        if rule is None:
+            rule = self._resolve(normalize_phrase(text))
+            if len(self._seen) < _SEEN_MAX:
+                self._seen[text] = rule
+        return rule
+
+    def _resolve(self, t: str) -> str:
+        if t in self._exact:
+            return self._exact[t]
+        for i in range(len(t), 0, -1):
+            if t[:i] in self._prefix:
+                return self._prefix[t[:i]]
+        return t
+
+    def _scan(self, text: str, pos: int = 0) -> Iterator[re.Match]:
+        low = text.lower()
+        return self.pattern.finditer(low, pos) if len(low) == len(text) else self._pattern_ic.finditer(text, pos)
+
+    def finditer(self, text: str, pos: int = 0) -> Iterator[PhraseMatch]:
+        """Every non-overlapping match from `pos`, left to right, longest phrase first at each position.
+
+        Word boundaries at `pos` are judged against the character before it.
+        """
+        if self.pattern is None:
+            return
+        for m in self._scan(text, pos):
+            matched = text[m.start():m.end()]
+            yield PhraseMatch(self._rule(matched), matched, m.start(), m.end())
+
+    def findall(self, text: str) -> List[str]:
+        """The rule behind each match, in order; finditer() without positions, for hot paths."""
+        if self.pattern is None:
+            return []
+        return [self._rule(m.group()) for m in self._scan(text)]
+
+    def search(self, text: str) -> Optional[PhraseMatch]:
+        return next(self.finditer(text), None)
+
+    def sub(self, replacement: str, text: str) -> str:
+        out = []
+        pos = 0
+        for m in self.finditer(text):
+            out.append(text[pos:m.start])
+            out.append(replacement)
+            pos = m.end
+        out.append(text[pos:])
+        return "".join(out)
+
+
+def _trie_regex(node: dict) -> str:
+    alts = []
+    for ch in sorted(k for k in node if k not in (_END, _WILD)):
+        atom = r"\s+" if ch == " " else re.escape(ch)
+        alts.append(atom + _trie_regex(node[ch]))
+    if _WILD in node:
+        # Longer literal continuations first, then any word ending (including none).
+        alts.append(r"\w*")
+        return alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+    if not alts:
+        return ""
+    body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+    if _END in node:
+        return f"(?:{body})?" if len(alts) > 1 or len(alts[0]) > 1 else f"{body}?"
+    return body
@@ -2,19 +2,57 @@ from __future__ import annotations
 from typing import Any, Dict, List, Optional, Tuple
 from datetime import date, timedelta
 
+from .applicants import CHECKLIST_STATUSES
 from .config import settings
-from .db import upsert_checklist_item, get_checklist
+from .db import upsert_checklist_item, upsert_checklist_items, get_checklist, get_completion_state, transaction
+from .db_async import aget_checklist
 
-def tool_update_checklist(db_path: str, session_id: str, item: str, status: str) -> Dict[str, Any]:
+def _checklist_status(status: str) -> str:
     status = status.lower().strip()
-    if status not in {"missing","in_progress","submitted","verified"}:
-        raise ValueError("Invalid status. Use one of: missing, in_progress, submitted, verified.")
+    if status not in CHECKLIST_STATUSES:
+        raise ValueError(f"Invalid status. Use one of: {', '.join(CHECKLIST_STATUSES)}.")
+    return status
+
+def tool_update_checklist(db_path: str, session_id: str, item: str, status: str) -> Dict[str, Any]:
+    status = _checklist_status(status)
     upsert_checklist_item(db_path, session_id, item.strip(), status)
     return {"ok": True, "item": item, "status": status}
 
+def tool_update_checklist_many(db_path: str, session_id: str, updates: List[Tuple[str, str]]) -> Dict[str, Any]:
+    """Validate every (item, status) pair, then apply them in one transaction with one executemany.
+
+    Nothing is written if any pair is invalid. Returns the updated checklist and
+    the recomputed completion. A repeated item keeps its last status.
+    """
+    changes: Dict[str, str] = {}
+    errors = []
+    for item, status in updates:
+        try:
+            if not item.strip():
+                raise ValueError("Item name is empty.")
+            changes[item.strip()] = _checklist_status(status)
+        except ValueError as e:
+            errors.append(f"{item!r}: {e}")
+    if errors:
+        raise ValueError("; ".join(errors))
+    with transaction(db_path):
+        upsert_checklist_items(db_path, session_id, list(changes.items()))
+        state = get_completion_state(db_path, session_id)
+        checklist = get_checklist(db_path, session_id)
+    return {
+        "ok": True,
+        "updated": [{"item": item, "status": status} for item, status in changes.items()],
+        "checklist": checklist,
+        "file_completion_pct": state["file_completion_pct"],
+        "missing_items": state["missing_items"],
+    }
+
 def tool_get_checklist(db_path: str, session_id: str) -> Dict[str, Any]:
     return {"checklist": get_checklist(db_path, session_id)}
 
+async def atool_get_checklist(db_path: str, session_id: str) -> Dict[str, Any]:
+    return {"checklist": await aget_checklist(db_path, session_id)}
+
 def tool_deployment_buffer(deadline: Optional[date], deployment_start: Optional[date]) -> Dict[str, Any]:
     if not deadline or not deployment_start:
         return {"note": "Provide both a deadline and deployment_start to compute a buffered plan."}
@@ -1,9 +1,85 @@
+import json
+
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import date
+from typing import Optional
 
 API = st.secrets.get("API_URL", "http://127.0.0.1:8000")
 
+@st.cache_resource
+def http() -> requests.Session:
+    """One keep-alive connection pool to the API, shared by every rerun and browser session."""
+    s = requests.Session()
+    s.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=16))
+    s.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=16))
+    return s
+
+@st.cache_resource
+def _etags() -> dict:
+    return {}
+
+def stream_chat(session_id: str, message: str, out: dict):
+    """Yield reply tokens from /chat/stream; citations, actions, nudge and the escalation flag land in `out`."""
+    with http().post(f"{API}/chat/stream", json={"session_id": session_id, "message": message},
+                       stream=True, timeout=(5, 60)) as r:
+        r.raise_for_status()
+        event, data = None, []
+        for line in r.iter_lines(decode_unicode=True):
+            if line.startswith("event:"):
+                event = line[len("event:"):].strip()
+            elif line.startswith("data:"):
+                data.append(line[len("data:"):].strip())
+            elif not line and event:
+                payload = json.loads("\n".join(data))
+                if event == "token":
+                    yield payload["text"]
+                elif event == "nudge":
+                    out["nudge"] = payload["text"]
+                elif event == "done":
+                    out["escalated"] = payload.get("escalated_to_human", False)
+                elif event == "error":
+                    raise RuntimeError(payload.get("detail", "Chat turn failed"))
+                else:
+                    out[event] = payload
+                event, data = None, []
+
+def _applicants_page(cursor: Optional[str]) -> tuple:
+    """One page of GET /applicants and its next cursor, revalidating the last body with its ETag."""
+    key = ("applicants", cursor)
+    cached = _etags().get(key)
+    headers = {"If-None-Match": cached["etag"]} if cached and cached.get("etag") else {}
+    params = {"limit": 1000, **({"cursor": cursor} if cursor else {})}
+    r = http().get(f"{API}/applicants", params=params, headers=headers, timeout=10)
+    if r.status_code == 304 and cached:
+        return cached["data"], cached["next"]
+    r.raise_for_status()
+    data, next_cursor = r.json(), r.headers.get("X-Next-Cursor")
+    _etags()[key] = {"etag": r.headers.get("ETag"), "data": data, "next": next_cursor}
+    return data, next_cursor
+
+@st.cache_data(ttl=300, show_spinner=False)
+def fetch_applicants() -> list:
+    """Every applicant, following X-Next-Cursor page by page, at most every 5 minutes."""
+    out, cursor = [], None
+    while True:
+        page, cursor = _applicants_page(cursor)
+        out.extend(page)
+        if not cursor:
+            return out
+
+def get_snapshot(session_id: str) -> dict:
+    """Session, profile, checklist and recent history in one call."""
+    r = http().get(f"{API}/sessions/{session_id}/snapshot", timeout=10)
+    r.raise_for_status()
+    return r.json()
+
+@st.cache_data(ttl=60, show_spinner=False)
+def cached_snapshot(session_id: str, turn: int) -> dict:
+    # `turn` (the chat length) changes after every message, so a new turn refetches.
+    return get_snapshot(session_id)
+
 st.set_page_config(page_title="Agentic Admissions Concierge (AAC)", layout="wide")
 
 st.title("Agentic Admissions Concierge (AAC) — Demo")
@@ -15,7 +91,7 @@ with st.sidebar:
     # Demo applicants (loaded from the backend dataset)
     applicants = []
     try:
-        applicants = requests.get(f"{API}/applicants", timeout=10).json()
+        applicants = fetch_applicants()
     except Exception:
         applicants = []
 
@@ -47,15 +123,17 @@ with st.sidebar:
             "deadline": str(deadline) if deadline else None,
             "applicant_number": chosen_applicant_number,
         }
-        r = requests.post(f"{API}/sessions", json=payload, timeout=15)
+        r = http().post(f"{API}/sessions", json=payload, timeout=15)
         r.raise_for_status()
         st.session_state["session"] = r.json()
+        st.session_state["chat"] = []
 
     sid = st.text_input("Or load session_id")
     if st.button("Load session"):
-        r = requests.get(f"{API}/sessions/{sid}", timeout=15)
-        r.raise_for_status()
-        st.session_state["session"] = r.json()
+        snap = get_snapshot(sid)
+        st.session_state["session"] = snap["session"]
+        # Restore the stored history (citations and traces are not persisted).
+        st.session_state["chat"] = [{"role": m["role"], "content": m["content"]} for m in snap["messages"]]
 
     st.divider()
     st.subheader("Columbia official pages used")
@@ -100,30 +178,39 @@ with col1:
     user_msg = st.chat_input("Ask the admissions concierge…")
     if user_msg:
         st.session_state["chat"].append({"role":"user","content":user_msg})
-        r = requests.post(f"{API}/chat", json={"session_id": sess["session_id"], "message": user_msg}, timeout=30)
-        r.raise_for_status()
-        out = r.json()
+        st.chat_message("user").write(user_msg)
+        out = {}
+        with st.chat_message("assistant"):
+            # Render tokens as they arrive; the nudge follows once the backend sends it.
+            reply = st.write_stream(stream_chat(sess["session_id"], user_msg, out))
+            if out.get("nudge"):
+                st.markdown(out["nudge"])
         st.session_state["chat"].append({
             "role":"assistant",
-            "content": out["reply"],
+            "content": reply + out.get("nudge", ""),
             "citations": out.get("citations", []),
             "actions": out.get("actions", []),
-            "escalated": out.get("escalated_to_human", False),
+            "escalated": out.get("escalated", False),
         })
-        st.rerun()
 
 with col2:
     st.subheader("Applicant Snapshot")
     try:
-        prof = requests.get(f"{API}/sessions/{sess['session_id']}/profile", timeout=10).json()
+        snap = cached_snapshot(sess["session_id"], len(st.session_state["chat"]))
+    except requests.RequestException:
+        snap = {}
+    prof = snap.get("profile")
+    if prof:
         st.write(f"**Applicant:** {prof.get('last_name')}, {prof.get('first_name')}  |  **#{prof.get('applicant_number')}**")
         st.write(f"**SAT:** {prof.get('sat')}  |  **GPA:** {prof.get('gpa')}")
         st.write(f"**File completion:** {prof.get('file_completion_pct')}%  |  **Estimated chance (demo):** {prof.get('estimated_chance_pct')}%")
         extra = prof.get('extracurriculars') or ''
         if extra:
             st.write("**Extracurriculars:** " + extra)
-    except Exception:
+    else:
         st.caption("No mock profile attached to this session (custom session).")
+    if snap.get("checklist"):
+        st.write("**Checklist:** " + "  |  ".join(f"{c['item']}: {c['status']}" for c in snap["checklist"]))
 
     st.subheader("Agent Trace (Tools / Actions)")
     if st.session_state["chat"]:
@@ -0,0 +1,108 @@
+"""Concurrent chats waiting on a slow LLM provider: async /chat vs the sync path.
+
+The mock provider is given a simulated latency profile (LatencyProfile), then
+--concurrency chats are fired at once through an in-process ASGI client:
+  async  - the async /chat endpoint (provider call awaited, no thread held)
+  sync   - the same steps as /chat (_screen, route, _record_turn) in a sync
+           endpoint, i.e. the old /chat, which holds one threadpool thread and
+           one pooled SQLite connection (its transaction) per in-flight chat for
+           the whole provider call; chats that wait more than the pool timeout
+           for a connection fail
+
+The response cache is disabled so every chat pays for its provider call.
+
+Run:
+  python -m scripts.bench_async_chat --concurrency 50 200 --ttft 1.0
+  python -m scripts.bench_async_chat --ttft-dist lognormal --ttft 0.8 --ttft-sigma 0.5 \
+      --tokens-per-s 40 --error-rate 0.01 --only async
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+import httpx
+import numpy as np
+
+from backend.app import main as app_main
+from backend.app.config import settings
+from backend.app.agents.router import route
+from backend.app.db import transaction, get_completion_state, get_session
+from backend.app.llm import LLMClient, LatencyProfile
+from backend.app.models import ChatRequest, ChatResponse, Citation
+from backend.app.rag.retriever import TfidfRetriever
+
+
+@app_main.app.post("/_bench/chat_sync", response_model=ChatResponse, include_in_schema=False)
+def chat_sync(req: ChatRequest):
+    with transaction(settings.db_path):
+        s = get_session(settings.db_path, req.session_id)
+        decision, hits = app_main._screen(s, req.message)
+        if decision.escalated_to_human:
+            reply = app_main._escalation_reply(decision)
+            app_main._record_turn(req.session_id, req.message, reply)
+            return ChatResponse(session_id=req.session_id, reply=reply, escalated_to_human=True,
+                                actions=[{"tool": "escalate", "reason": decision.reason}], citations=[])
+        result = route(app_main._get_retriever(), app_main.llm, settings.db_path, s, req.message, hits=hits)
+        reply = result.reply + app_main._completion_nudge(get_completion_state(settings.db_path, req.session_id))
+        app_main._record_turn(req.session_id, req.message, reply)
+        return ChatResponse(session_id=req.session_id, reply=reply, actions=result.actions,
+                            citations=[Citation(**c) for c in result.citations],
+                            escalated_to_human=result.escalated_to_human)
+
+
+async def run(path: str, sessions, concurrency: int):
+    transport = httpx.ASGITransport(app=app_main.app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        async def one(i: int):
+            t = time.perf_counter()
+            r = await client.post(path, json={"session_id": sessions[i % len(sessions)],
+                                              "message": "What is the fee waiver policy?"})
+            return r.status_code, time.perf_counter() - t
+
+        t = time.perf_counter()
+        rs = await asyncio.gather(*[one(i) for i in range(concurrency)])
+        elapsed = time.perf_counter() - t
+    lat = np.array([s for code, s in rs if code == 200])
+    p50, p95 = (np.percentile(lat, 50), np.percentile(lat, 95)) if len(lat) else (float("nan"),) * 2
+    return elapsed, sum(code != 200 for code, _ in rs), p50, p95
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--concurrency", type=int, nargs="+", default=[50, 200])
+    ap.add_argument("--ttft-dist", choices=["fixed", "normal", "lognormal"], default="fixed")
+    ap.add_argument("--ttft", type=float, default=1.0, help="fixed value, mean (normal) or median (lognormal), seconds")
+    ap.add_argument("--ttft-sigma", type=float, default=0.0)
+    ap.add_argument("--tokens-per-s", type=float, default=0.0, help="0 = whole reply at first token")
+    ap.add_argument("--error-rate", type=float, default=0.0)
+    ap.add_argument("--timeout-rate", type=float, default=0.0)
+    ap.add_argument("--timeout-s", type=float, default=5.0)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--only", choices=["sync", "async"])
+    args = ap.parse_args()
+
+    profile = LatencyProfile(ttft=args.ttft_dist, ttft_s=args.ttft, ttft_sigma=args.ttft_sigma,
+                             tokens_per_s=args.tokens_per_s or None, error_rate=args.error_rate,
+                             timeout_rate=args.timeout_rate, timeout_s=args.timeout_s, seed=args.seed)
+    settings.db_path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    app_main.retriever = TfidfRetriever.build(TfidfRetriever.load_from_folder("data/docs"))
+    app_main._startup()
+    app_main.llm = LLMClient("mock", latency=profile)
+    sessions = [app_main.create_session_api(app_main.SessionCreate(name=f"s{i}", target_program="CS")).session_id
+                for i in range(20)]
+
+    print(f"provider latency: {profile}")
+    print(f"{'mode':>6} {'in-flight':>10} {'wall s':>8} {'failed':>7} {'p50 s':>7} {'p95 s':>7}")
+    for n in args.concurrency:
+        for mode, path in (("sync", "/_bench/chat_sync"), ("async", "/chat")):
+            if args.only and mode != args.only:
+                continue
+            wall, failed, p50, p95 = asyncio.run(run(path, sessions, n))
+            print(f"{mode:>6} {n:>10} {wall:>8.2f} {failed:>7} {p50:>7.2f} {p95:>7.2f}")
+    asyncio.run(app_main._shutdown())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Cohort scoring: scalar per-applicant functions vs vectorized NumPy columns.
+
+  scalar      - compute_admission_chance + compute_file_completion(applicant_checklist(a)) per row
+  vectorized  - admission_chance + file_completion over Cohort columns, one call each
+
+Also times building the columns from Applicant rows and the full /applicants/stats
+payload, and checks that both paths agree on every applicant.
+
+Run:
+  python -m scripts.bench_cohort --sizes 10000 100000 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+
+from backend.app.applicants import Applicant, applicant_checklist, compute_admission_chance, compute_file_completion
+from backend.app.cohort import Cohort, admission_chance, cohort_stats, file_completion
+
+STATUSES = ["complete", "in_progress", "missing"]
+
+
+def synthetic_applicants(n: int, rng: np.random.Generator):
+    sat = rng.choice([0, *range(1000, 1610, 10)], size=n)
+    gpa = np.round(rng.uniform(2.5, 4.0, size=n), 2)
+    st = rng.integers(0, len(STATUSES), size=(n, 3))
+    return [Applicant(str(3000000 + i), "Lee", "Jordan", int(sat[i]), float(gpa[i]),
+                      STATUSES[st[i, 0]], STATUSES[st[i, 1]], STATUSES[st[i, 2]], [])
+            for i in range(n)]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    args = ap.parse_args()
+    rng = np.random.default_rng(7)
+
+    print(f"{'applicants':>11} {'scalar ms':>10} {'columns ms':>11} {'vector ms':>10} {'stats ms':>9} {'speedup':>8}")
+    for n in args.sizes:
+        rows = synthetic_applicants(n, rng)
+
+        t = time.perf_counter()
+        chance = [compute_admission_chance(a.sat, a.gpa) for a in rows]
+        completion = [compute_file_completion(applicant_checklist(a)) for a in rows]
+        scalar_ms = (time.perf_counter() - t) * 1000
+
+        t = time.perf_counter()
+        cohort = Cohort.from_applicants(rows)
+        columns_ms = (time.perf_counter() - t) * 1000
+
+        t = time.perf_counter()
+        v_chance = admission_chance(cohort.sat, cohort.gpa)
+        v_completion = file_completion(cohort.complete)
+        vector_ms = (time.perf_counter() - t) * 1000
+
+        t = time.perf_counter()
+        cohort_stats(cohort)
+        stats_ms = (time.perf_counter() - t) * 1000
+
+        assert np.array_equal(v_chance, chance) and np.array_equal(v_completion, completion)
+        print(f"{n:>11} {scalar_ms:>10.1f} {columns_ms:>11.1f} {vector_ms:>10.1f} {stats_ms:>9.1f} "
+              f"{scalar_ms / vector_ms:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""Micro-benchmarks for the SQLite layer in backend/app/db.py.
+
+Run:
+  python -m scripts.bench_db writes --threads 8 --per-thread 500
+  python -m scripts.bench_db history --sizes 10000 100000 1000000
+"""
+import argparse
+import os
+import random
+import tempfile
+import threading
+import time
+
+from backend.app import db
+from backend.app.migrations import migrate
+
+
+def bench_writes(threads: int, per_thread: int) -> None:
+    for mode in ("inline", "write-behind"):
+        path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        db.init_db(path)
+        sid = db.create_session(path, "Bench", "traditional", "CS", None)
+        if mode == "write-behind":
+            writer = db.enable_write_behind(path)
+
+        def worker(n: int) -> None:
+            for i in range(per_thread):
+                db.add_message(path, sid, "user", f"message {n}-{i}")
+
+        ts = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+        t0 = time.perf_counter()
+        for t in ts:
+            t.start()
+        for t in ts:
+            t.join()
+        if mode == "write-behind":
+            writer.flush()
+        elapsed = time.perf_counter() - t0
+        total = threads * per_thread
+        print(f"{mode:>12}: {total} inserts from {threads} threads in {elapsed:.3f}s ({total / elapsed:,.0f}/s)")
+        db.close_pools()
+
+
+def _populate(path: str, n_messages: int, per_session: int) -> list:
+    n_sessions = max(1, n_messages // per_session)
+    sids = [f"s{i:07d}" for i in range(n_sessions)]
+    with db._connect(path) as conn:
+        conn.execute("BEGIN")
+        batch = []
+        for i in range(n_messages):
+            # Interleave sessions so each session's rows are spread over the table, as in production.
+            batch.append((sids[i % n_sessions], "user", "hello there", "2025-01-01T00:00:00"))
+            if len(batch) == 50000:
+                conn.executemany("INSERT INTO messages(session_id,role,content,created_at) VALUES (?,?,?,?)", batch)
+                batch.clear()
+        if batch:
+            conn.executemany("INSERT INTO messages(session_id,role,content,created_at) VALUES (?,?,?,?)", batch)
+        conn.execute("COMMIT")
+    return sids
+
+
+def bench_history(sizes: list, per_session: int, queries: int) -> None:
+    rng = random.Random(7)
+    for n in sizes:
+        for label, target in (("no index (v1)", 1), ("indexed (latest)", None)):
+            path = os.path.join(tempfile.mkdtemp(), "bench.db")
+            with db._connect(path) as conn:
+                migrate(conn, target=target)
+            sids = _populate(path, n, per_session)
+            # Full scans are slow at large sizes; sample fewer queries there.
+            q = queries if target is None else max(5, min(queries, 2_000_000 // n))
+            picks = [rng.choice(sids) for _ in range(q)]
+            t0 = time.perf_counter()
+            for sid in picks:
+                db.get_recent_messages(path, sid, limit=12)
+            per_query = (time.perf_counter() - t0) / q
+            print(f"{n:>9,} messages  {label:<17} get_recent_messages: {per_query * 1e6:10.1f} us/query ({q} queries)")
+            db.close_pools()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    w = sub.add_parser("writes", help="concurrent add_message throughput, inline vs write-behind")
+    w.add_argument("--threads", type=int, default=8)
+    w.add_argument("--per-thread", type=int, default=500)
+    h = sub.add_parser("history", help="get_recent_messages latency vs table size, with and without indexes")
+    h.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    h.add_argument("--per-session", type=int, default=50)
+    h.add_argument("--queries", type=int, default=500)
+    args = ap.parse_args()
+    if args.cmd == "writes":
+        bench_writes(args.threads, args.per_thread)
+    elif args.cmd == "history":
+        bench_history(args.sizes, args.per_session, args.queries)
+
+
+if __name__ == "__main__":
+    main()
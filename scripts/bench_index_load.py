@@ -0,0 +1,85 @@
+"""Compare index load time and memory: pickle load() vs memory-mapped open().
+
+Builds a synthetic passage corpus, writes both formats, then loads each in a
+fresh subprocess and reports wall time plus private (RssAnon) and file-backed,
+shareable (RssFile) resident memory from /proc/self/status (Linux only).
+
+Run:
+  python -m scripts.bench_index_load --passages 100000
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from backend.app.rag.retriever import Doc, TfidfRetriever
+
+
+def _rss() -> dict:
+    out = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith(("RssAnon:", "RssFile:")):
+                k, v = line.split(":", 1)
+                out[k] = int(v.split()[0]) / 1024  # MiB
+    return out
+
+
+def _child(mode: str, workdir: str) -> None:
+    before = _rss()
+    t0 = time.perf_counter()
+    if mode == "pickle":
+        r = TfidfRetriever.load(os.path.join(workdir, "index.pkl"), os.path.join(workdir, "vectorizer.pkl"))
+    else:
+        r = TfidfRetriever.open(os.path.join(workdir, "index"))
+    load_s = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    r.search("application fee waiver deadline", top_k=4)
+    first_s = time.perf_counter() - t0
+    after = _rss()
+    print(json.dumps({
+        "load_s": load_s,
+        "first_search_s": first_s,
+        "anon_mib": after["RssAnon"] - before["RssAnon"],
+        "file_mib": after["RssFile"] - before["RssFile"],
+    }))
+
+
+def _corpus(n: int, seed: int = 7) -> list:
+    base = " ".join(d.text for d in TfidfRetriever.load_from_folder("data/docs")).split()
+    rng = random.Random(seed)
+    vocab = base + [f"term{i}" for i in range(20000)]
+    return [Doc(doc_id=f"doc{i // 20}.md", title=f"Doc {i // 20}", text=" ".join(rng.choices(vocab, k=120)))
+            for i in range(n)]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--passages", type=int, default=20_000)
+    ap.add_argument("--child", choices=["pickle", "mmap"])
+    ap.add_argument("--workdir")
+    args = ap.parse_args()
+    if args.child:
+        _child(args.child, args.workdir)
+        return
+
+    workdir = tempfile.mkdtemp()
+    t0 = time.perf_counter()
+    r = TfidfRetriever.build(_corpus(args.passages), chunk=False)
+    print(f"built {len(r.docs):,} passages x {r.matrix.shape[1]:,} terms in {time.perf_counter() - t0:.1f}s")
+    r.save(os.path.join(workdir, "index.pkl"), os.path.join(workdir, "vectorizer.pkl"))
+    r.save_dir(os.path.join(workdir, "index"))
+    for mode in ("pickle", "mmap"):
+        out = subprocess.run([sys.executable, "-m", "scripts.bench_index_load", "--child", mode, "--workdir", workdir],
+                             check=True, capture_output=True, text=True).stdout
+        m = json.loads(out.strip().splitlines()[-1])
+        print(f"{mode:>6}: load {m['load_s'] * 1000:8.1f} ms | first search {m['first_search_s'] * 1000:7.1f} ms | "
+              f"private RSS +{m['anon_mib']:7.1f} MiB | shared file RSS +{m['file_mib']:7.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""Policy screening cost vs rule-set size: substring loop vs compiled PhraseMatcher.
+
+  loop      - the old should_escalate: lower() then `k in t` for every trigger
+  compiled  - PolicyEngine: one trie-shaped, word-bounded regex scan per message
+
+Rule sets are the built-in triggers plus synthetic phrases (1-3 made-up words,
+some with a trailing *), standing in for a large institution's rule file.
+
+Run:
+  python -m scripts.bench_policies --sizes 25 250 2500 10000
+"""
+import argparse
+import random
+import string
+import time
+
+from backend.app.policies import HIGH_STAKES_TRIGGERS, PolicyEngine
+
+MESSAGES = [
+    "What items are required to complete my Columbia application file?",
+    "Based on my file completion, what should I do next to reach 100%?",
+    "I'm on active duty with a deployment in October; can I still meet the deadline?",
+    "Can you help me make my essay about debate and research more specific?",
+    "My counselor sent a courtesy reminder about transcripts, what now?",
+]
+
+
+def synthetic_rules(n: int, rng: random.Random):
+    rules = []
+    while len(rules) < n:
+        words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 9))) for _ in range(rng.randint(1, 3))]
+        phrase = " ".join(words)
+        rules.append(phrase + "*" if rng.random() < 0.2 else phrase)
+    return rules
+
+
+def loop_escalate(triggers, text: str) -> bool:
+    t = text.lower()
+    for k in triggers:
+        if k in t:
+            return True
+    return False
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[25, 250, 2500, 10000])
+    ap.add_argument("--rounds", type=int, default=2000)
+    args = ap.parse_args()
+    rng = random.Random(3)
+
+    print(f"{'rules':>7} {'compile ms':>11} {'loop us/msg':>12} {'compiled us/msg':>16}")
+    for n in args.sizes:
+        rules = HIGH_STAKES_TRIGGERS + synthetic_rules(max(0, n - len(HIGH_STAKES_TRIGGERS)), rng)
+        plain = [r.rstrip("*") for r in rules]
+        t = time.perf_counter()
+        engine = PolicyEngine(rules)
+        compile_ms = (time.perf_counter() - t) * 1000
+
+        t = time.perf_counter()
+        for _ in range(args.rounds):
+            for m in MESSAGES:
+                loop_escalate(plain, m)
+        loop_us = (time.perf_counter() - t) / (args.rounds * len(MESSAGES)) * 1e6
+
+        t = time.perf_counter()
+        for _ in range(args.rounds):
+            for m in MESSAGES:
+                engine.should_escalate(m)
+        compiled_us = (time.perf_counter() - t) / (args.rounds * len(MESSAGES)) * 1e6
+        print(f"{len(rules):>7} {compile_ms:>11.1f} {loop_us:>12.2f} {compiled_us:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
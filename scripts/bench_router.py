@@ -0,0 +1,100 @@
+"""Intent routing cost vs rule-table size: the old if/in chain vs the compiled IntentRouter.
+
+  chain     - the old classify(): lower() then `in` checks branch by branch, first hit wins
+  compiled  - IntentRouter: one PhraseMatcher scan scores every intent
+
+Larger tables add synthetic intents (a few made-up phrases each) after the
+built-in ones; the chain is given the same extra branches. Agreement is the
+share of messages where both pick the same intent on the built-in table.
+
+Run:
+  python -m scripts.bench_router --intents 0 20 200 1000
+"""
+import argparse
+import random
+import string
+import time
+
+from backend.app.agents.router import INTENT_RULES, IntentRouter, IntentRule
+from scripts.eval_simulation import PROMPTS
+
+MESSAGES = PROMPTS + [
+    "What documents are missing from my checklist?",
+    "Can you help me make my essay about debate and research more specific?",
+    "What is the fee waiver policy?",
+    "My PCS orders moved, can I still submit before the deadline?",
+    "Please nudge me when recommendations arrive.",
+    "Improve my essay and remind me tomorrow",
+    "Where do I start the online application?",
+    "Are test scores required for the MS program?",
+]
+
+LEGACY_BRANCHES = [
+    ("military", ["deployment", "active duty", "pcs", "orders"]),
+    ("checklist", ["checklist", "complete", "missing", "documents"]),
+    ("coach", ["improve", "competitive", "essay", "activities"]),
+    ("outreach", ["remind", "nudge", "next step", "start"]),
+]
+
+
+def chain_classify(branches, session, message: str) -> str:
+    t = message.lower()
+    for intent, keys in branches:
+        if intent == "military" and session["segment"] != "active_duty":
+            continue
+        for k in keys:
+            if k in t:
+                return intent
+    return "rag"
+
+
+def synthetic_intents(n: int, rng: random.Random):
+    rules = []
+    for i in range(n):
+        phrases = tuple("".join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 9))) for _ in range(4))
+        rules.append(IntentRule(f"intent_{i}", phrases, priority=10 + i))
+    return rules
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--intents", type=int, nargs="+", default=[0, 20, 200, 1000])
+    ap.add_argument("--rounds", type=int, default=2000)
+    args = ap.parse_args()
+    rng = random.Random(5)
+    sessions = [{"segment": "traditional"}, {"segment": "active_duty"}]
+
+    base = IntentRouter()
+    pairs = [(s, m) for s in sessions for m in MESSAGES]
+    agree = sum(chain_classify(LEGACY_BRANCHES, s, m) == base.decide(s, m).intent for s, m in pairs)
+    print(f"agreement on {len(pairs)} messages: {agree}/{len(pairs)}")
+    for s, m in pairs:
+        old, new = chain_classify(LEGACY_BRANCHES, s, m), base.decide(s, m)
+        if old != new.intent:
+            print(f"  {s['segment']:>11}: {m!r}: chain={old} compiled={new.intent} {new.scores}")
+
+    print(f"{'intents':>8} {'phrases':>8} {'compile ms':>11} {'chain us/msg':>13} {'compiled us/msg':>16}")
+    for n in args.intents:
+        extra = synthetic_intents(n, rng)
+        branches = LEGACY_BRANCHES + [(r.intent, list(r.phrases)) for r in extra]
+        t = time.perf_counter()
+        router = IntentRouter(INTENT_RULES + extra)
+        compile_ms = (time.perf_counter() - t) * 1000
+
+        t = time.perf_counter()
+        for _ in range(args.rounds):
+            for s, m in pairs:
+                chain_classify(branches, s, m)
+        chain_us = (time.perf_counter() - t) / (args.rounds * len(pairs)) * 1e6
+
+        t = time.perf_counter()
+        for _ in range(args.rounds):
+            for s, m in pairs:
+                router.decide(s, m)
+        compiled_us = (time.perf_counter() - t) / (args.rounds * len(pairs)) * 1e6
+        phrases = sum(len(r.phrases) for r in router.rules)
+        print(f"{len(router.rules):>8} {phrases:>8} {compile_ms:>11.1f} {chain_us:>13.2f} {compiled_us:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Query latency vs corpus size: dense cosine + argsort vs posting-list top-k.
+
+Generates a synthetic passage x term TF-IDF matrix with Zipf-distributed terms
+(so posting lists look like real text), then times the same queries through:
+  dense      - cosine_similarity against every passage + full argsort (the old search path)
+  postings   - InvertedIndex.top_k walking every posting list of the query terms
+  maxscore   - InvertedIndex.top_k with MaxScore early termination
+
+Run:
+  python -m scripts.bench_search --sizes 10000 30000 100000 300000
+"""
+import argparse
+import time
+
+import numpy as np
+import scipy.sparse as sp
+from sklearn.metrics.pairwise import cosine_similarity
+
+from backend.app.rag.search import InvertedIndex
+
+
+def synthetic_matrix(n_docs: int, n_terms: int, terms_per_doc: int, rng: np.random.Generator) -> sp.csr_matrix:
+    ranks = np.arange(1, n_terms + 1)
+    p = 1.0 / ranks
+    p /= p.sum()
+    cols = rng.choice(n_terms, size=(n_docs, terms_per_doc), p=p)
+    rows = np.repeat(np.arange(n_docs), terms_per_doc)
+    m = sp.csr_matrix((np.ones(rows.size), (rows, cols.ravel())), shape=(n_docs, n_terms))
+    m.sum_duplicates()
+    df = np.bincount(m.indices, minlength=n_terms)
+    m = sp.csr_matrix(m.multiply(np.log((1 + n_docs) / (1 + df)) + 1.0))
+    norms = np.sqrt(np.asarray(m.multiply(m).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sp.csr_matrix(sp.diags(1.0 / norms) @ m)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 30_000, 100_000, 300_000])
+    ap.add_argument("--terms", type=int, default=50_000)
+    ap.add_argument("--terms-per-doc", type=int, default=60)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--top-k", type=int, default=4)
+    args = ap.parse_args()
+    rng = np.random.default_rng(7)
+
+    for n in args.sizes:
+        m = synthetic_matrix(n, args.terms, args.terms_per_doc, rng)
+        index = InvertedIndex.from_matrix(m)
+        # Queries mix 3-5 content terms, skipping the ~100 most frequent (stop-word-like) ones.
+        queries = []
+        for _ in range(args.queries):
+            t = rng.choice(np.arange(100, 5000), size=rng.integers(3, 6), replace=False)
+            w = rng.random(len(t)) + 0.5
+            queries.append((t, w / np.linalg.norm(w)))
+
+        timings = {}
+        t0 = time.perf_counter()
+        for t, w in queries:
+            q = sp.csr_matrix((w, (np.zeros(len(t), dtype=int), t)), shape=(1, args.terms))
+            sims = cosine_similarity(q, m).ravel()
+            np.argsort(-sims)[:args.top_k]
+        timings["dense"] = time.perf_counter() - t0
+        for label, et in (("postings", False), ("maxscore", True)):
+            t0 = time.perf_counter()
+            for t, w in queries:
+                index.top_k(t, w, args.top_k, early_termination=et)
+            timings[label] = time.perf_counter() - t0
+
+        per_q = {k: v / len(queries) * 1e6 for k, v in timings.items()}
+        print(f"{n:>8,} passages: " + "  ".join(f"{k} {v:9.1f} us" for k, v in per_q.items())
+              + f"  (speedup {per_q['dense'] / per_q['maxscore']:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,17 @@
+import argparse
+
 from backend.app.rag.retriever import TfidfRetriever
+from backend.app.rag.incremental import IncrementalIndexBuilder
 from backend.app.config import settings
 
 DOC_FOLDER = "data/columbia_docs"  # Columbia-only demo
 
 def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--incremental", action="store_true",
+                    help="only re-tokenize added/changed docs, reusing cached term counts")
+    args = ap.parse_args()
+
     docs = TfidfRetriever.load_from_folder(DOC_FOLDER)
     if not docs:
         # Try to fetch the Columbia pages automatically (requires internet).
@@ -21,9 +29,16 @@ def main():
             )
     if not docs:
         raise SystemExit(f"No docs found in {DOC_FOLDER}")
-    retriever = TfidfRetriever.build(docs)
-    retriever.save(settings.rag_index_path, settings.rag_vectorizer_path)
-    print(f"Built index over {len(docs)} docs -> {settings.rag_index_path}")
+    if args.incremental:
+        builder = IncrementalIndexBuilder(settings.rag_build_cache_dir, settings.rag_chunk_chars, settings.rag_chunk_overlap)
+        retriever, report = builder.build(docs)
+        print(f"Incremental build in {report.seconds:.2f}s: {len(report.added)} added, {len(report.changed)} changed, "
+              f"{len(report.removed)} removed, {len(report.reused)} reused"
+              + (" (no usable manifest: full rebuild)" if report.full_rebuild else ""))
+    else:
+        retriever = TfidfRetriever.build(docs, max_chars=settings.rag_chunk_chars, overlap=settings.rag_chunk_overlap)
+    retriever.save_dir(settings.rag_index_dir)
+    print(f"Built index over {len(docs)} docs ({len(retriever.docs)} passages) -> {settings.rag_index_dir}")
 
 if __name__ == "__main__":
     main()
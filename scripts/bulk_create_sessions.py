@@ -0,0 +1,71 @@
+"""Create sessions for many applicants at once (the CLI twin of POST /sessions/bulk).
+
+Applicants are given by number (arguments or a file, one per line) or picked by
+filter; with neither, every applicant in the dataset is onboarded. Each chunk is
+written with one executemany per table in its own transaction, and its results
+are appended to --out (NDJSON) as soon as it commits. --skip-existing makes
+re-runs safe after an interruption.
+
+Run:
+  python -m scripts.bulk_create_sessions --missing Essays --out sessions.ndjson
+  python -m scripts.bulk_create_sessions --applicants-file numbers.txt --skip-existing
+  python -m scripts.bulk_create_sessions 2029001 2029002 --segment active_duty
+"""
+import argparse
+import json
+import sys
+import time
+
+from backend.app.applicants import onboard_applicants
+from backend.app.config import settings
+from backend.app.db import init_db
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("applicants", nargs="*", help="applicant numbers (default: all matching the filters)")
+    ap.add_argument("--applicants-file", help="file with one applicant number per line")
+    ap.add_argument("--missing", help="only applicants whose checklist item is not complete, e.g. Essays")
+    ap.add_argument("--completion", type=int, help="only applicants in this file completion bucket")
+    ap.add_argument("--segment", default="traditional")
+    ap.add_argument("--target-program", default="Columbia Undergraduate Admissions")
+    ap.add_argument("--deadline", help="YYYY-MM-DD")
+    ap.add_argument("--skip-existing", action="store_true", help="leave applicants that already have a session")
+    ap.add_argument("--chunk-size", type=int, default=settings.bulk_session_chunk_size)
+    ap.add_argument("--out", help="write one NDJSON line per applicant here")
+    ap.add_argument("--db", default=settings.db_path)
+    args = ap.parse_args()
+
+    numbers = list(args.applicants)
+    if args.applicants_file:
+        with open(args.applicants_file, encoding="utf-8") as f:
+            numbers += [line.strip() for line in f if line.strip()]
+    if numbers and (args.missing is not None or args.completion is not None):
+        ap.error("pass applicant numbers or --missing/--completion, not both")
+
+    init_db(args.db)
+    out = open(args.out, "w", encoding="utf-8") if args.out else None
+    counts = {"created": 0, "skipped": 0, "not_found": 0}
+    t0 = time.perf_counter()
+    try:
+        for results in onboard_applicants(args.db, args.segment, args.target_program, deadline=args.deadline,
+                                          applicant_numbers=numbers or None, missing=args.missing,
+                                          completion=args.completion, skip_existing=args.skip_existing,
+                                          chunk_size=args.chunk_size):
+            for r in results:
+                counts["created" if "session_id" in r else "skipped" if "skipped" in r else "not_found"] += 1
+                if out:
+                    out.write(json.dumps(r) + "\n")
+    except ValueError as e:
+        sys.exit(str(e))
+    finally:
+        if out:
+            out.close()
+    seconds = time.perf_counter() - t0
+    total = sum(counts.values())
+    print(f"{total} applicants in {seconds:.2f}s ({total / seconds if seconds else 0:,.0f}/s): "
+          f"{counts['created']} created, {counts['skipped']} skipped, {counts['not_found']} not found -> {args.db}")
+
+
+if __name__ == "__main__":
+    main()
@@ -42,7 +42,7 @@ def main(seed: int = 7, n: int = 30):
     Path("experiments").mkdir(exist_ok=True)
 
     init_db(settings.db_path)
-    retriever = TfidfRetriever.load(settings.rag_index_path, settings.rag_vectorizer_path)
+    retriever = TfidfRetriever.open(settings.rag_index_dir)
     llm = LLMClient(provider="mock")
 
     metrics = {
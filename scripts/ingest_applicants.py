@@ -0,0 +1,40 @@
+"""Stream an applicant CSV into the applicants table.
+
+Rows are read and validated a chunk at a time and each chunk is written with one
+executemany, so memory stays flat whatever the file size. Applicants already
+loaded are updated in place, a chunk per transaction; --replace swaps in the new
+table in a single transaction, so an error leaves the old one untouched.
+
+Run:
+  python -m scripts.ingest_applicants data/applicants_columbia.csv
+  python -m scripts.ingest_applicants big.csv --chunk-size 20000 --replace
+"""
+import argparse
+
+from backend.app.applicants import ingest_applicants
+from backend.app.config import settings
+from backend.app.db import init_db
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("csv", nargs="?", default=settings.applicants_path)
+    ap.add_argument("--db", default=settings.db_path)
+    ap.add_argument("--chunk-size", type=int, default=5000)
+    ap.add_argument("--replace", action="store_true", help="delete applicants not in this file")
+    ap.add_argument("--show-rejects", type=int, default=20)
+    args = ap.parse_args()
+
+    init_db(args.db)
+    report = ingest_applicants(args.db, args.csv, chunk_size=args.chunk_size, replace=args.replace,
+                               max_rejects=args.show_rejects)
+    print(f"Read {report.rows_read} rows in {report.seconds:.2f}s ({report.rows_per_s:,.0f} rows/s): "
+          f"{report.loaded} loaded, {report.rejected_count} rejected -> {args.db}")
+    for line, reason in report.rejected:
+        print(f"  line {line}: {reason}")
+    if report.rejected_count > len(report.rejected):
+        print(f"  ... {report.rejected_count - len(report.rejected)} more")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,5 @@
+import json
+
 from fastapi.testclient import TestClient
 from backend.app.main import app
 
@@ -10,3 +12,184 @@ def test_create_session_and_chat():
     # chat will fail if index not built; allow either 200 or 500 with expected message
     c = client.post("/chat", json={"session_id":sid, "message":"What do I need to complete my file?"})
     assert c.status_code in (200, 500)
+
+def test_chat_stream_matches_chat(tmp_path, monkeypatch):
+    from backend.app import main
+    from backend.app.config import settings
+    from backend.app.rag.retriever import TfidfRetriever
+
+    monkeypatch.setattr(settings, "db_path", str(tmp_path / "aac.db"))
+    monkeypatch.setattr(main, "retriever", TfidfRetriever.build(TfidfRetriever.load_from_folder("data/docs")))
+    with TestClient(app) as c:
+        sid = c.post("/sessions", json={"name":"Alex","target_program":"CS"}).json()["session_id"]
+        msg = {"session_id": sid, "message": "What about the fee waiver?"}
+        reply = c.post("/chat", json=msg).json()["reply"]
+        r = c.post("/chat/stream", json=msg)
+        assert r.headers["content-type"].startswith("text/event-stream")
+        events = []
+        for block in r.text.strip().split("\n\n"):
+            event, data = block.split("\n")
+            events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+        names = [e for e, _ in events]
+        assert names.count("token") > 1 and names[-4:] == ["citations", "actions", "nudge", "done"]
+        streamed = "".join(d["text"] for e, d in events if e in ("token", "nudge"))
+        assert streamed == reply
+
+def test_applicants_etag_and_gzip(tmp_path, monkeypatch):
+    from backend.app.config import settings
+
+    monkeypatch.setattr(settings, "db_path", str(tmp_path / "aac.db"))
+    monkeypatch.setattr(settings, "gzip_min_bytes", 0)
+    with TestClient(app) as c:
+        r = c.get("/applicants", params={"limit": 2}, headers={"Accept-Encoding": "gzip"})
+        assert r.headers["content-encoding"] == "gzip" and len(r.json()) == 2
+        etag = r.headers["etag"]
+        again = c.get("/applicants", params={"limit": 2}, headers={"If-None-Match": etag})
+        assert again.status_code == 304 and again.content == b""
+        assert again.headers["x-next-cursor"] == r.headers["x-next-cursor"]
+        assert c.get("/applicants", params={"limit": 3}, headers={"If-None-Match": etag}).status_code == 200
+
+def test_applicants_cursor_chain_covers_every_row(tmp_path, monkeypatch):
+    from backend.app import main
+    from backend.app.config import settings
+
+    monkeypatch.setattr(settings, "db_path", str(tmp_path / "aac.db"))
+    with TestClient(app) as c:
+        seen, params = [], {"limit": 2}
+        while True:
+            r = c.get("/applicants", params=params)
+            seen += [a["applicant_number"] for a in r.json()]
+            if "x-next-cursor" not in r.headers:
+                break
+            params = {"limit": 2, "cursor": r.headers["x-next-cursor"]}
+        assert len(seen) == len(set(seen)) == len(main.applicants) > 2
+
+def test_session_snapshot(tmp_path, monkeypatch):
+    from backend.app.config import settings
+
+    monkeypatch.setattr(settings, "db_path", str(tmp_path / "aac.db"))
+    with TestClient(app) as c:
+        sid = c.post("/sessions", json={"name": "x", "target_program": "CS", "applicant_number": "2029001"}).json()["session_id"]
+        snap = c.get(f"/sessions/{sid}/snapshot").json()
+        assert snap["session"]["session_id"] == sid and snap["profile"]["applicant_number"] == "2029001"
+        assert {i["item"]: i["status"] for i in snap["checklist"]}["Essays"] == "in_progress"
+        assert snap["messages"] == []
+        assert c.get("/sessions/nope/snapshot").status_code == 404
+
+def test_patch_checklist_many(tmp_path, monkeypatch):
+    from backend.app.config import settings
+
+    monkeypatch.setattr(settings, "db_path", str(tmp_path / "aac.db"))
+    with TestClient(app) as c:
+        sid = c.post("/sessions", json={"name": "x", "target_program": "CS", "applicant_number": "2029001"}).json()["session_id"]
+        r = c.patch(f"/sessions/{sid}/checklist", json={"items": [
+            {"item": "Essays", "status": "complete"}, {"item": "Letters of recommendation", "status": "Complete"}]})
+        assert r.status_code == 200
+        body = r.json()
+        assert body["file_completion_pct"] == 100 and body["missing_items"] == []
+        assert {i["item"]: i["status"] for i in body["checklist"]}["Letters of recommendation"] == "complete"
+        assert c.get(f"/sessions/{sid}/profile").json()["file_completion_pct"] == 100
+
+        bad = c.patch(f"/sessions/{sid}/checklist", json={"items": [
+            {"item": "Essays", "status": "missing"}, {"item": "Fee", "status": "paid"}]})
+        assert bad.status_code == 422 and "'Fee'" in bad.json()["detail"]
+        assert c.get(f"/sessions/{sid}/snapshot").json()["profile"]["file_completion_pct"] == 100
+        assert c.patch("/sessions/nope/checklist", json={"items": [{"item": "Essays", "status": "complete"}]}).status_code == 404
+
+def test_bulk_sessions_stream(tmp_path, monkeypatch):
+    from backend.app.config import settings
+
+    monkeypatch.setattr(settings, "db_path", str(tmp_path / "aac.db"))
+    monkeypatch.setattr(settings, "bulk_session_chunk_size", 2)
+    with TestClient(app) as c:
+        r = c.post("/sessions/bulk", json={"target_program": "CS", "missing": "Essays"})
+        assert r.status_code == 200 and r.headers["content-type"] == "application/x-ndjson"
+        *rows, done = [json.loads(line) for line in r.text.splitlines()]
+        expected = [a["applicant_number"] for a in c.get("/applicants", params={"missing": "Essays"}).json()]
+        assert [row["applicant_number"] for row in rows] == expected and done["created"] == len(expected)
+
+        # Same session state as one POST /sessions per applicant, progress included
+        one = c.post("/sessions", json={"name": "x", "target_program": "CS", "applicant_number": expected[0]}).json()
+        bulk, single = (c.get(f"/sessions/{sid}/snapshot").json() for sid in (rows[0]["session_id"], one["session_id"]))
+        assert bulk["session"]["name"] == single["session"]["name"]
+        assert [i["status"] for i in bulk["checklist"]] == [i["status"] for i in single["checklist"]]
+        assert bulk["profile"]["file_completion_pct"] == single["profile"]["file_completion_pct"]
+
+        r = c.post("/sessions/bulk", json={"target_program": "CS", "skip_existing": True,
+                                           "applicant_numbers": [expected[0], "nope", expected[0]]})
+        assert [json.loads(line) for line in r.text.splitlines()][:-1] == [
+            {"applicant_number": expected[0], "skipped": "Applicant already has a session"},
+            {"applicant_number": "nope", "error": "Applicant not found"},
+        ]
+        assert c.post("/sessions/bulk", json={"target_program": "CS", "missing": "Fee"}).status_code == 422
+        assert c.post("/sessions/bulk", json={"target_program": "CS", "missing": "Essays",
+                                              "applicant_numbers": ["2029001"]}).status_code == 422
+
+def test_chat_batch_holds_no_write_lock_during_llm_calls(tmp_path, monkeypatch):
+    import sqlite3
+    from backend.app import main
+    from backend.app.config import settings
+    from backend.app.rag.retriever import TfidfRetriever
+
+    monkeypatch.setattr(settings, "db_path", str(tmp_path / "aac.db"))
+    monkeypatch.setattr(main, "retriever", TfidfRetriever.build(TfidfRetriever.load_from_folder("data/docs")))
+    calls = []
+
+    def check_lock():
+        # Another writer must get the lock at once while the provider is being called
+        conn = sqlite3.connect(settings.db_path, timeout=0, isolation_level=None)
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("ROLLBACK")
+        conn.close()
+        calls.append(1)
+
+    generate, agenerate = main.llm.generate, main.llm.agenerate
+
+    def generate_checked(*args, **kwargs):
+        check_lock()
+        return generate(*args, **kwargs)
+
+    async def agenerate_checked(*args, **kwargs):
+        check_lock()
+        return await agenerate(*args, **kwargs)
+
+    monkeypatch.setattr(main.llm, "generate", generate_checked)
+    monkeypatch.setattr(main.llm, "agenerate", agenerate_checked)
+    with TestClient(app) as c:
+        sid = c.post("/sessions", json={"name": "x", "target_program": "CS", "applicant_number": "2029001"}).json()["session_id"]
+        msgs = ["What is the fee waiver policy?", "Should I lie on my essay?", "what is on my checklist",
+                "When are transfer deadlines?"]
+        r = c.post("/chat/batch", json={"requests": [{"session_id": sid, "message": m} for m in msgs]})
+        assert r.status_code == 200 and len(calls) == 2
+        assert [x["escalated_to_human"] for x in r.json()["responses"]] == [False, True, False, False]
+        stored = c.get(f"/sessions/{sid}/snapshot").json()["messages"]
+        assert [m["content"] for m in stored if m["role"] == "user"] == msgs
+        assert c.post("/chat/batch", json={"requests": [{"session_id": "nope", "message": "hi"}]}).status_code == 404
+
+def test_chat_batch_bounds_concurrent_turns(tmp_path, monkeypatch):
+    import asyncio
+    from backend.app import main
+    from backend.app.config import settings
+    from backend.app.rag.retriever import TfidfRetriever
+
+    monkeypatch.setattr(settings, "db_path", str(tmp_path / "aac.db"))
+    monkeypatch.setattr(settings, "chat_batch_concurrency", 3)
+    monkeypatch.setattr(main, "retriever", TfidfRetriever.build(TfidfRetriever.load_from_folder("data/docs")))
+    aroute, running, peak = main.aroute, [0], [0]
+
+    async def aroute_counted(*args, **kwargs):
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+        try:
+            await asyncio.sleep(0.01)
+            return await aroute(*args, **kwargs)
+        finally:
+            running[0] -= 1
+
+    monkeypatch.setattr(main, "aroute", aroute_counted)
+    with TestClient(app) as c:
+        sid = c.post("/sessions", json={"name": "x", "target_program": "CS"}).json()["session_id"]
+        reqs = [{"session_id": sid, "message": f"What is the fee waiver policy, question {i}?"} for i in range(20)]
+        r = c.post("/chat/batch", json={"requests": reqs})
+        assert r.status_code == 200 and len(r.json()["responses"]) == 20 and peak[0] == 3
+
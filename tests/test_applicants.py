@@ -0,0 +1,106 @@
+from backend.app.applicants import Applicant, ApplicantStore
+
+def _applicant(n, essay="complete", lor="complete"):
+    return Applicant(str(n), "Lee", "Jordan", 1400, 3.5, "complete", essay, lor, [])
+
+def test_ingest_and_store_pages(tmp_path):
+    from backend.app import db
+    from backend.app.applicants import ingest_applicants
+
+    path = str(tmp_path / "aac.db")
+    db.init_db(path)
+    csv_path = tmp_path / "applicants.csv"
+    lines = ["applicant_number,last_name,first_name,sat,gpa,transcripts,essay,lor,extracurriculars"]
+    for i in range(10):
+        essay = "missing" if i % 2 else "complete"
+        lor = "missing" if i % 3 else "complete"
+        lines.append(f'{i},Lee,Jordan,1400,3.5,complete,{essay},{lor},"Debate; Robotics"')
+    lines += ["10,Lee,Jordan,abc,3.5,complete,complete,complete,", "11,Lee,Jordan,1400,3.5,complete,done,complete,"]
+    csv_path.write_text("\n".join(lines) + "\n")
+
+    report = ingest_applicants(path, str(csv_path), chunk_size=4)
+    assert (report.rows_read, report.loaded, report.rejected_count) == (12, 10, 2)
+    assert [line for line, _ in report.rejected] == [12, 13]
+
+    store = ApplicantStore(path)
+    assert store.get("7").extracurriculars == ["Debate", "Robotics"] and store.get("99") is None
+    seen, cursor = [], None
+    while True:
+        page, cursor = store.page(2, cursor, missing="Essays")
+        seen += [a["applicant_number"] for a in page]
+        if cursor is None:
+            break
+    assert seen == ["1", "3", "5", "7", "9"]
+    page, _ = store.page(10, missing="Essays", completion=50)
+    assert [a["applicant_number"] for a in page] == ["1", "5", "7"]
+
+    version = store.version
+    ingest_applicants(path, str(csv_path), replace=True)
+    assert store.version > version and len(store) == 10
+    db.close_pools()
+
+def test_replace_is_atomic(tmp_path, monkeypatch):
+    import sqlite3
+    import pytest
+    from backend.app import applicants, db
+
+    path = str(tmp_path / "aac.db")
+    db.init_db(path)
+    header = "applicant_number,last_name,first_name,sat,gpa,transcripts,essay,lor,extracurriculars"
+    old_csv, new_csv = tmp_path / "old.csv", tmp_path / "new.csv"
+    old_csv.write_text("\n".join([header] + [f"{i},Lee,Jordan,1400,3.5,complete,complete,complete," for i in range(3)]) + "\n")
+    new_csv.write_text("\n".join([header] + [f"{i},Kim,Sam,1500,3.9,complete,complete,complete," for i in range(10, 16)]) + "\n")
+    applicants.ingest_applicants(path, str(old_csv))
+    store = ApplicantStore(path)
+    version = store.version
+
+    upsert, calls, seen = applicants.upsert_applicants, [], []
+
+    def flaky(db_path, rows):
+        calls.append(1)
+        # Another connection still sees the committed table mid-replace
+        with sqlite3.connect(path) as other:
+            seen.append(other.execute("SELECT COUNT(*) FROM applicants").fetchone()[0])
+        if len(calls) == 2:
+            raise RuntimeError("disk full")
+        upsert(db_path, rows)
+
+    monkeypatch.setattr(applicants, "upsert_applicants", flaky)
+    with pytest.raises(RuntimeError):
+        applicants.ingest_applicants(path, str(new_csv), chunk_size=3, replace=True)
+    assert seen == [3, 3]
+    assert store.version == version and [a["applicant_number"] for a in store.page(10)[0]] == ["0", "1", "2"]
+
+    monkeypatch.setattr(applicants, "upsert_applicants", upsert)
+    applicants.ingest_applicants(path, str(new_csv), chunk_size=3, replace=True)
+    assert store.version > version and len(store) == 6 and store.get("0") is None
+    db.close_pools()
+
+def test_ingest_accepts_every_checklist_status():
+    import pytest
+    from backend.app.applicants import parse_applicant
+    from backend.app.tools import CHECKLIST_STATUSES
+
+    row = {"applicant_number": "1", "last_name": "Lee", "first_name": "Jordan", "sat": "1400", "gpa": "3.5",
+           "transcripts": "complete", "essay": "complete", "lor": "complete"}
+    for status in CHECKLIST_STATUSES:
+        assert parse_applicant({**row, "essay": status}).essay == status
+    with pytest.raises(ValueError, match="essay must be one of"):
+        parse_applicant({**row, "essay": "done"})
+
+def test_vectorized_scores_match_scalar():
+    from backend.app.applicants import applicant_checklist, compute_admission_chance, compute_file_completion
+    from backend.app.cohort import Cohort, admission_chance, cohort_stats, file_completion
+
+    # GPA steps land on float edges: 3.6 - 3.5 < 0.1, so 3.6 earns no bonus
+    rows = [_applicant(i, essay="missing" if i % 2 else "complete") for i in range(6)]
+    for a, sat, gpa in zip(rows, (0, 1399, 1400, 1500, 1600, 2000), (3.49, 3.5, 3.6, 3.7, 3.8, 4.0)):
+        a.sat, a.gpa = sat, gpa
+    cohort = Cohort.from_applicants(rows)
+    assert admission_chance(cohort.sat, cohort.gpa).tolist() == [compute_admission_chance(a.sat, a.gpa) for a in rows]
+    assert file_completion(cohort.complete).tolist() == [compute_file_completion(applicant_checklist(a)) for a in rows]
+
+    stats = cohort_stats(cohort)
+    assert stats["count"] == 6 and stats["outstanding_items"]["Essays"] == 3
+    assert stats["file_completion_pct"]["histogram"] == {"0": 0, "25": 0, "50": 0, "75": 4, "100": 2}
+    assert sum(stats["estimated_admission_chance_pct"]["histogram"].values()) == 6
@@ -0,0 +1,99 @@
+from backend.app import db
+
+def test_pool_reuses_connections(tmp_path):
+    path = str(tmp_path / "aac.db")
+    db.init_db(path)
+    sid = db.create_session(path, "Alex", "traditional", "CS", None)
+    db.add_message(path, sid, "user", "hi")
+    assert db.get_recent_messages(path, sid)[0]["content"] == "hi"
+
+    pool = db.get_pool(path)
+    assert len(pool._all) == 1
+    with db._connect(path) as conn:
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    db.close_pools()
+
+def test_transaction_commits_once_and_caches_reads(tmp_path):
+    path = str(tmp_path / "aac.db")
+    db.init_db(path)
+    sid = db.create_session(path, "Alex", "traditional", "CS", None)
+    with db.transaction(path) as uow:
+        db.upsert_checklist_item(path, sid, "Essays", "missing")
+        assert db.get_checklist(path, sid)[0]["status"] == "missing"
+        assert ("checklist", sid) in uow.cache
+        db.upsert_checklist_item(path, sid, "Essays", "complete")
+        assert ("checklist", sid) not in uow.cache
+        assert db.get_checklist(path, sid)[0]["status"] == "complete"
+    assert db.get_checklist(path, sid)[0]["status"] == "complete"
+
+    try:
+        with db.transaction(path):
+            db.add_message(path, sid, "user", "rolled back")
+            raise RuntimeError("boom")
+    except RuntimeError:
+        pass
+    assert db.get_recent_messages(path, sid) == []
+    db.close_pools()
+
+def test_write_behind_group_commits_concurrent_writes(tmp_path):
+    import threading
+
+    path = str(tmp_path / "aac.db")
+    db.init_db(path)
+    sid = db.create_session(path, "Alex", "traditional", "CS", None)
+    writer = db.enable_write_behind(path, max_batch=64, max_delay=0.01)
+
+    def worker(n):
+        for i in range(25):
+            db.add_message(path, sid, "user", f"{n}-{i}")
+        db.upsert_checklist_item(path, sid, f"item-{n}", "missing", durable=True)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    writer.flush()
+    assert len(db.get_recent_messages(path, sid, limit=1000)) == 200
+    assert len(db.get_checklist(path, sid)) == 8
+    db.close_pools()
+
+def test_migrations_upgrade_legacy_database(tmp_path):
+    import sqlite3
+    from backend.app.migrations import MIGRATIONS, current_version
+
+    path = str(tmp_path / "legacy.db")
+    legacy = sqlite3.connect(path)
+    legacy.execute("CREATE TABLE messages (id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL, "
+                   "role TEXT NOT NULL, content TEXT NOT NULL, created_at TEXT NOT NULL)")
+    legacy.execute("INSERT INTO messages(session_id,role,content,created_at) VALUES ('s1','user','kept','t')")
+    legacy.commit()
+    legacy.close()
+
+    db.init_db(path)
+    db.init_db(path)  # idempotent
+    with db._connect(path) as conn:
+        assert current_version(conn) == max(m.version for m in MIGRATIONS)
+        plan = " ".join(r[-1] for r in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT role FROM messages WHERE session_id=? ORDER BY id DESC LIMIT 5", ("s1",)))
+        assert "idx_messages_session_id" in plan
+    assert db.get_recent_messages(path, "s1")[0]["content"] == "kept"
+    db.close_pools()
+
+def test_session_progress_backfilled_and_kept_by_triggers(tmp_path):
+    from backend.app.migrations import migrate
+
+    path = str(tmp_path / "aac.db")
+    with db._connect(path) as conn:
+        migrate(conn, target=3)
+        conn.execute("INSERT INTO checklist VALUES ('s1','Essays','complete','t'), ('s1','SAT score','missing','t')")
+    db.init_db(path)
+    state = db.get_completion_state(path, "s1")
+    assert state["file_completion_pct"] == 25
+    assert state["missing_items"] == ["SAT score", "Official transcripts", "Letters of recommendation"]
+
+    db.upsert_checklist_item(path, "s1", "SAT score", "complete")
+    assert db.get_completion_state(path, "s1")["missing_items"] == ["Official transcripts", "Letters of recommendation"]
+    assert db.get_completion_state(path, "s2") is None
+    db.close_pools()
@@ -0,0 +1,207 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from backend.app.agents import rag_qa
+from backend.app.llm import LLMClient, LLMError, ResponseCache, SqliteResponseStore
+from backend.app.llm_http import OpenAICompatibleProvider
+from backend.app.rag.retriever import TfidfRetriever
+
+def test_repeat_faq_question_is_served_from_llm_cache(tmp_path):
+    r = TfidfRetriever.build(TfidfRetriever.load_from_folder("data/docs"))
+    store = SqliteResponseStore(str(tmp_path / "llm.db"))
+    llm = LLMClient(cache=ResponseCache(store=store))
+    session = {"session_id": "s1", "segment": "traditional"}
+    first = rag_qa.run(r, llm, session, "What is the fee waiver policy?")
+    again = rag_qa.run(r, llm, session, "What is the fee waiver policy?")
+    assert again.reply == first.reply
+    assert llm.provider_calls == 1 and llm.cache.hits == 1
+    assert llm.cache.top_entries(1)[0]["hits"] == 1
+
+    # A restarted worker sharing the SQLite tier gets the reply without a provider call.
+    other = LLMClient(cache=ResponseCache(store=SqliteResponseStore(str(tmp_path / "llm.db"))))
+    assert rag_qa.run(r, other, session, "What is the fee waiver policy?").reply == first.reply
+    assert other.provider_calls == 0 and other.cache.shared_hits == 1
+    assert "".join(other.generate_stream("Admissions support", "fee waiver?")) == llm.generate("Admissions support", "fee waiver?")
+
+
+
+def test_async_paths_keep_sqlite_tier_off_the_event_loop(tmp_path):
+    store = SqliteResponseStore(str(tmp_path / "llm.db"))
+    threads = []
+    for name in ("get", "put"):
+        method = getattr(store, name)
+        setattr(store, name, lambda *a, _m=method: (threads.append(threading.get_ident()), _m(*a))[1])
+
+    async def main():
+        llm = LLMClient(cache=ResponseCache(store=store))
+        reply = await llm.agenerate("Admissions support", "fee waiver?")
+        fresh = LLMClient(cache=ResponseCache(store=store))
+        assert await fresh.agenerate("Admissions support", "fee waiver?") == reply
+        assert "".join([c async for c in fresh.agenerate_stream("Admissions support", "deadlines?")])
+        return threading.get_ident(), fresh
+
+    loop_thread, fresh = asyncio.run(main())
+    assert fresh.provider_calls == 1 and fresh.cache.shared_hits == 1
+    assert len(threads) == 5 and loop_thread not in threads
+
+
+class _StandIn(BaseHTTPRequestHandler):
+    """Minimal OpenAI-compatible /chat/completions: echoes the question, optionally slow or failing."""
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        srv = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with srv.lock:
+            srv.requests += 1
+            srv.ports.add(self.client_address[1])
+            srv.in_flight += 1
+            srv.max_in_flight = max(srv.max_in_flight, srv.in_flight)
+            fail = srv.fail_next > 0
+            srv.fail_next -= fail
+        try:
+            time.sleep(srv.delay)
+            if fail:
+                return self._send(503, b'{"error": "overloaded"}', "application/json")
+            answer = "echo: " + body["messages"][-1]["content"]
+            if body.get("stream"):
+                events = "".join(
+                    f"data: {json.dumps({'choices': [{'delta': {'content': w}}]})}\n\n"
+                    for w in answer.split(" ")[:1] + [" " + w for w in answer.split(" ")[1:]]
+                ) + "data: [DONE]\n\n"
+                return self._send(200, events.encode(), "text/event-stream")
+            payload = {"choices": [{"message": {"role": "assistant", "content": answer}}]}
+            self._send(200, json.dumps(payload).encode(), "application/json")
+        finally:
+            with srv.lock:
+                srv.in_flight -= 1
+
+    def _send(self, status, data, content_type):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def stand_in():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _StandIn)
+    srv.daemon_threads = True
+    srv.lock = threading.Lock()
+    srv.requests, srv.in_flight, srv.max_in_flight, srv.fail_next, srv.delay = 0, 0, 0, 0, 0.0
+    srv.ports = set()
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def _provider(srv, **kw):
+    kw.setdefault("backoff_base_s", 0.01)
+    return OpenAICompatibleProvider(model="stand-in", base_url=f"http://127.0.0.1:{srv.server_port}/v1",
+                                    api_key="test", **kw)
+
+
+def test_http_provider_reuses_connections_and_streams(stand_in):
+    p = _provider(stand_in)
+    assert [p.generate("sys", f"q{i}") for i in range(5)] == [f"echo: q{i}" for i in range(5)]
+    assert stand_in.requests == 5 and len(stand_in.ports) == 1  # one keep-alive socket
+    assert "".join(p.generate_stream("sys", "what is due")) == "echo: what is due"
+    assert asyncio.run(p.agenerate("sys", "async q")) == "echo: async q"
+    p.close()
+
+
+def test_http_provider_closes_async_clients_on_their_loop(stand_in):
+    p = _provider(stand_in)
+    other = asyncio.new_event_loop()
+    thread = threading.Thread(target=other.run_forever, daemon=True)
+    thread.start()
+    try:
+        assert asyncio.run_coroutine_threadsafe(p.agenerate("sys", "q1"), other).result(5) == "echo: q1"
+        stale = p._aclient
+
+        async def main():
+            assert await p.agenerate("sys", "q2") == "echo: q2"  # new loop: new client, old one closed on its loop
+            current = p._aclient
+            await p.aclose()
+            return current
+
+        current = asyncio.run(main())
+        for _ in range(100):  # the stale client's aclose() runs on the other loop
+            if stale.is_closed:
+                break
+            time.sleep(0.01)
+        assert stale.is_closed and current.is_closed and p._aclient is None
+    finally:
+        other.call_soon_threadsafe(other.stop)
+        thread.join(5)
+        other.close()
+
+
+def test_http_provider_retries_then_gives_up(stand_in):
+    p = _provider(stand_in, max_retries=2)
+    stand_in.fail_next = 2
+    assert p.generate("sys", "q") == "echo: q" and p.retries == 2
+    stand_in.fail_next = 3
+    with pytest.raises(LLMError):
+        p.generate("sys", "q2")
+    slow = _provider(stand_in, max_retries=0, timeout_s=0.05)
+    stand_in.delay = 0.3
+    with pytest.raises(LLMError):
+        slow.generate("sys", "q3")
+
+
+def test_http_provider_coalesces_and_limits_concurrency(stand_in):
+    stand_in.delay = 0.2
+    p = _provider(stand_in, max_concurrency=2)
+    results = [None] * 6
+    def ask(i):
+        results[i] = p.generate("sys", "same question")
+    threads = [threading.Thread(target=ask, args=(i,)) for i in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == ["echo: same question"] * 6
+    assert stand_in.requests == 1 and p.coalesced == 5
+
+    async def burst():
+        same = [p.agenerate("sys", "async same") for _ in range(4)]
+        distinct = [p.agenerate("sys", f"d{i}") for i in range(6)]
+        return await asyncio.gather(*same, *distinct)
+    out = asyncio.run(burst())
+    assert out[:4] == ["echo: async same"] * 4
+    assert stand_in.requests == 1 + 1 + 6 and stand_in.max_in_flight == 2
+
+
+def test_latency_profile_is_reproducible_and_injects_failures():
+    from backend.app.llm import LatencyProfile, MockProvider, SimulatedLatencyProvider
+
+    profile = LatencyProfile(ttft="lognormal", ttft_s=0.01, ttft_sigma=0.8, error_rate=0.2, timeout_rate=0.1, seed=42)
+    a, b = SimulatedLatencyProvider(MockProvider(), profile), SimulatedLatencyProvider(MockProvider(), profile)
+    draws = [a._draw() for _ in range(2000)]
+    assert draws == [b._draw() for _ in range(2000)]
+    outcomes = [o for _, o in draws]
+    assert 0.17 < outcomes.count("error") / 2000 < 0.23 and 0.08 < outcomes.count("timeout") / 2000 < 0.12
+
+    llm = LLMClient(latency=LatencyProfile(ttft_s=0.05, tokens_per_s=None))
+    t = time.perf_counter()
+    reply = llm.generate("sys", "essay help")
+    assert time.perf_counter() - t >= 0.05
+
+    async def streamed():
+        return "".join([c async for c in llm.agenerate_stream("sys", "essay help")])
+    assert asyncio.run(streamed()) == reply
+
+    failing = LLMClient(latency=LatencyProfile(ttft_s=0.0, timeout_rate=1.0, timeout_s=0.01))
+    with pytest.raises(LLMError):
+        failing.generate("sys", "anything")
@@ -7,3 +7,38 @@ def test_escalate_integrity():
 def test_no_escalate_normal():
     d = should_escalate("What is a recommendation letter?")
     assert d.escalated_to_human is False
+
+def test_no_guarantees_stream_catches_split_phrases():
+    from backend.app.policies import NoGuaranteesStream, enforce_no_guarantees
+
+    text = "You will be admitted, I guarantee it: 100% certainly admitted."
+    for size in (1, 3, 7):
+        guard = NoGuaranteesStream()
+        out = "".join(guard.feed(text[i:i + size]) for i in range(0, len(text), size)) + guard.flush()
+        assert out == enforce_no_guarantees(text)
+
+def test_triggers_match_whole_words_with_positions():
+    assert should_escalate("Courtesy of my counselor, I got an extension").escalated_to_human is False
+    d = should_escalate("Is cheating common? I also have a court date.")
+    assert [(m.phrase, m.text, m.start) for m in d.matches] == [("cheat*", "cheating", 3), ("court", "court", 34)]
+    assert d.reason.endswith("'cheating'")
+
+def test_institution_rules_extend_defaults(tmp_path):
+    import json
+    from backend.app.policies import PolicyEngine
+
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps({"escalate": ["visa status", "deport*"], "no_guarantees": ["sure thing"]}))
+    engine = PolicyEngine.from_file(str(path))
+    assert engine.should_escalate("Will my VISA  status matter?").escalated_to_human
+    assert engine.should_escalate("fear of deportation").matches[0].phrase == "deport*"
+    assert engine.should_escalate("should i lie?").escalated_to_human
+    assert engine.enforce_no_guarantees("It's a sure thing, 100%.") == "It's a cannot guarantee, cannot guarantee."
+
+def test_inflected_triggers_still_escalate():
+    for text in ["Is it legally ok to list this?", "I was illegally detained once", "My medically excused absence",
+                 "I worked as a paralegal", "I am an immigrant", "We are immigrating next year",
+                 "Can I fake it?", "He faked a transcript", "a courtroom internship", "outside the courthouse"]:
+        assert should_escalate(text).escalated_to_human, text
+    for text in ["Courtesy of my counselor", "I forgot my password"]:
+        assert not should_escalate(text).escalated_to_human, text
@@ -7,3 +7,116 @@ def test_build_and_search(tmp_path):
     r = TfidfRetriever.build(docs)
     hits = r.search("checklist", top_k=3)
     assert isinstance(hits, list)
+
+def test_passages_carry_offsets_and_headings():
+    from backend.app.rag.retriever import Doc, Passage, chunk_document
+
+    text = "# Guide\n\nIntro text here.\n\n## Fee waivers\n\n" + ("Waivers are available for eligible applicants. " * 40)
+    doc = Doc(doc_id="guide.md", title="Guide", text=text)
+    passages = chunk_document(doc, max_chars=300, overlap=60)
+    assert len(passages) > 2
+    for p in passages:
+        assert text[p.start:p.end] == p.text
+    assert {p.heading for p in passages} == {"Guide", "Fee waivers"}
+
+    r = TfidfRetriever.build([doc], max_chars=300, overlap=60)
+    top, _ = r.search("fee waiver eligible", top_k=1)[0]
+    assert isinstance(top, Passage) and top.heading == "Fee waivers"
+
+def test_open_memory_mapped_index_matches_build(tmp_path):
+    r = TfidfRetriever.build(TfidfRetriever.load_from_folder("data/docs"), max_chars=200, overlap=40)
+    r.save_dir(str(tmp_path / "index"))
+    opened = TfidfRetriever.open(str(tmp_path / "index"))
+    assert len(opened.docs) == len(r.docs)
+    for q in ["fee waiver", "what do I need to complete my file", "deployment orders"]:
+        expected = [(d.doc_id, d.start, round(s, 9)) for d, s in r.search(q)]
+        assert [(d.doc_id, d.start, round(s, 9)) for d, s in opened.search(q)] == expected
+
+def test_save_dir_publishes_generations_atomically(tmp_path):
+    import os
+    import shutil
+
+    r = TfidfRetriever.build(TfidfRetriever.load_from_folder("data/docs"), max_chars=200, overlap=40)
+    index = tmp_path / "index"
+    r.save_dir(str(index))
+    # Turn it into a pre-generation flat index: files directly in index_dir, no pointer
+    gen = index / (index / "CURRENT").read_text()
+    for name in os.listdir(gen):
+        shutil.move(str(gen / name), str(index / name))
+    gen.rmdir()
+    (index / "CURRENT").unlink()
+    assert len(TfidfRetriever.open(str(index)).docs) == len(r.docs)
+
+    seen = []
+    for _ in range(3):
+        r.save_dir(str(index))
+        seen.append((index / "CURRENT").read_text())
+        assert len(TfidfRetriever.open(str(index)).docs) == len(r.docs)
+        # The flat files stay while they are the previous version, then go
+        assert (index / "meta.json").exists() == (len(seen) == 1)
+    assert sorted(n for n in os.listdir(index) if n.startswith("gen-")) == sorted(seen[-2:])
+
+def test_incremental_build_reuses_unchanged_docs(tmp_path):
+    from backend.app.rag.incremental import IncrementalIndexBuilder
+
+    docs = TfidfRetriever.load_from_folder("data/docs")
+    cache = str(tmp_path / "cache")
+    _, first = IncrementalIndexBuilder(cache).build(docs)
+    assert first.full_rebuild and len(first.added) == len(docs)
+
+    docs[1].text += "\nNew section about interview scheduling."
+    r, report = IncrementalIndexBuilder(cache).build(docs[1:])
+    assert report.changed == [docs[1].doc_id]
+    assert report.removed == [docs[0].doc_id]
+    assert len(report.reused) == len(docs) - 2
+
+    full = TfidfRetriever.build(docs[1:])
+    assert (full.terms == r.terms).all()
+    assert abs(full.matrix - r.matrix).max() < 1e-12
+
+def test_inverted_index_top_k_matches_dense_scores():
+    import numpy as np
+    import scipy.sparse as sp
+    from backend.app.rag.search import InvertedIndex
+
+    rng = np.random.default_rng(0)
+    m = sp.random(300, 80, density=0.1, random_state=1, format="csr")
+    index = InvertedIndex.from_matrix(m)
+    for _ in range(50):
+        terms = rng.choice(80, size=4, replace=False)
+        w = rng.random(4) + 0.1
+        q = np.zeros(80)
+        q[terms] = w
+        dense = m @ q
+        expected = sorted(dense[dense > 0], reverse=True)[:5]
+        for early in (True, False):
+            _, scores = index.top_k(terms, w, 5, early_termination=early)
+            assert np.allclose(scores, expected)
+
+def test_query_cache_hits_and_invalidates_on_new_version(tmp_path):
+    from backend.app.rag.cache import QueryCache, SqliteQueryStore
+
+    r = TfidfRetriever.build(TfidfRetriever.load_from_folder("data/docs"))
+    r.cache = QueryCache(max_entries=2, store=SqliteQueryStore(str(tmp_path / "qc.db")))
+    first = r.search("Fee waiver?")
+    assert r.search("fee   WAIVER") == first  # same analyzed tokens -> same entry
+    assert r.cache.hits == 1 and r.cache.misses == 1
+    r.search("deadlines")
+    r.search("transcripts")
+    assert r.cache.evictions == 1
+
+    # A second process sharing the SQLite tier gets the result without searching.
+    other = TfidfRetriever.build(TfidfRetriever.load_from_folder("data/docs"))
+    other.cache = QueryCache(store=SqliteQueryStore(str(tmp_path / "qc.db")))
+    assert other.search("fee waiver") == first and other.cache.shared_hits == 1
+
+    rebuilt = TfidfRetriever.build(TfidfRetriever.load_from_folder("data/docs")[1:])
+    rebuilt.cache = r.cache
+    assert rebuilt.version != r.version
+    rebuilt.search("fee waiver")
+    assert r.cache.misses == 4 and r.cache.invalidations > 0
+
+def test_search_many_matches_search():
+    r = TfidfRetriever.build(TfidfRetriever.load_from_folder("data/docs"))
+    queries = ["fee waiver", "deadlines for transfer", "", "zzzunknown", "Fee Waiver"]
+    assert r.search_many(queries) == [r.search(q) for q in queries]
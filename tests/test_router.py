@@ -0,0 +1,30 @@
+from backend.app.agents.router import IntentRouter, classify, route
+
+TRADITIONAL = {"segment": "traditional"}
+ACTIVE_DUTY = {"segment": "active_duty", "deadline": None}
+
+def test_intents_are_scored_not_first_match():
+    d = IntentRouter().decide(TRADITIONAL, "Improve my essay and remind me tomorrow")
+    assert d.intent == "coach" and d.scores == {"coach": 2.0, "outreach": 1.0}
+    assert d.rules == ["improv*", "essay*"]
+
+def test_ties_break_by_priority_and_segment():
+    assert classify(TRADITIONAL, "Remind me which documents I still need") == "checklist"
+    assert classify(TRADITIONAL, "My deployment orders came in") == "rag"
+    assert classify(ACTIVE_DUTY, "My deployment orders came in") == "military"
+
+def test_whole_words_only():
+    assert classify(TRADITIONAL, "Thanks for the courtesy restart of my session") == "rag"
+
+def test_route_records_trace_first():
+    result = route(None, None, "unused.db", ACTIVE_DUTY, "I deploy 2025-10-15, help me plan")
+    trace = result.actions[0]
+    assert trace["tool"] == "route" and trace["intent"] == "military"
+    assert trace["rules"] == ["deploy*"] and trace["elapsed_ms"] >= 0
+
+def test_checklist_catches_inflections():
+    for msg in ("Is my file incomplete?", "It says my application is incompleted",
+                "Why is it flagged missing-docs?", "I missed the transcript upload"):
+        assert classify(TRADITIONAL, msg) == "checklist", msg
+    for msg in ("What is Columbia's mission statement?", "I live in Mississippi", "I did missionary service"):
+        assert classify(TRADITIONAL, msg) == "rag", msg